@@ -0,0 +1,221 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+import os
+import struct
+import hashlib
+import ulogger
+
+__all__ = ["ConfigCache"]
+
+CACHE_MAGIC = b"RCCF"
+CACHE_VERSION = 3  # Bump whenever the parsed format changes
+
+# Header: magic, version, slave index, sha256 of rc_config
+_HEADER_FMT = "<4sBB32s"
+_HEADER_SIZE = struct.calcsize(_HEADER_FMT)
+
+# Value tags of the compiled layout
+_TAG_NONE = 0x4E   # 'N'
+_TAG_TRUE = 0x54   # 'T'
+_TAG_FALSE = 0x46  # 'F'
+_TAG_INT = 0x69    # 'i' <i
+_TAG_FLOAT = 0x66  # 'f' <d
+_TAG_STR = 0x73    # 's' <I length + utf-8
+_TAG_LIST = 0x6C   # 'l' <H count + items
+_TAG_DICT = 0x64   # 'd' <H count + (B key length + key, item)
+
+_HASH_CHUNK = 256
+
+logger = ulogger.Logger()
+
+
+class ConfigCache:
+    """
+    A compiled, binary copy of the parsed receiver configuration.
+
+    The parsed setting of the active receiver is written to flash once,
+    keyed by the sha256 of rc_config and the slave index. Later boots read
+    it back directly, skipping ujson and DataParser.
+    """
+
+    def __init__(self, path="rc_config.cache", source="rc_config"):
+        """
+        Initializes the ConfigCache instance.
+
+        Args:
+            path (str): The compiled cache file.
+            source (str): The JSON configuration the cache is built from.
+        """
+        self.path = path
+        self.source = source
+
+    def digest(self):
+        """
+        Hashes the source configuration file in fixed-size chunks.
+
+        Returns:
+            bytes: The sha256 digest, or None if the file is missing.
+        """
+        h = hashlib.sha256()
+        buf = bytearray(_HASH_CHUNK)
+        mv = memoryview(buf)
+        try:
+            with open(self.source, "rb") as f:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    h.update(mv[:n])
+        except OSError:
+            return None
+        return h.digest()
+
+    def load(self, slave_idx, digest):
+        """
+        Loads the compiled setting if it matches the given key.
+
+        Args:
+            slave_idx (int): The active receiver index.
+            digest (bytes): The digest of the current rc_config.
+
+        Returns:
+            dict: The parsed setting, or None on a cache miss.
+        """
+        if digest is None:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < _HEADER_SIZE:
+            return None
+        magic, version, idx, key = struct.unpack_from(_HEADER_FMT, data, 0)
+        if (magic != CACHE_MAGIC or version != CACHE_VERSION
+                or idx != slave_idx or key != digest):
+            return None
+
+        try:
+            setting, pos = self._decode(data, _HEADER_SIZE)
+        except Exception as e:
+            logger.warn(f"[CACHE]DECODE_ERR:{e}")
+            return None
+        if pos != len(data) or not isinstance(setting, dict):
+            return None
+        return setting
+
+    def store(self, slave_idx, digest, setting):
+        """
+        Writes the parsed setting to flash.
+
+        The file is written next to the target and renamed into place, so a
+        reset in the middle of a write never leaves a truncated cache.
+
+        Args:
+            slave_idx (int): The active receiver index.
+            digest (bytes): The digest of the current rc_config.
+            setting (dict): The parsed setting from DataParser.
+
+        Returns:
+            bool: True if the cache was written.
+        """
+        if digest is None or not isinstance(setting, dict):
+            return False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(struct.pack(_HEADER_FMT, CACHE_MAGIC, CACHE_VERSION,
+                                    slave_idx, digest))
+                self._encode(f, setting)
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            os.rename(tmp_path, self.path)
+        except Exception as e:
+            logger.warn(f"[CACHE]STORE_ERR:{e}")
+            self._remove(tmp_path)
+            return False
+        return True
+
+    def invalidate(self):
+        """Removes the compiled cache file."""
+        self._remove(self.path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _encode(self, f, value):
+        if value is None:
+            f.write(bytes((_TAG_NONE,)))
+        elif value is True:
+            f.write(bytes((_TAG_TRUE,)))
+        elif value is False:
+            f.write(bytes((_TAG_FALSE,)))
+        elif isinstance(value, int):
+            f.write(struct.pack("<Bi", _TAG_INT, value))
+        elif isinstance(value, float):
+            f.write(struct.pack("<Bd", _TAG_FLOAT, value))
+        elif isinstance(value, str):
+            raw = value.encode()
+            f.write(struct.pack("<BI", _TAG_STR, len(raw)))
+            f.write(raw)
+        elif isinstance(value, (list, tuple)):
+            f.write(struct.pack("<BH", _TAG_LIST, len(value)))
+            for item in value:
+                self._encode(f, item)
+        elif isinstance(value, dict):
+            f.write(struct.pack("<BH", _TAG_DICT, len(value)))
+            for key, item in value.items():
+                raw = key.encode()
+                f.write(struct.pack("<B", len(raw)))
+                f.write(raw)
+                self._encode(f, item)
+        else:
+            raise TypeError("unsupported type")
+
+    def _decode(self, data, pos):
+        tag = data[pos]
+        pos += 1
+        if tag == _TAG_INT:
+            return struct.unpack_from("<i", data, pos)[0], pos + 4
+        if tag == _TAG_STR:
+            n = struct.unpack_from("<I", data, pos)[0]
+            pos += 4
+            return str(data[pos:pos + n], "utf-8"), pos + n
+        if tag == _TAG_LIST:
+            n = struct.unpack_from("<H", data, pos)[0]
+            pos += 2
+            lst = []
+            for _ in range(n):
+                item, pos = self._decode(data, pos)
+                lst.append(item)
+            return lst, pos
+        if tag == _TAG_DICT:
+            n = struct.unpack_from("<H", data, pos)[0]
+            pos += 2
+            dic = {}
+            for _ in range(n):
+                klen = data[pos]
+                key = str(data[pos + 1:pos + 1 + klen], "utf-8")
+                item, pos = self._decode(data, pos + 1 + klen)
+                dic[key] = item
+            return dic, pos
+        if tag == _TAG_FLOAT:
+            return struct.unpack_from("<d", data, pos)[0], pos + 8
+        if tag == _TAG_NONE:
+            return None, pos
+        if tag == _TAG_TRUE:
+            return True, pos
+        if tag == _TAG_FALSE:
+            return False, pos
+        raise ValueError("bad tag")
@@ -8,13 +8,76 @@
 from machine import Timer
 from devices import Devices
 from bbl import *
+from bbl import kernels
+from bbl.kernels import SPEED_Q
+from bbl.leds import LED_REFRESH_MS, LEDEffect
 from machine import Pin
 from parser import DataParser
+from lut import build_lut
+from scheduler import TimerScheduler
+from timeline import Timeline, TimelinePlayer
+from rcstream import RcStream
+from profiler import (StageProfiler, STAGE_ADC, STAGE_MID, STAGE_MOTOR,
+                      STAGE_SERVO, STAGE_BUTTON, STAGE_EFFECT, STAGE_TIMER,
+                      STAGE_SCRIPT)
+from array import array
 import utime
 import ulogger
 
 logger = ulogger.Logger()
 
+# PWM output types of the control plan
+PWM_TYPE_RAW = 0
+PWM_TYPE_SPEED = 1
+PWM_TYPE_ANGLE = 2
+
+# Analog stick events, indexes into the control plan effect tables
+ADC_EQUAL_MID = 0
+ADC_ABOVE_MID = 1
+ADC_BELOW_MID = 2
+ADC_EVENT_NAMES = ("equal_mid", "above_mid", "below_mid")
+# Raw stick readings are 0..ADC_RANGE - 1
+ADC_RANGE = 4096
+
+# Button events, indexes into the control plan effect tables
+KEY_SHORT = 0
+KEY_LONG = 1
+KEY_DOWN = 2
+KEY_RELEASE = 3
+KEY_EVENT_NAMES = ("short", "long", "down", "release")
+
+# Output transfer tables: servo tables cover mixed stick values in
+# [-PWM_LUT_SPAN, PWM_LUT_SPAN] every 1 << PWM_LUT_SHIFT, motor curves
+# cover speeds 0..MOTOR_CURVE_SIZE - 1
+PWM_LUT_SPAN = 4096
+PWM_LUT_SHIFT = 3
+MOTOR_CURVE_SIZE = 2048
+
+# Run the control pipeline with integer math only, see set_fixed_point()
+FIXED_POINT = True
+
+# Device task periods of the timer scheduler. The servo stepping speed is
+# calibrated for 100 calls per second, the LED effect tables are sampled at
+# the LED refresh period
+SERVO_PERIOD_MS = 10
+LED_PERIOD_MS = LED_REFRESH_MS
+
+# Heap budget of the CODE scripts compiled at config load
+CODE_CACHE_BYTES = 16 * 1024
+
+# CODE scripts running at once. A script slice, its run between two awaits,
+# over CODE_SLICE_US is logged, one over CODE_CANCEL_US cancels the script;
+# the timer checks the running slice every CODE_WATCHDOG_MS
+CODE_SLOTS = 3
+CODE_SLICE_US = 5000
+CODE_CANCEL_US = 20000
+CODE_WATCHDOG_MS = 5
+
+# Button states of ButtonHandler
+BTN_UP = 0
+BTN_DOWN = 1
+BTN_LONG = 2  # Down, long press reported
+
 
 class ButtonHandler:
     """
@@ -47,6 +110,13 @@ class ButtonHandler:
         self.buttons_press_down_callback = None
         self.buttons_release_callback = None
 
+        # Per-button state in preallocated arrays: check_buttons() runs on
+        # every control tick and must not allocate
+        count = len(self.buttons)
+        self.long_thr = array('i', [1000] * count)
+        self.key_state = array('b', [BTN_UP] * count)
+        self.pressed_ms = array('i', [0] * count)
+
     def set_long_threshold(self, button_name, new_threshold):
         """
         Update the long press threshold for a specified button.
@@ -62,6 +132,8 @@ class ButtonHandler:
         """
         if button_name in self.buttons:
             self.buttons[button_name]['LONG_THR'] = new_threshold
+            self.long_thr[list(self.buttons).index(button_name)] = \
+                new_threshold
             print("Button {} long press threshold updated to {}.".format(
                 button_name, new_threshold))
         else:
@@ -103,54 +175,45 @@ class ButtonHandler:
         """
         self.buttons_release_callback = callback
 
-    def check_buttons(self, buttons_value_list):
+    def check_buttons(self, values, offset=0):
         """
         Checks the button states and triggers callbacks as needed.
 
         Args:
-            value (list): A list of button states.
+            values (list): The button states from `offset` on, 0 for a
+                pressed button. Usually the whole RC data with offset 6,
+                so no slice has to be allocated.
+            offset (int): Index of the first button state in `values`.
         """
-        if not isinstance(buttons_value_list, list):
-            raise ValueError("[BTN]buttons_value_list must be a list")
-        if len(buttons_value_list) != len(self.buttons):
+        count = len(self.key_state)
+        if len(values) < offset + count:
             raise ValueError(
                 "[BTN]The length must match the number of buttons")
 
-        for i, (button_name, button_config) in enumerate(self.buttons.items()):
-            button_state = buttons_value_list[i]
+        now = utime.ticks_ms()
+        key_state = self.key_state
+        for i in range(count):
+            state = key_state[i]
 
             # Check if the button is pressed
-            if button_state == 0:
-                if "pressed_time" not in button_config:
-                    button_config["pressed_time"] = utime.ticks_ms()
-                    # print("press down")
+            if values[offset + i] == 0:
+                if state == BTN_UP:
+                    self.pressed_ms[i] = now
+                    key_state[i] = BTN_DOWN
                     self.buttons_press_down_callback(i)
-                else:
-                    press_duration = utime.ticks_ms(
-                    ) - button_config["pressed_time"]
-                    if press_duration >= button_config[
-                            "LONG_THR"] and not button_config.get(
-                                "long_pressed", False):
-                        # print("long_press:", press_duration, "(ms)")
-                        self.buttons_long_callback(i)
-                        button_config["long_pressed"] = True
-            else:
-                if "pressed_time" in button_config:
-                    # Calculate the duration of key presses
-                    press_duration = utime.ticks_ms(
-                    ) - button_config["pressed_time"]
-                    # print("press release")
-                    self.buttons_release_callback(i)
-                    del button_config["pressed_time"]
-                    # Reset long press status
-                    button_config["long_pressed"] = False
-
-                    # Check if it is a long press event
-                    if press_duration >= button_config["LONG_THR"]:
-                        pass
-                    else:
-                        # print("short_press_callback")
-                        self.buttons_short_callback(i)
+                elif state == BTN_DOWN and utime.ticks_diff(
+                        now, self.pressed_ms[i]) >= self.long_thr[i]:
+                    key_state[i] = BTN_LONG
+                    self.buttons_long_callback(i)
+            elif state != BTN_UP:
+                # Calculate the duration of key presses
+                press_duration = utime.ticks_diff(now, self.pressed_ms[i])
+                key_state[i] = BTN_UP
+                self.buttons_release_callback(i)
+
+                # Released before the long press threshold
+                if press_duration < self.long_thr[i]:
+                    self.buttons_short_callback(i)
 
 
 class PermissionManager:
@@ -188,7 +251,7 @@ class PermissionManager:
         return True
 
     def set_permission_order(self, device_name: str,
-                             permissions: List[str]) -> bool:
+                             permissions: list) -> bool:
         """
         Set the permission order for a specific device.
 
@@ -462,7 +525,11 @@ class BBL_Controller:
                                         logger.debug,
                                         logger.info,
                                         logger.warn,
-                                        logger.error)
+                                        logger.error,
+                                        CODE_CACHE_BYTES,
+                                        CODE_SLOTS,
+                                        CODE_SLICE_US,
+                                        CODE_CANCEL_US)
 
         self.dev_manager = PermissionManager(logger.info)
         self.dev_manager.register_device('MOTOR', 'BEHAVIOR')
@@ -492,11 +559,18 @@ class BBL_Controller:
         self.executor.register_danger_cmds(code_exec_danger_cmds)
         self.executor.register_default_cmds(code_exec_default_cmds)
         self.executor.register_remap_rules(code_exec_remap_rules)
+        # The RC data of every tick, `rc` in the scripts
+        self.rc_stream = RcStream()
+        self.executor.register_globals({"rc": self.rc_stream})
         self.executor.register_final_cb(self._executor_final_cb)
 
+        # Stage timing, see set_profiling()
+        self.profiler = StageProfiler()
+
         self.d_ch_map = [self.led1, self.led2]  # channel map
 
         self.setting = {}
+        self.setting_gen = None
         self.receiver_index = 0
         self.enable_advanced_motor_control = [False] * 2
 
@@ -510,6 +584,7 @@ class BBL_Controller:
 
         self.adc_deadzone_list = [200] * 6
         self.adc_mid_list = [2048] * 6
+        self._compile_adc_slopes()
 
         self._timer_init()
 
@@ -525,14 +600,27 @@ class BBL_Controller:
         self.adc_equal_effects_list = [CycleList()] * 6
         self.adc_above_effects_list = [CycleList()] * 6
         self.adc_below_effects_list = [CycleList()] * 6
-        # 6 ADC control lever channels: items:"equal", "above", "below"
-        self.analog_cmp_mid = ["equal"] * 6
+        self.adc_effects_lists = (self.adc_equal_effects_list,
+                                  self.adc_above_effects_list,
+                                  self.adc_below_effects_list)
+        self.key_effects_lists = (self.key_short_effects_list,
+                                  self.key_long_effects_list,
+                                  self.key_down_effects_list,
+                                  self.key_up_effects_list)
+        # 6 ADC control lever channels: ADC_EQUAL/ABOVE/BELOW_MID
+        self.analog_cmp_mid = array('b', [ADC_EQUAL_MID] * 6)
 
         self.adv_ctrl_elapsed_time = [0] * 6
         self.adv_ctrl_last_tar_speed = [0] * 6
         self.adv_last_rc_data = [0] * 6
         self.adv_cur_rc_data = [2048] * 6
         self.cycle_time = 0.02
+        # Fixed-point mirrors: current speeds in Q8, elapsed time in ms
+        self.adv_cur_q8 = array('i', [2048 << SPEED_Q] * 6)
+        self.adv_ctrl_elapsed_ms = array('i', [0] * 6)
+        self.cycle_time_ms = 20
+        self.high_speed_duration_ms = [1000] * 2
+        self.high_speed_thr_x100 = [2048 * 100] * 2
         self.update_tar_speed_threshold = 200
 
         self.en_simulation_time = 0
@@ -541,6 +629,113 @@ class BBL_Controller:
 
         self.board_key = Pin(9, Pin.IN)
 
+        self.fixed_point = False
+        self.set_fixed_point(FIXED_POINT)
+        self._compile_plan()
+
+    def set_profiling(self, en=True):
+        """
+        Enables or disables the stage timing histograms.
+
+        When enabled, every handler call records the time spent in ADC
+        normalisation, analog mid events, motor and servo calculation,
+        the button check and effect dispatch. timer0_callback and every
+        slice of a running CODE script are timed as well.
+
+        Args:
+            en (bool): True to record.
+        """
+        self.profiler.enable(en)
+        self.executor.register_slice_cb(self._script_slice_cb if en
+                                        else None)
+
+    def profile_command(self, cmd):
+        """
+        Runs a profiler command received through rc_simulation.
+
+        Args:
+            cmd (str): "on", "off", "reset" or "dump". "dump" writes the
+                histograms to the log.
+        """
+        if cmd == "on":
+            self.set_profiling(True)
+        elif cmd == "off":
+            self.set_profiling(False)
+        elif cmd == "reset":
+            self.profiler.reset()
+        elif cmd == "dump":
+            self.profiler.dump(logger.info)
+        else:
+            logger.warn(f"[CTRL]PROFILE_CMD: {cmd}")
+
+    def _script_slice_cb(self, elapsed_us):
+        if self.profiler.enabled:
+            self.profiler.record(STAGE_SCRIPT, elapsed_us)
+
+    def set_cycle_time(self, ms):
+        """
+        Sets the time between two handler calls.
+
+        The high speed zone ramp advances by this time on every call. The
+        default is 20 ms; loops that call the handler at a varying rate
+        pass the measured interval before each call.
+
+        Args:
+            ms (int): The interval in milliseconds.
+        """
+        if ms != self.cycle_time_ms:
+            self.cycle_time_ms = ms
+            self.cycle_time = ms / 1000
+
+    def set_fixed_point(self, en=True):
+        """
+        Enables or disables the fixed-point control pipeline.
+
+        In fixed-point mode the motor mixing, the high speed zone ramp and
+        the motor and servo drivers use integer math only, and the tick
+        state lives in preallocated arrays: a handler() call that triggers
+        no effect, and the timer tasks, run without heap allocation. The
+        outputs match the float pipeline within 1 LSB.
+
+        Args:
+            en (bool): True to enable fixed-point mode.
+        """
+        if en and not self.fixed_point:
+            # Pick up the state of the float path
+            for ch in range(6):
+                self.adv_cur_q8[ch] = int(
+                    self.adv_cur_rc_data[ch] * (1 << SPEED_Q))
+                self.adv_ctrl_elapsed_ms[ch] = int(
+                    self.adv_ctrl_elapsed_time[ch] * 1000 + 0.5)
+        elif not en and self.fixed_point:
+            for ch in range(6):
+                self.adv_ctrl_elapsed_time[ch] = \
+                    self.adv_ctrl_elapsed_ms[ch] / 1000
+        self.fixed_point = en
+        self.servos.set_fixed_point(en)
+        self.motors.set_fixed_point(en)
+
+    def load_setting(self, setting, index, generation):
+        """
+        Resets the controller and compiles a configuration just loaded.
+
+        Called on config load, outside of the control tick, so that the
+        lookup tables, the effect plan, the LED timelines and the CODE
+        scripts are ready before the first handler() call, which then
+        finds the setting already in place.
+
+        Args:
+            setting (dict): The parsed configuration, None if none loaded.
+            index (int): The active receiver index.
+            generation (int): Identity of `setting`, as passed to handler().
+        """
+        self.reinit()
+        if not isinstance(setting, dict) or not setting or index == 0:
+            return
+        self.receiver_index = index
+        self.update_setting(setting)
+        self.setting_gen = generation
+
     def update_setting(self, setting):
         self.setting = setting
         self._update_advanced_config()
@@ -584,70 +779,312 @@ class BBL_Controller:
             )[i] if "sender" in self.setting and "deadzones" in self.setting[
                 "sender"] else self.adc_deadzone_list[i]
 
+        self._compile_adc_slopes()
+        self._compile_plan()
+
+    def _compile_plan(self):
+        """
+        Compiles the parsed setting into a flat per-tick control plan.
+
+        Channel mixing becomes integer index arrays, per-actuator constants
+        are resolved once and the effect tables are indexed by event type,
+        so handler() runs without string formatting or dict lookups.
+        """
+        setting = self.setting if isinstance(self.setting, dict) else {}
+        sender = setting.get("sender", {})
+        self.recv_info = setting.get(f"receiver_{self.receiver_index}", {})
+
+        # Channel -> motor/servo mixing: (channels, directions) per actuator
+        self.motor_mix = [self._compile_mix(sender.get(f"m{i + 1}", []))
+                          for i in range(2)]
+        self.pwm_mix = [self._compile_mix(sender.get(f"p{i + 1}", []))
+                        for i in range(4)]
+
+        # Servo constants
+        self.pwm_type = [PWM_TYPE_RAW] * 4
+        self.pwm_min = [0] * 4
+        self.pwm_max = [0] * 4
+        self.pwm_bias = [0] * 4
+        pwms_info = self.recv_info.get("pwm", [])
+        for i in range(min(4, len(pwms_info))):
+            if len(pwms_info[i]) != 6:
+                continue
+            _, _, min_value, max_value, bias, pwm_type = pwms_info[i]
+            if pwm_type in ("speed", "pushrod"):
+                self.pwm_type[i] = PWM_TYPE_SPEED
+            elif pwm_type == "angle":
+                self.pwm_type[i] = PWM_TYPE_ANGLE
+            self.pwm_min[i] = min_value
+            self.pwm_max[i] = max_value
+            self.pwm_bias[i] = bias
+
+        # Motor constants, refreshed whenever MotorsController changes them
+        self._compile_motor_params()
+        self._compile_high_speed_params()
+
+        self._compile_output_luts()
+
+        # Effect tables: [channel][event type] -> effects list or None
+        self.adc_effects = []
+        for i in range(6):
+            events = sender.get(f"adc_ch{i + 1}")
+            if isinstance(events, dict):
+                self.adc_effects.append(
+                    [events.get(name) for name in ADC_EVENT_NAMES])
+            else:
+                self.adc_effects.append([None] * 3)
+        self.key_effects = []
+        for i in range(4):
+            events = sender.get(f"key{i + 1}")
+            if isinstance(events, dict):
+                self.key_effects.append(
+                    [events.get(name) for name in KEY_EVENT_NAMES])
+            else:
+                self.key_effects.append([None] * 4)
+
+        self.codes_map = {}
+        self.codes_priority = {}
+        for code in self.recv_info.get("codes", []):
+            if code and code[0] not in self.codes_map:
+                self.codes_map[code[0]] = code[1]
+                self.codes_priority[code[0]] = code[2]
+        # Compile the scripts now rather than when they are triggered
+        self.executor.preload(self.codes_map)
+
+        # TIMELINE choreographies by effect value, the first one counts
+        self.timeline_player.stop()
+        self.timelines = {}
+        for effect, steps in self.recv_info.get("timelines", []):
+            if effect not in self.timelines:
+                self.timelines[effect] = Timeline(
+                    self._timeline_steps(steps, self.recv_info))
+
+        # LED timelines: [channel] -> {effect value: [LEDEffect, ...]}
+        self.led_timelines = [
+            self._compile_led_timelines(
+                i + 1, self.recv_info.get(f"led{i + 1}", []))
+            for i in range(2)]
+
+    def _compile_led_timelines(self, channel, led_events, value=None):
+        """
+        Compiles the LED entries of a channel into keyframe timelines.
+
+        The entries of each effect value become the steps of its timeline,
+        in list order, with `sequence_number` as the LED mask. Identical
+        steps share one compiled effect.
+
+        Args:
+            channel (int): The LED channel, 1 or 2, for the log.
+            led_events (list): The parsed entries of the channel.
+            value (int): Only compile the timeline of this effect value.
+
+        Returns:
+            dict: Effect value -> list of LEDEffect.
+        """
+        timelines = {}
+        steps = {}
+        for effect, sequence_number, mode, rgb_value, repeat_times, time \
+                in led_events:
+            if value is not None and effect != value:
+                continue
+            if not LEDEffect.valid(mode, repeat_times):
+                continue
+            # An int duration keeps the LED timer callback free of float
+            # math
+            key = (mode, int(time * 1000), repeat_times, sequence_number,
+                   rgb_value)
+            step = steps.get(key)
+            if step is None:
+                step = steps[key] = LEDEffect(*key)
+            if effect not in timelines:
+                timelines[effect] = []
+            timelines[effect].append(step)
+        if value is None and steps:
+            logger.info(f"[CTRL]LED_TIMELINES:{channel}:"
+                        f"{len(timelines)} effects, "
+                        f"{len(steps)} steps, "
+                        f"{sum(len(s.table) for s in steps.values())} bytes")
+        return timelines
+
+    def _compile_high_speed_params(self):
+        # Integer forms of the high speed zone settings for the
+        # fixed-point path: duration in ms, threshold scaled by 100
+        for m in range(2):
+            self.high_speed_duration_ms[m] = int(
+                self.high_speed_duration[m] * 1000 + 0.5)
+            self.high_speed_thr_x100[m] = 2048 * (
+                100 - self.tracker_high_speed_zone_pctg[m])
+
+    def _compile_output_luts(self):
+        """
+        Compiles the output transfer functions into lookup tables.
+
+        Each mixed servo (angle or speed type) gets a table from mixed
+        stick value to the encoded servo output, and each motor with
+        Haptic Optimization enabled gets its ACC/LVZ curve as a table.
+        """
+        self.pwm_lut = [None] * 4
+        self.motor_curve = [None] * 2
+        step = 1 << PWM_LUT_SHIFT
+        count = 2 * PWM_LUT_SPAN // step + 1
+        for p in range(4):
+            if self.pwm_mix[p][0] and self.pwm_type[p] != PWM_TYPE_RAW:
+                self.pwm_lut[p] = build_lut(
+                    lambda v: self._pwm_output(p, v),
+                    count, -PWM_LUT_SPAN, step)
+        for m in range(2):
+            if self.enable_advanced_motor_control[m] is True:
+                self.motor_curve[m] = build_lut(
+                    lambda v: self.nonlinear_map(
+                        v, 0,
+                        self.tracker_low_speed_zone_pctg[m] / 100,
+                        self.tracker_accel_default_value[m]),
+                    MOTOR_CURVE_SIZE)
+
+    def _compile_mix(self, controls):
+        channels = array('b')
+        directions = array('b')
+        for channel, direction in controls:
+            channels.append(channel)
+            directions.append(direction)
+        return channels, directions
+
+    def _compile_motor_params(self):
+        self.motor_params_rev = self.motors.params_rev
+        self.motor_bias = [0] * 2
+        self.motor_bias_q8 = [0] * 2
+        self.motor_min_rate = [0] * 2
+        self.motor_max_rate = [0] * 2
+        for i in range(2):
+            offset = self.motors.get_offset(i + 1)
+            self.motor_bias[i] = offset * 2048 / 100
+            self.motor_bias_q8[i] = int(offset * (2048 << SPEED_Q) // 100)
+            self.motor_min_rate[i] = self.motors.get_reverse_rate(i + 1)
+            self.motor_max_rate[i] = self.motors.get_forward_rate(i + 1)
+
+    def _compile_adc_slopes(self):
+        """
+        Compiles the mid values and dead zones of the sticks into the
+        integer form of adc_value_deal(): the dead zone ends and the Q16
+        slope on either side of it, see kernels.adc_value_q().
+        """
+        one = 2048 << kernels.ADC_Q
+        lo_end = array('i', [0] * 6)
+        hi_start = array('i', [0] * 6)
+        lo_q = array('i', [0] * 6)
+        hi_q = array('i', [0] * 6)
+        for i in range(6):
+            mid = int(self.adc_mid_list[i])
+            dz = int(self.adc_deadzone_list[i])
+            lo_end[i] = mid - dz
+            hi_start[i] = mid + dz
+            # An empty side is never used, its slope stays 0
+            span = mid - dz
+            if span > 0:
+                lo_q[i] = (one + span // 2) // span
+            span = ADC_RANGE - mid - dz
+            if span > 0:
+                hi_q[i] = (one + span // 2) // span
+        self.adc_lo_end = lo_end
+        self.adc_hi_start = hi_start
+        self.adc_lo_q = lo_q
+        self.adc_hi_q = hi_q
+
     def set_slaver_idx(self, idx):
         self.receiver_index = idx
 
     def _timer_init(self):
         self.timer0 = Timer(0)
-        self.timer0.init(period=1,
-                         mode=Timer.PERIODIC,
-                         callback=self.timer0_callback)
-        self.tim0_div_cnt = 0
+        self.scheduler = TimerScheduler(self.timer0, self.timer0_callback)
+        # Devices run only while they have something to do: they report
+        # their activity to the scheduler themselves
+        self.servo_task = self._add_device_task(self.servos, SERVO_PERIOD_MS)
+        self.led_tasks = [self._add_device_task(led, LED_PERIOD_MS)
+                          for led in (self.led1, self.led2)]
+        # Watches the CODE scripts for slices that block the event loop
+        self.executor_task = self._add_device_task(self.executor,
+                                                   CODE_WATCHDOG_MS)
+        self.timeline_player = TimelinePlayer(self.scheduler,
+                                              self._timeline_dispatch)
+        self.scheduler.start()
+
+    def _add_device_task(self, device, period_ms):
+        scheduler = self.scheduler
+        task = scheduler.add(device.timing_proc, period_ms, device.active)
+        device.register_activity_cb(
+            lambda en: scheduler.set_active(task, en))
+        return task
 
     def adc_value_deal(self, x, max=4096, mid=2048, dz=200):
+        return kernels.adc_value_deal(x, max, mid, dz)
+
+    def _handle_effect(self, effect, setting, mode="normal", recv=None,
+                       timed=False):
+        profiler = self.profiler
+        if profiler.enabled:
+            start = utime.ticks_us()
+            self._dispatch_effect(effect, setting, mode, recv, timed)
+            profiler.lap(STAGE_EFFECT, start)
+        else:
+            self._dispatch_effect(effect, setting, mode, recv, timed)
 
-        def convert(x, i_min, i_max, o_min, o_max):
-            return (x - i_min) * (o_max - o_min) / (i_max - i_min) + o_min
-
-        if mid - dz <= x <= mid + dz:
-            return 0
-
-        m_mid = max / 2
-
-        if x <= mid:
-            x = convert(x, 0, mid - dz, -m_mid, 0)
-        elif x > mid:
-            x = convert(x, mid + dz, max, 0, m_mid)
-        return x
-
-    def _handle_effect(self, effect, setting, mode="normal", recv=None):
-        logger.info(f"[CTRL][{mode.upper()}]EFFECT: {effect}")
+    def _dispatch_effect(self, effect, setting, mode, recv, timed):
+        # `timed` marks a timeline step, run from the timer: it drives the
+        # outputs itself rather than leaving them to the next loop tick
+        if not timed:
+            # Steps are not logged, their TIMELINE event was
+            logger.info(f"[CTRL][{mode.upper()}]EFFECT: {effect}")
 
         recv_idx = recv if recv is not None else self.receiver_index
+        if setting is self.setting and recv is None:
+            recv_info = self.recv_info
+        else:
+            recv_info = setting.get(f"receiver_{recv_idx}", {})
 
         if not isinstance(effect, int):
             logger.error(f"[CTRL][{mode.upper()}] Type error, need int")
             return
 
-        event_dic = self.parser.parse_event_id(effect)
-        effect_actor_idx = event_dic["actuator"]
-        effect_actor_val = event_dic["value"]
+        effect_actor_idx = self.parser.event_actuator(effect)
+        effect_actor_val = self.parser.event_value(effect)
 
         # MOTORS
         if effect_actor_idx in [Devices.MOTOR_1, Devices.MOTOR_2]:
             motor_idx = effect_actor_idx
-            effect_value = effect_actor_val
+            # Percent to -2047..2047, truncated as set_speed() does
+            speed = 2047 * effect_actor_val
+            speed = speed // 100 if speed >= 0 else -(-speed // 100)
             if mode == "simulation":
-                self.motors_simulation_speed[motor_idx - 1] = 2047 * effect_value / 100
+                self.motors_simulation_speed[motor_idx - 1] = speed
                 self._en_simulation_loop('MOTOR', True)
+                permission = 'EVENT'
             else:
-                self.motors_effect_speed_list[motor_idx - 1] = 2047 * effect_value / 100
+                self.motors_effect_speed_list[motor_idx - 1] = speed
+                # A motor mixed from the sticks ignores its effects
+                permission = None if self.motor_mix[motor_idx - 1][0] \
+                    else 'BEHAVIOR'
+            if timed and permission is not None and \
+                    self.dev_manager.request_permission('MOTOR', permission):
+                self.motors.set_speed(motor_idx, speed)
 
         # LEDS
         elif effect_actor_idx in [Devices.LED_1, Devices.LED_2]:
             number = effect_actor_idx - 2
             effect_value = effect_actor_val
-            led_events = setting[f"receiver_{recv_idx}"].get(f"led{number}", [])
-
-            for effect, sequence_number, mode, rgb_value, repeat_times, time in led_events:
-                if effect == effect_value:
-                    led = self.led1 if number == 1 else self.led2
-                    led.set_led_effect(mode, time * 1000, repeat_times, sequence_number, rgb_value)
+            if recv_info is self.recv_info:
+                timelines = self.led_timelines[number - 1]
+            else:
+                timelines = self._compile_led_timelines(
+                    number, recv_info.get(f"led{number}", []), effect_value)
+            timeline = timelines.get(effect_value)
+            if timeline:
+                led = self.led1 if number == 1 else self.led2
+                led.play_timeline(timeline)
 
         # SERVOS
         elif Devices.PWM_1 <= effect_actor_idx <= Devices.PWM_4:
             pwm_idx = effect_actor_idx - 4
-            pwm_config = setting.get(f"receiver_{recv_idx}", {}).get("pwm", [])
+            pwm_config = recv_info.get("pwm", [])
 
             if pwm_idx - 1 < len(pwm_config):
                 initial_value, vel, min_value, max_value, bias, pwm_type = pwm_config[pwm_idx - 1]
@@ -663,84 +1100,79 @@ class BBL_Controller:
             if mode == "simulation":
                 self.servo_simulation_data[pwm_idx - 1] = effect_value
                 self._en_simulation_loop('SERVO', True)
+                permission = 'EVENT'
             else:
                 self.servos_effect_data_list[pwm_idx - 1] = effect_value
+                # A servo mixed from the sticks ignores its effects
+                permission = None if self.pwm_mix[pwm_idx - 1][0] \
+                    else 'BEHAVIOR'
+            if timed and permission is not None and \
+                    self.dev_manager.request_permission('SERVO', permission):
+                # As simulation_effect_handle() and handler() drive them
+                is_angle_servo = effect_value % 10
+                if is_angle_servo == 1 and permission == 'EVENT':
+                    self.servos.set_angle(pwm_idx, effect_value // 10)
+                elif is_angle_servo == 1:
+                    self.servos.set_angle_stepping(pwm_idx,
+                                                   effect_value // 10)
+                elif is_angle_servo == 0:
+                    self.servos.set_speed(pwm_idx, effect_value // 10)
 
         # CODE
         elif effect_actor_idx == Devices.CODE_EXEC:
-            self._code_effect_trig(effect_actor_val, setting)
-
-    def analog_effect_cb(self, index, effect_type):
-        try:
-            effects = self.setting["sender"][f"adc_ch{index + 1}"][effect_type]
-            if effects:
-                logger.info(f"[CTRL]ANALOG_CH:{index} {effect_type}:{effects}")
-        except Exception:
-            return
+            self._code_effect_trig(effect_actor_val, setting, recv_info)
 
-        effect_list_map = {
-            "equal_mid": self.adc_equal_effects_list,
-            "above_mid": self.adc_above_effects_list,
-            "below_mid": self.adc_below_effects_list
-        }
+        # TIMELINE
+        elif effect_actor_idx == Devices.TIMELINE:
+            self._timeline_effect_trig(effect_actor_val, setting, recv_info,
+                                       mode, recv)
 
-        effect_list = effect_list_map.get(effect_type)
-        if not effect_list:
+    def analog_effect_cb(self, index, effect_type):
+        effects = self.adc_effects[index][effect_type]
+        if not effects:
             return
+        logger.info(f"[CTRL]ANALOG_CH:{index} "
+                    f"{ADC_EVENT_NAMES[effect_type]}:{effects}")
+        self._cycle_effects(self.adc_effects_lists[effect_type][index],
+                            effects)
 
+    def _cycle_effects(self, cycle_list, effects):
         for effects_index, effect_arr in enumerate(effects):
-            org_effect = effect_list[index].get_items(effects_index)
+            org_effect = cycle_list.get_items(effects_index)
             if org_effect != effect_arr:
-                effect_list[index].set_items(effects_index, effect_arr)
-            effect = effect_list[index].get_next_item(effects_index)
+                cycle_list.set_items(effects_index, effect_arr)
+            effect = cycle_list.get_next_item(effects_index)
             self._handle_effect(effect, self.setting)
 
     def _analog_equal_mid_cb(self, index):
-        self.analog_effect_cb(index, "equal_mid")
+        self.analog_effect_cb(index, ADC_EQUAL_MID)
 
     def _analog_above_mid_cb(self, index):
-        self.analog_effect_cb(index, "above_mid")
+        self.analog_effect_cb(index, ADC_ABOVE_MID)
 
     def _analog_below_mid_cb(self, index):
-        self.analog_effect_cb(index, "below_mid")
+        self.analog_effect_cb(index, ADC_BELOW_MID)
 
     def _button_effect_cb(self, btn_idx, effect_type):
-        try:
-            effects = self.setting["sender"][f"key{btn_idx + 1}"][effect_type]
-            if effects:
-                logger.info(f"[CTRL]BTN:{btn_idx} {effect_type}:{effects}")
-        except Exception:
-            return
-
-        effect_list_map = {
-            "long": self.key_long_effects_list,
-            "short": self.key_short_effects_list,
-            "down": self.key_down_effects_list,
-            "release": self.key_up_effects_list
-        }
-
-        effect_list = effect_list_map.get(effect_type)
-        if not effect_list:
+        effects = self.key_effects[btn_idx][effect_type]
+        if not effects:
             return
-
-        for effects_index, effect_arr in enumerate(effects):
-            org_effect = effect_list[btn_idx].get_items(effects_index)
-            if org_effect != effect_arr:
-                effect_list[btn_idx].set_items(effects_index, effect_arr)
-            effect = effect_list[btn_idx].get_next_item(effects_index)
-            self._handle_effect(effect, self.setting)
+        logger.info(f"[CTRL]BTN:{btn_idx} "
+                    f"{KEY_EVENT_NAMES[effect_type]}:{effects}")
+        self._cycle_effects(self.key_effects_lists[effect_type][btn_idx],
+                            effects)
 
     def _button_long_cb(self, btn_idx):
-        self._button_effect_cb(btn_idx, "long")
+        self._button_effect_cb(btn_idx, KEY_LONG)
 
     def _button_short_cb(self, btn_idx):
-        self._button_effect_cb(btn_idx, "short")
+        self._button_effect_cb(btn_idx, KEY_SHORT)
 
     def _button_press_cb(self, btn_idx):
-        self._button_effect_cb(btn_idx, "down")
+        self._button_effect_cb(btn_idx, KEY_DOWN)
 
     def _button_up_cb(self, btn_idx):
-        self._button_effect_cb(btn_idx, "release")
+        self._button_effect_cb(btn_idx, KEY_RELEASE)
 
     def _update_advanced_config(self):
         """
@@ -780,20 +1212,24 @@ class BBL_Controller:
             logger.warn("[CTRL]Settings or RC data cannot be None")
             return 0
 
-        bias = self.motors.get_offset(motor_index)
-        min_value = self.motors.get_reverse_rate(motor_index)
-        max_value = self.motors.get_forward_rate(motor_index)
+        m = motor_index - 1
+        if self.motors.params_rev != self.motor_params_rev:
+            self._compile_motor_params()
+        bias = self.motor_bias[m]
+        min_value = self.motor_min_rate[m]
+        max_value = self.motor_max_rate[m]
+        channels, directions = self.motor_mix[m]
+        adv_en = self.enable_advanced_motor_control[m]
 
-        bias = bias * 2048 / 100
-        motors_control = self.setting["sender"].get(f"m{motor_index}", [])
-
-        if motors_control is [] or not isinstance(motors_control, list):
-            return 0
+        if self.fixed_point:
+            return self._motor_speed_fixed(rc_data, m, adv_en)
 
         rc_value = 0
-        for channel, direction in motors_control:
+        for k in range(len(channels)):
+            channel = channels[k]
+            direction = directions[k]
             # advance control (hign zone)
-            if self.enable_advanced_motor_control[motor_index - 1] is True:
+            if adv_en is True:
                 if abs(rc_data[channel]) <= abs(
                         self.adv_last_rc_data[channel]):
                     lite_rc_data = rc_data[channel]
@@ -803,7 +1239,7 @@ class BBL_Controller:
                     self.adv_ctrl_last_tar_speed[channel], \
                     self.adv_ctrl_elapsed_time[channel] = \
                     self.high_speed_zone_map_handler(
-                        motor_index - 1,
+                        m,
                         self.adv_cur_rc_data[channel],
                         lite_rc_data,
                         self.adv_ctrl_last_tar_speed[channel],
@@ -824,91 +1260,249 @@ class BBL_Controller:
             motor_speed = self.get_valid_value(motor_speed, -2047, 2047)
             return int(-abs(motor_speed))
 
-    def _servo_handler(self, rc_data, pwm_index):
-        initial_value, speed, min_value, max_value, bias, pwm_type = self.setting[
-            f"receiver_{self.receiver_index}"]["pwm"][pwm_index - 1]
-
-        # initial_value = initial_value * 2048 / 100
+    def _motor_speed_fixed(self, rc_data, m, adv_en):
+        # motor_speed_calculate() with integer math only
+        channels, directions = self.motor_mix[m]
+        rc_value = 0
+        for k in range(len(channels)):
+            channel = channels[k]
+            value = int(rc_data[channel])
+            if adv_en is True:
+                target = self.adv_last_rc_data[channel]
+                if abs(value) <= abs(target):
+                    target = value
+                self._high_speed_zone_step(m, channel, target)
+                self.adv_last_rc_data[channel] = value
+                rc_value += self.adv_cur_rc_data[channel] * directions[k]
+            else:
+                rc_value += value * directions[k]
+
+        v = (rc_value << SPEED_Q) + self.motor_bias_q8[m]
+        if v >= 0:
+            speed = v * self.motor_max_rate[m] // (100 << SPEED_Q)
+            return speed if speed < 2047 else 2047
+        speed = -v * self.motor_min_rate[m] // (100 << SPEED_Q)
+        return -speed if speed < 2047 else -2047
+
+    def _high_speed_zone_step(self, m, ch, target):
+        # high_speed_zone_map_handler() for one channel, in place, with
+        # the current speed in Q8 and the elapsed time in ms
+        elapsed = self.adv_ctrl_elapsed_ms[ch]
+        duration = self.high_speed_duration_ms[m]
+        if abs(self.adv_ctrl_last_tar_speed[ch] - target) > \
+                self.update_tar_speed_threshold or elapsed > duration:
+            elapsed = 0
+        if abs(target) * 100 > self.high_speed_thr_x100[m]:
+            cur = kernels.high_speed_map_q(self.adv_cur_q8[ch], target,
+                                           elapsed, duration,
+                                           self.cycle_time_ms)
+        else:
+            cur = target << SPEED_Q
+        self.adv_cur_q8[ch] = cur
+        self.adv_cur_rc_data[ch] = cur >> SPEED_Q if cur >= 0 \
+            else -(-cur >> SPEED_Q)
+        self.adv_ctrl_last_tar_speed[ch] = target
+        self.adv_ctrl_elapsed_ms[ch] = elapsed + self.cycle_time_ms
 
-        pwm_control = self.setting["sender"][f"p{pwm_index}"]
+    def _servo_handler(self, rc_data, pwm_index):
+        p = pwm_index - 1
+        channels, directions = self.pwm_mix[p]
 
-        if pwm_control == []:  # is angle servo
-            return self.servos_effect_data_list[pwm_index - 1]
+        if not channels:  # is angle servo
+            return self.servos_effect_data_list[p]
         if rc_data is None or self.setting is None:  # is speed servo
             return 0
 
         rc_value = 0
-        for channel, direction in pwm_control:
-            rc_value += rc_data[channel] * direction
+        for k in range(len(channels)):
+            rc_value += rc_data[channels[k]] * directions[k]
 
-        if pwm_type in ("speed", "pushrod"):
+        lut = self.pwm_lut[p]
+        if lut is not None and -PWM_LUT_SPAN <= rc_value <= PWM_LUT_SPAN:
+            return lut[int(rc_value + PWM_LUT_SPAN + (1 << (
+                PWM_LUT_SHIFT - 1))) >> PWM_LUT_SHIFT]
+        return self._pwm_output(p, rc_value)
+
+    def _pwm_output(self, p, rc_value):
+        """
+        Maps a mixed stick value to the encoded servo output.
+
+        This is the reference the servo tables are built from: the result
+        is the speed (x10) or the angle (x10 + 1) of the servo.
+        """
+        pwm_type = self.pwm_type[p]
+        min_value = self.pwm_min[p]
+        max_value = self.pwm_max[p]
+
+        if pwm_type == PWM_TYPE_SPEED:
             if rc_value <= 0:
                 rc_value = rc_value * min_value / 2048
             else:
                 rc_value = rc_value * max_value / 2048
             rc_value = self.get_valid_value(rc_value, -100, 100)
             rc_value = (round(rc_value)) * 10 + 0
-        elif pwm_type == "angle":
+        elif pwm_type == PWM_TYPE_ANGLE:
             rc_value = (rc_value * (max_value - min_value) /
-                        4096) + bias + (max_value + min_value)/2
+                        4096) + self.pwm_bias[p] + (max_value + min_value)/2
             rc_value = self.get_valid_value(rc_value, 0, 180)
             rc_value = (round(rc_value)) * 10 + 1
         return int(rc_value)
 
-    def _code_effect_trig(self, code_idx, setting):
-        recv_info = setting.get(f"receiver_{self.receiver_index}", {})
+    def _code_effect_trig(self, code_idx, setting, recv_info=None):
+        if setting is self.setting:
+            cmd = self.codes_map.get(code_idx)
+            if cmd is not None:
+                self.executor.run(cmd, code_idx,
+                                  self.codes_priority[code_idx])
+            return
+
+        if recv_info is None:
+            recv_info = setting.get(f"receiver_{self.receiver_index}", {})
         codes = recv_info.get("codes", [])
         for code in codes:
             if code[0] == code_idx:
-                cmd = code[1]
-                self.executor.run(cmd)
+                self.executor.run(code[1], None, code[2])
                 return
 
-    def handler(self, setting, index, remote_data):
+    def _timeline_effect_trig(self, timeline_idx, setting, recv_info,
+                              mode="normal", recv=None):
+        if recv_info is self.recv_info:
+            timeline = self.timelines.get(timeline_idx)
+        else:
+            timeline = None
+            for effect, steps in recv_info.get("timelines", []):
+                if effect == timeline_idx:
+                    timeline = Timeline(
+                        self._timeline_steps(steps, recv_info))
+                    break
+        if timeline is not None:
+            # Its steps act on the configuration it came from
+            self.timeline_player.play(timeline, (setting, mode, recv))
+
+    def _timeline_steps(self, steps, recv_info):
+        """
+        Drops the timeline steps the receiver cannot play.
+
+        Steps run from the device timer, so a PWM output missing from the
+        receiver configuration is caught here rather than when it plays.
+
+        Args:
+            steps (list): [offset_ms, event_id] pairs.
+            recv_info (dict): The receiver configuration.
+
+        Returns:
+            list: The playable steps.
+        """
+        pwm_count = len(recv_info.get("pwm", []))
+        valid = []
+        for step in steps:
+            actuator = self.parser.event_actuator(step[1])
+            if (Devices.PWM_1 <= actuator <= Devices.PWM_4 and
+                    actuator - Devices.PWM_1 >= pwm_count):
+                logger.warn(f"[CTRL]TIMELINE_STEP_SKIP:{step[1]}")
+                continue
+            valid.append(step)
+        return valid
+
+    def _timeline_dispatch(self, event, source):
+        # Runs in the timer task: an error must not reach the scheduler
+        setting, mode, recv = source
+        try:
+            self._handle_effect(event, setting, mode, recv, True)
+        except Exception as e:
+            logger.error(f"[CTRL]TIMELINE_STEP_ERR:{event}: {e}")
+
+    def handler(self, setting, index, remote_data, generation=None):
+        """
+        Runs one control tick.
+
+        Args:
+            setting (dict): The parsed configuration.
+            index (int): The active receiver index.
+            remote_data (list): The raw RC data, normalised in place.
+            generation (int, optional): Identity of `setting`, bumped by
+                the caller on every reload. When given, config changes are
+                detected with an integer compare instead of a deep
+                comparison of the whole setting.
+        """
         if index == 0:
             logger.error(f"[CTRL]KeyError: receiver_{index}")
             return
+        index_changed = index != self.receiver_index
         self.receiver_index = index
 
-        if setting == {} or (not isinstance(setting, dict)):
+        if not isinstance(setting, dict) or not setting:
             return
 
-        if setting != self.setting:
+        if generation is None:
+            setting_changed = setting != self.setting
+        else:
+            setting_changed = generation != self.setting_gen
+        if index_changed or setting_changed:
             self.update_setting(setting)
+            self.setting_gen = generation
 
+        # Before the sticks are normalised in place
+        self.rc_stream.publish(remote_data)
+
+        profiler = self.profiler
+        prof = profiler.enabled
+        if prof:
+            t = utime.ticks_us()
+
+        adc_value_q = kernels.adc_value_q
+        lo_end = self.adc_lo_end
+        hi_start = self.adc_hi_start
+        lo_q = self.adc_lo_q
+        hi_q = self.adc_hi_q
         for i in range(6):
-            remote_data[i] = self.adc_value_deal(
-                remote_data[i],
-                4096,
-                self.adc_mid_list[i],
-                self.adc_deadzone_list[i]
-            )
+            x = remote_data[i]
+            if 0 <= x < ADC_RANGE:
+                remote_data[i] = adc_value_q(x, lo_end[i], hi_start[i],
+                                             lo_q[i], hi_q[i])
+            else:
+                remote_data[i] = self.adc_value_deal(
+                    x,
+                    4096,
+                    self.adc_mid_list[i],
+                    self.adc_deadzone_list[i]
+                )
+        if prof:
+            t = profiler.lap(STAGE_ADC, t)
 
         # Trigger median event
+        cmp_mid = self.analog_cmp_mid
         for ch_idx in range(6):
-            if remote_data[ch_idx] == 0 and self.analog_cmp_mid[
-                    ch_idx] != "equal":
+            if remote_data[ch_idx] == 0 and cmp_mid[
+                    ch_idx] != ADC_EQUAL_MID:
                 self._analog_equal_mid_cb(ch_idx)
-                self.analog_cmp_mid[ch_idx] = "equal"
-            elif remote_data[ch_idx] < 0 and self.analog_cmp_mid[
-                    ch_idx] != "below":
+                cmp_mid[ch_idx] = ADC_EQUAL_MID
+            elif remote_data[ch_idx] < 0 and cmp_mid[
+                    ch_idx] != ADC_BELOW_MID:
                 self._analog_below_mid_cb(ch_idx)
-                self.analog_cmp_mid[ch_idx] = "below"
-            elif remote_data[ch_idx] > 0 and self.analog_cmp_mid[
-                    ch_idx] != "above":
+                cmp_mid[ch_idx] = ADC_BELOW_MID
+            elif remote_data[ch_idx] > 0 and cmp_mid[
+                    ch_idx] != ADC_ABOVE_MID:
                 self._analog_above_mid_cb(ch_idx)
-                self.analog_cmp_mid[ch_idx] = "above"
+                cmp_mid[ch_idx] = ADC_ABOVE_MID
+        if prof:
+            t = profiler.lap(STAGE_MID, t)
 
         if self.dev_manager.request_permission('MOTOR', 'BEHAVIOR'):
             for motor_idx in range(1, 3):
                 res_speed = 0
-                if self.setting["sender"][f"m{motor_idx}"] == []:
+                if not self.motor_mix[motor_idx - 1][0]:
                     # If it is not for behavioral control
                     res_speed = self.motors_effect_speed_list[motor_idx - 1]
                 else:
                     # If it's behavioral control
                     _speed = self.motor_speed_calculate(remote_data, motor_idx)
-                    if self.enable_advanced_motor_control[motor_idx-1] is True:
+                    curve = self.motor_curve[motor_idx - 1]
+                    if curve is not None and \
+                            -MOTOR_CURVE_SIZE < _speed < MOTOR_CURVE_SIZE:
+                        res_speed = curve[_speed] if _speed >= 0 \
+                            else -curve[-_speed]
+                    elif self.enable_advanced_motor_control[motor_idx-1] is True:
                         res_speed = self.nonlinear_map(
                             _speed, 0,
                             self.tracker_low_speed_zone_pctg[motor_idx-1]/100,
@@ -916,20 +1510,28 @@ class BBL_Controller:
                     else:
                         res_speed = _speed
                 self.motors.set_speed(motor_idx, res_speed)
+        if prof:
+            t = profiler.lap(STAGE_MOTOR, t)
 
         if self.dev_manager.request_permission('SERVO', 'BEHAVIOR'):
             for i in range(1, 5):
                 effect = self._servo_handler(remote_data, i)
                 is_angle_servo = effect % 10
+                # Negative outputs are multiples of 10: // truncates too
                 if is_angle_servo == 1:
-                    self.servos.set_angle_stepping(i, (int)(effect / 10))
+                    self.servos.set_angle_stepping(i, effect // 10)
                 elif is_angle_servo == 0:
-                    self.servos.set_speed(i, (int)(effect / 10))
+                    self.servos.set_speed(i, effect // 10)
+        if prof:
+            t = profiler.lap(STAGE_SERVO, t)
 
-        self.button_handler.check_buttons(remote_data[6:])
+        self.button_handler.check_buttons(remote_data, 6)
+        if prof:
+            profiler.lap(STAGE_BUTTON, t)
 
     def stop(self, permission=None):
         if permission is None:
+            self.timeline_player.stop()
             self.servos_effect_data_list = [0] * 4
             self.motors_effect_speed_list = [0] * 2
 
@@ -939,6 +1541,12 @@ class BBL_Controller:
                 self.servos.stop(i)
             return
 
+        source = self.timeline_player.source
+        if permission == 'BEHAVIOR' and source is not None and \
+                source[1] != "simulation":
+            # Its steps would drive the outputs stopped here
+            self.timeline_player.stop()
+
         if self.dev_manager.request_permission('MOTOR', permission):
             speed_map = {
                 'BEHAVIOR': self.motors_effect_speed_list,
@@ -961,6 +1569,8 @@ class BBL_Controller:
         self.stop(permission)
 
         self.setting = {}
+        self.setting_gen = None
+        self._compile_plan()
         self.servos_effect_data_list = [0] * 4
         self.motors_effect_speed_list = [0] * 2
         self.servo_simulation_data = [0] * 4
@@ -977,14 +1587,13 @@ class BBL_Controller:
         return min(max(value, min_val), max_val)
 
     def timer0_callback(self, timer):
-
-        if self.tim0_div_cnt == 0:
-            self.servos.timing_proc()
-            for dev in self.d_ch_map:
-                if dev is not None:
-                    dev.timing_proc()
-
-        self.tim0_div_cnt = (self.tim0_div_cnt + 1) % 10
+        profiler = self.profiler
+        if profiler.enabled:
+            start = utime.ticks_us()
+            self.scheduler.fire()
+            profiler.lap(STAGE_TIMER, start)
+        else:
+            self.scheduler.fire()
 
     def _high_speed_map(self,
                         current_speed,
@@ -1028,17 +1637,6 @@ class BBL_Controller:
 
         return new_speed if target_speed >= 0 else -new_speed
 
-    def _low_speed_map(self, value, start, end, rate):
-        # Ensure that the input value is within the specified range
-        if value <= start + 1:
-            return 0
-        elif value >= end:
-            return 2047
-
-        mapped_value = rate * ((value - start)**2) / (2 * (end - start))
-        # mapped_value = rate * math.log(value - start) * (end - start)
-        return int(mapped_value)
-
     def high_speed_zone_map_handler(self,
                                     motor_idx,
                                     current_speed,
@@ -1070,27 +1668,8 @@ class BBL_Controller:
                       dead_zone=500,
                       low_speed_percentage=0.5,
                       linear_rate=1.5):
-        THRESHOLD = 2047
-        speed = abs(set_speed)
-        # The output is 0 in the dead zone
-        if (speed) < dead_zone:
-            return 0
-        if speed > THRESHOLD:
-            speed = THRESHOLD
-
-        # Calculate the threshold value for the slow phase
-        low_speed_threshold = dead_zone + (
-            2048 - 2 * dead_zone) * low_speed_percentage
-
-        tracker_speed = self._low_speed_map(
-            min(speed, low_speed_threshold - 1), dead_zone,
-            low_speed_threshold, linear_rate)
-        if speed >= low_speed_threshold:  # Medium and high speed section
-            tracker_speed = tracker_speed + (speed -
-                                             low_speed_threshold) * linear_rate
-
-        tracker_speed = min(tracker_speed, THRESHOLD)
-        return int(tracker_speed if set_speed >= 0 else -tracker_speed)
+        return kernels.nonlinear_map(set_speed, dead_zone,
+                                     low_speed_percentage, linear_rate)
 
     def _executor_final_cb(self):
         self.dev_manager.set_device_permission('MOTOR', 'BEHAVIOR')
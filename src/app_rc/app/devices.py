@@ -20,6 +20,7 @@ class Devices:
     BUZZER_1 = 9
     BUZZER_2 = 10
     CODE_EXEC = 11
+    TIMELINE = 12
 
     _max_value = max(v for k, v in locals().items() if isinstance(v, int))
 
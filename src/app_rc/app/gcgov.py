@@ -0,0 +1,148 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+import gc
+from utime import ticks_us, ticks_diff
+
+__all__ = ["GcGovernor"]
+
+GC_THRESHOLD_DIV = 4   # gc.threshold() is the heap size / GC_THRESHOLD_DIV
+GC_TRIGGER_DIV = 2     # Collect when idle after threshold / GC_TRIGGER_DIV
+GC_MARGIN_US = 1000    # Slack left over after an idle collection
+
+
+class GcGovernor:
+    """
+    Moves the garbage collections of the receiver into idle time.
+
+    MicroPython collects whenever an allocation finds the heap full,
+    which may be in the middle of a control tick. The governor sets
+    gc.threshold() as a backstop and collects in the slack after a tick
+    instead: once enough has been allocated since the last collection,
+    and only if the last pause fits before the next deadline.
+
+    Statistics, reset by reset_stats():
+        collections (int): Collections run by the governor.
+        idle_count (int): Of those, collections run by idle().
+        unscheduled (int): Collections seen from outside of the governor,
+            by the threshold, a full heap or an explicit gc.collect().
+        deferred (int): Ticks that put off a due collection for lack of
+            slack.
+        pause_max (int): Longest governor collection, in us.
+        pause_sum (int): Total governor collection time, in us.
+    """
+
+    def __init__(self, margin_us=GC_MARGIN_US):
+        """
+        Initializes the GcGovernor instance, disabled.
+
+        Args:
+            margin_us (int): Time that must be left before the next
+                deadline after an idle collection.
+        """
+        self.enabled = False
+        self.margin_us = margin_us
+        self.threshold = 0
+        self.trigger = 0
+        self.pause_est = 0
+        self.base = 0
+        self.last = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the statistics."""
+        self.collections = 0
+        self.idle_count = 0
+        self.unscheduled = 0
+        self.deferred = 0
+        self.pause_max = 0
+        self.pause_sum = 0
+
+    def enable(self, en=True):
+        """
+        Enables or disables the governor.
+
+        Enabling collects once, to measure the pause, and sets the
+        allocation threshold from the heap size.
+
+        Args:
+            en (bool): True to enable.
+        """
+        if en:
+            heap = gc.mem_alloc() + gc.mem_free()
+            self.threshold = heap // GC_THRESHOLD_DIV
+            self.trigger = self.threshold // GC_TRIGGER_DIV
+            gc.threshold(self.threshold)
+            self.collect()
+        else:
+            gc.threshold(-1)
+        self.enabled = en
+
+    def collect(self):
+        """
+        Collects now and records the pause.
+
+        Returns:
+            int: The pause in us.
+        """
+        start = ticks_us()
+        gc.collect()
+        pause = ticks_diff(ticks_us(), start)
+        self.collections += 1
+        self.pause_sum += pause
+        if pause > self.pause_max:
+            self.pause_max = pause
+        # Track rises at once, decays slowly
+        if pause > self.pause_est:
+            self.pause_est = pause
+        else:
+            self.pause_est = (self.pause_est * 3 + pause) >> 2
+        self.base = self.last = gc.mem_alloc()
+        return pause
+
+    def idle(self, slack_us):
+        """
+        Collects if a collection is due and fits into the slack.
+
+        Call right after a control tick.
+
+        Args:
+            slack_us (int): Time until the next deadline.
+
+        Returns:
+            bool: True if a collection ran.
+        """
+        if not self.enabled:
+            return False
+        alloc = gc.mem_alloc()
+        if alloc < self.last:
+            # The heap shrank behind our back
+            self.unscheduled += 1
+            self.base = alloc
+        self.last = alloc
+        if alloc - self.base < self.trigger:
+            return False
+        if slack_us < self.pause_est + self.margin_us:
+            self.deferred += 1
+            return False
+        self.collect()
+        self.idle_count += 1
+        return True
+
+    def report(self):
+        """
+        Formats the statistics for the log.
+
+        Returns:
+            str: Governor, idle, unscheduled and deferred collections,
+            mean and worst pause in us, and the free heap.
+        """
+        count = self.collections if self.collections else 1
+        return "gc:%d idle:%d unscheduled:%d deferred:%d pause:%d/%d " \
+            "free:%d" % (self.collections, self.idle_count, self.unscheduled,
+                         self.deferred, self.pause_sum // count,
+                         self.pause_max, gc.mem_free())
@@ -0,0 +1,290 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+import gc
+
+__all__ = ["JsonStream", "load_rc_config"]
+
+CHUNK_SIZE = 512
+
+_WS = (0x20, 0x09, 0x0D, 0x0A)
+_NUM = (0x2B, 0x2D, 0x2E, 0x30, 0x31, 0x32, 0x33, 0x34,
+        0x35, 0x36, 0x37, 0x38, 0x39, 0x45, 0x65)
+_ESCAPES = {
+    0x22: 0x22, 0x5C: 0x5C, 0x2F: 0x2F, 0x62: 0x08,
+    0x66: 0x0C, 0x6E: 0x0A, 0x72: 0x0D, 0x74: 0x09
+}
+
+
+class JsonStream:
+    """
+    A pull parser reading JSON from a file through a fixed-size buffer.
+
+    Values can either be materialised with read_value() or skipped with
+    skip_value(); skipped subtrees never reach the heap. The peak heap use
+    seen while parsing is tracked in `peak` (bytes above the start level).
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        """
+        Initializes the JsonStream instance.
+
+        Args:
+            f (file): A file opened in binary mode.
+            chunk_size (int): Size of the preallocated read buffer.
+        """
+        self.f = f
+        self.buf = bytearray(chunk_size)
+        self.mv = memoryview(self.buf)
+        self.pos = 0
+        self.end = 0
+        self.base = gc.mem_alloc()
+        self.peak = 0
+
+    def _sample(self):
+        used = gc.mem_alloc() - self.base
+        if used > self.peak:
+            self.peak = used
+
+    def _fill(self):
+        self._sample()
+        self.pos = 0
+        self.end = self.f.readinto(self.buf) or 0
+        return self.end
+
+    def _peek(self):
+        if self.pos >= self.end and not self._fill():
+            raise ValueError("unexpected end of JSON")
+        return self.buf[self.pos]
+
+    def _next(self):
+        c = self._peek()
+        self.pos += 1
+        return c
+
+    def _skip_ws(self):
+        while True:
+            c = self._peek()
+            if c not in _WS:
+                return c
+            self.pos += 1
+
+    def _expect(self, c):
+        if self._skip_ws() != c:
+            raise ValueError("expected '%s'" % chr(c))
+        self.pos += 1
+
+    def _read_literal(self, word, value):
+        for c in word:
+            if self._next() != c:
+                raise ValueError("bad literal")
+        return value
+
+    def _scan_string(self, out):
+        # Consume string bytes up to and including the closing quote,
+        # appending them to `out` unless it is None
+        while True:
+            if self.pos >= self.end and not self._fill():
+                raise ValueError("unterminated string")
+            buf = self.buf
+            pos = self.pos
+            end = self.end
+            start = pos
+            c = 0
+            while pos < end:
+                c = buf[pos]
+                if c == 0x22 or c == 0x5C:
+                    break
+                pos += 1
+            if out is not None and pos > start:
+                out.extend(self.mv[start:pos])
+            if pos >= end:
+                self.pos = end
+                continue
+            self.pos = pos + 1
+            if c == 0x22:
+                return
+            self._read_escape(out)
+
+    def _read_escape(self, out):
+        c = self._next()
+        if c == 0x75:  # \uXXXX
+            code = 0
+            for _ in range(4):
+                code = (code << 4) | int(chr(self._next()), 16)
+            if out is not None:
+                out.extend(chr(code).encode())
+        elif c in _ESCAPES:
+            if out is not None:
+                out.append(_ESCAPES[c])
+        else:
+            raise ValueError("bad escape")
+
+    def read_string(self):
+        """
+        Reads a JSON string, the stream must be at its opening quote.
+
+        Returns:
+            str: The decoded string.
+        """
+        self._expect(0x22)
+        out = bytearray()
+        self._scan_string(out)
+        return str(out, "utf-8")
+
+    def _read_number(self):
+        out = bytearray()
+        while True:
+            if self.pos >= self.end and not self._fill():
+                break
+            c = self.buf[self.pos]
+            if c not in _NUM:
+                break
+            out.append(c)
+            self.pos += 1
+        text = str(out, "utf-8")
+        for c in ".eE":
+            if c in text:
+                return float(text)
+        return int(text)
+
+    def iter_object(self):
+        """
+        Iterates over the keys of the JSON object at the stream position.
+
+        After each key is yielded, the caller must consume its value with
+        read_value() or skip_value() before resuming the iteration.
+
+        Yields:
+            str: The object keys.
+        """
+        self._expect(0x7B)  # {
+        if self._skip_ws() == 0x7D:
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self._expect(0x3A)  # :
+            yield key
+            c = self._skip_ws()
+            self.pos += 1
+            if c == 0x7D:
+                return
+            if c != 0x2C:
+                raise ValueError("expected ',' or '}'")
+            self._skip_ws()
+
+    def read_value(self):
+        """
+        Reads and materialises the JSON value at the stream position.
+
+        Returns:
+            The decoded value (dict, list, str, int, float, bool or None).
+        """
+        c = self._skip_ws()
+        if c == 0x7B:  # {
+            obj = {}
+            for key in self.iter_object():
+                obj[key] = self.read_value()
+            self._sample()
+            return obj
+        if c == 0x5B:  # [
+            self.pos += 1
+            lst = []
+            if self._skip_ws() == 0x5D:
+                self.pos += 1
+                return lst
+            while True:
+                lst.append(self.read_value())
+                c = self._skip_ws()
+                self.pos += 1
+                if c == 0x5D:
+                    break
+                if c != 0x2C:
+                    raise ValueError("expected ',' or ']'")
+            self._sample()
+            return lst
+        if c == 0x22:
+            return self.read_string()
+        if c == 0x74:
+            return self._read_literal(b"true", True)
+        if c == 0x66:
+            return self._read_literal(b"false", False)
+        if c == 0x6E:
+            return self._read_literal(b"null", None)
+        return self._read_number()
+
+    def skip_value(self):
+        """
+        Skips the JSON value at the stream position without building it.
+        """
+        c = self._skip_ws()
+        if c == 0x22:
+            self.pos += 1
+            self._scan_string(None)
+            return
+        if c != 0x7B and c != 0x5B:
+            # Scalars: consume up to the next delimiter
+            while True:
+                if self.pos >= self.end and not self._fill():
+                    return
+                c = self.buf[self.pos]
+                if c == 0x2C or c == 0x7D or c == 0x5D or c in _WS:
+                    return
+                self.pos += 1
+        depth = 0
+        while True:
+            if self.pos >= self.end and not self._fill():
+                raise ValueError("unexpected end of JSON")
+            c = self.buf[self.pos]
+            self.pos += 1
+            if c == 0x22:
+                self._scan_string(None)
+                continue
+            if c == 0x7B or c == 0x5B:
+                depth += 1
+            elif c == 0x7D or c == 0x5D:
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def load_rc_config(path, slave_idx, chunk_size=CHUNK_SIZE):
+    """
+    Loads the parts of rc_config needed by the active receiver.
+
+    Only `sender.channels`, `sender.auto_sleep` and `receiver_<slave_idx>`
+    are materialised; every other subtree is skipped in the stream. The
+    result has the same shape DataParser.parse expects from ujson.load.
+
+    Args:
+        path (str): Path of the JSON configuration file.
+        slave_idx (int): The active receiver index.
+        chunk_size (int): Size of the preallocated read buffer.
+
+    Returns:
+        tuple: (config dict, peak heap bytes used while loading)
+    """
+    recv_key = "receiver_%d" % slave_idx
+    conf = {}
+    with open(path, "rb") as f:
+        js = JsonStream(f, chunk_size)
+        for key in js.iter_object():
+            if key == "sender":
+                sender = {}
+                for sub_key in js.iter_object():
+                    if sub_key == "channels" or sub_key == "auto_sleep":
+                        sender[sub_key] = js.read_value()
+                    else:
+                        js.skip_value()
+                conf[key] = sender
+            elif key == recv_key:
+                conf[key] = js.read_value()
+            else:
+                js.skip_value()
+        js._sample()
+    return conf, js.peak
@@ -0,0 +1,67 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+from array import array
+
+__all__ = ["build_lut",
+           "lut_max_error"]
+
+
+def _to_int(value):
+    # Round to the nearest int, but never turn a non-zero value into 0:
+    # the sign drives the stick mid-point events
+    res = int(value + 0.5) if value >= 0 else -int(-value + 0.5)
+    if res == 0 and value != 0:
+        res = 1 if value > 0 else -1
+    return res
+
+
+def build_lut(func, count, start=0, step=1):
+    """
+    Samples a transfer function into a lookup table.
+
+    Entry i holds func(start + i * step), rounded to an int.
+
+    Args:
+        func (function): The transfer function, called with one int.
+        count (int): Number of entries.
+        start (int): Input of the first entry.
+        step (int): Input distance between two entries.
+
+    Returns:
+        array: `count` 'h' entries.
+    """
+    table = array('h')
+    for i in range(count):
+        table.append(_to_int(func(start + i * step)))
+    return table
+
+
+def lut_max_error(table, func, start=0, step=1):
+    """
+    Compares a table against the transfer function it was built from.
+
+    Args:
+        table (array): A table from build_lut.
+        func (function): The transfer function.
+        start (int): Input of the first entry.
+        step (int): Input distance between two entries.
+
+    Returns:
+        float: The largest absolute difference over all entries. Values
+        of 1 or more, or a sign mismatch, indicate a broken table.
+    """
+    worst = 0
+    for i in range(len(table)):
+        value = func(start + i * step)
+        if (value > 0) != (table[i] > 0) or (value < 0) != (table[i] < 0):
+            return float(0x7FFF)
+        diff = abs(table[i] - value)
+        if diff > worst:
+            worst = diff
+    return worst
+
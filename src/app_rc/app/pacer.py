@@ -0,0 +1,241 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+from utime import ticks_add, ticks_diff
+
+__all__ = ["PACE_PERIODIC", "PACE_ARRIVAL", "ControlPacer"]
+
+PACE_PERIODIC = 0  # Run on a fixed deadline grid only
+PACE_ARRIVAL = 1   # Also run as soon as a new packet is seen
+
+
+class ControlPacer:
+    """
+    Decides when the receiver control loop runs its handler.
+
+    In both modes the handler runs on a deadline grid of `period_ms`, and
+    the loop sleeps until the next deadline instead of a fixed time, so
+    the period does not drift with the processing time. In arrival mode
+    the loop also runs the handler right away when a new packet is seen;
+    the deadline then restarts from that run. The radio has no packet
+    event, so the loop polls for packets, but only every `poll_ms` around
+    the time the next one is expected: once the packet interval has been
+    measured from the arrivals (see arrived()), it sleeps until shortly
+    before the next packet is due.
+
+    All times are ticks_us() values, passed in by the caller.
+
+    Statistics, reset by reset_stats():
+        runs (int): Handler runs.
+        arrival_runs (int): Runs triggered by a new packet.
+        wakes (int): Loop wake-ups, calls of sleep_ms().
+        late_max (int): Worst lateness of a deadline run, in us.
+        late_sum (int): Total lateness of the deadline runs, in us.
+        busy_max (int): Longest handler run, in us.
+        busy_sum (int): Total handler time, in us.
+    """
+
+    def __init__(self, period_ms=20, poll_ms=2, mode=PACE_ARRIVAL):
+        """
+        Initializes the ControlPacer instance.
+
+        Args:
+            period_ms (int): The control period.
+            poll_ms (int): The packet poll interval of arrival mode.
+            mode (int): PACE_PERIODIC or PACE_ARRIVAL.
+        """
+        self.period_us = period_ms * 1000
+        self.poll_ms = poll_ms
+        self.mode = mode
+        self.deadline = None
+        self.started = 0
+        self.last_start = None
+        self.interval_us = self.period_us
+        self.by_arrival = False
+        self.last_packet = None
+        self.packet_us = 0  # Measured packet interval, 0 until known
+        self.packet_dev = 0  # Mean deviation of the intervals
+        self.last_busy = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the statistics."""
+        self.runs = 0
+        self.arrival_runs = 0
+        self.wakes = 0
+        self.late_max = 0
+        self.late_sum = 0
+        self.busy_max = 0
+        self.busy_sum = 0
+
+    def due(self, now, fresh):
+        """
+        Tells whether the handler must run now.
+
+        Args:
+            now (int): The current ticks_us().
+            fresh (bool): True if a new packet was seen.
+
+        Returns:
+            bool: True to run the handler.
+        """
+        if self.deadline is None:
+            return True
+        if fresh and self.mode == PACE_ARRIVAL:
+            return True
+        return ticks_diff(now, self.deadline) >= 0
+
+    def arrived(self, now):
+        """
+        Records the arrival of a new packet, measuring the packet interval.
+
+        Gaps of several intervals, packets that changed nothing, count as
+        that many intervals; gaps over 4 periods are ignored.
+
+        Args:
+            now (int): The current ticks_us().
+        """
+        last = self.last_packet
+        self.last_packet = now
+        if last is None:
+            return
+        gap = ticks_diff(now, last)
+        if gap <= 0 or gap > 4 * self.period_us:
+            return
+        est = self.packet_us
+        if not est:
+            self.packet_us = gap
+            return
+        n = (gap + est // 2) // est
+        if n > 1:
+            gap //= n
+        err = gap - est
+        self.packet_us = est + err // 8
+        self.packet_dev += ((err if err >= 0 else -err) -
+                            self.packet_dev) // 4
+
+    def start(self, now):
+        """
+        Records the start of a handler run.
+
+        Args:
+            now (int): The current ticks_us().
+        """
+        late = 0 if self.deadline is None else ticks_diff(now, self.deadline)
+        self.by_arrival = late < 0
+        if self.by_arrival:
+            self.arrival_runs += 1
+        else:
+            self.late_sum += late
+            if late > self.late_max:
+                self.late_max = late
+        if self.last_start is not None:
+            self.interval_us = ticks_diff(now, self.last_start)
+        self.last_start = now
+        self.started = now
+        self.runs += 1
+
+    def done(self, now):
+        """
+        Records the end of a handler run and schedules the next deadline.
+
+        Args:
+            now (int): The current ticks_us().
+        """
+        busy = ticks_diff(now, self.started)
+        self.last_busy = busy
+        self.busy_sum += busy
+        if busy > self.busy_max:
+            self.busy_max = busy
+
+        if self.by_arrival or self.deadline is None:
+            self.deadline = ticks_add(self.started, self.period_us)
+        else:
+            self.deadline = ticks_add(self.deadline, self.period_us)
+            if ticks_diff(self.deadline, now) <= 0:
+                # Overrun: skip the missed slots instead of bursting
+                self.deadline = ticks_add(now, self.period_us)
+
+    def interval_ms(self):
+        """
+        Returns the time between the last two handler runs.
+
+        Returns:
+            int: The interval in ms, at least 1.
+        """
+        ms = (self.interval_us + 500) // 1000
+        return ms if ms > 0 else 1
+
+    def sleep_ms(self, now):
+        """
+        Returns how long the loop may sleep.
+
+        Args:
+            now (int): The current ticks_us().
+
+        Returns:
+            int: Milliseconds until the next deadline, or until the next
+            packet poll in arrival mode.
+        """
+        self.wakes += 1
+        if self.deadline is None:
+            return 0
+        wait = ticks_diff(self.deadline, now)
+        if self.mode == PACE_ARRIVAL:
+            poll = self._packet_wait(now)
+            if poll < wait:
+                wait = poll
+        return (wait + 999) // 1000 if wait > 0 else 0
+
+    def _packet_wait(self, now):
+        # Time until the next packet poll, in us. Polls run in a window
+        # around each expected arrival, poll_ms plus twice the interval
+        # deviation on either side. The late side also covers the last
+        # handler run, during which a packet goes unseen
+        poll_us = self.poll_ms * 1000
+        est = self.packet_us
+        margin = poll_us + 2 * self.packet_dev
+        if not est or est <= 3 * margin:
+            return poll_us
+        since = ticks_diff(now, self.last_packet)
+        if since < 0:
+            return poll_us
+        n = since // est
+        r = since - n * est
+        if (n >= 1 and r <= margin + self.last_busy) or r >= est - margin:
+            return poll_us
+        return est - margin - r
+
+    def slack_us(self, now):
+        """
+        Returns the time left until the next deadline.
+
+        Args:
+            now (int): The current ticks_us().
+
+        Returns:
+            int: Microseconds, 0 when the deadline has passed.
+        """
+        if self.deadline is None:
+            return 0
+        wait = ticks_diff(self.deadline, now)
+        return wait if wait > 0 else 0
+
+    def report(self):
+        """
+        Formats the statistics for the log.
+
+        Returns:
+            str: Runs, arrival runs, wake-ups, mean and worst lateness and
+            handler time, in us.
+        """
+        runs = self.runs if self.runs else 1
+        deadline_runs = self.runs - self.arrival_runs
+        return "runs:%d arrival:%d wakes:%d late:%d/%d busy:%d/%d" % (
+            self.runs, self.arrival_runs, self.wakes,
+            self.late_sum // (deadline_runs if deadline_runs else 1),
+            self.late_max, self.busy_sum // runs, self.busy_max)
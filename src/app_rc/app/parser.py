@@ -7,7 +7,6 @@
 
 import ulogger
 from devices import Devices
-import gc
 
 __all__ = ["DataParser"]
 
@@ -68,17 +67,14 @@ class DataParser:
                         value["channels"])
                     parsed_data[key]["sleep"] = self._parse_dict(value.get("auto_sleep", {}))
                     data[key] = None
-                    gc.collect()
                 if key == "receiver_1" and self.data_type == PARSER_RECEIVE1:
                     parsed_data[key] = self._parse_dict(value)
                     data[key] = None
-                    gc.collect()
                     parsed_data[key] = self._parse_actuator(
                         parsed_data[key])
                 if key == "receiver_2" and self.data_type == PARSER_RECEIVE2:
                     parsed_data[key] = self._parse_dict(value)
                     data[key] = None
-                    gc.collect()
                     parsed_data[key] = self._parse_actuator(
                         parsed_data[key])
 
@@ -121,7 +117,6 @@ class DataParser:
             else:
                 parsed_list.append(item)
             lst[i] = None
-            gc.collect()
         return parsed_list
 
     def _parse_channels(self, channels):
@@ -233,19 +228,7 @@ class DataParser:
             actuator_type = 0
             if "actuator" in item:
                 actuator_name = item["actuator"]
-                prefix = actuator_name.rstrip("0123456789")  # Extract prefix
-
-                index = 1
-                suffix = actuator_name[len(prefix):]
-                if suffix.isdigit():
-                    index = int(suffix)
-
-                if prefix == "CODE":
-                    actuator_type = Devices.CODE_EXEC
-                else:
-                    base = getattr(Devices, f"{prefix}_1", None)
-                    if base is not None:
-                        actuator_type = base + index - 1
+                actuator_type = self._actuator_type(actuator_name)
 
                 if self.data_type == item.get("receiver", 0):
                     data = item.get("set_value", [])
@@ -254,6 +237,33 @@ class DataParser:
 
         return ret_list
 
+    def _actuator_type(self, actuator_name):
+        """
+        Resolves an actuator name, such as "PWM2" or "CODE", to its Devices
+        index.
+
+        Args:
+            actuator_name (str): The actuator name.
+
+        Returns:
+            int: The Devices index, 0 if the name is unknown.
+        """
+        prefix = actuator_name.rstrip("0123456789")  # Extract prefix
+
+        index = 1
+        suffix = actuator_name[len(prefix):]
+        if suffix.isdigit():
+            index = int(suffix)
+
+        if prefix == "CODE":
+            return Devices.CODE_EXEC
+        if prefix == "TIMELINE":
+            return Devices.TIMELINE
+        base = getattr(Devices, f"{prefix}_1", None)
+        if base is not None:
+            return base + index - 1
+        return 0
+
     def _get_events_id(self, actuator, values):
         return [
             (actuator % self.id_multiplier) + (it * self.id_multiplier)
@@ -262,10 +272,26 @@ class DataParser:
 
     def parse_event_id(self, event_id):
         return {
-            "actuator": event_id % self.id_multiplier,
-            "value": int(event_id / self.id_multiplier)
+            "actuator": self.event_actuator(event_id),
+            "value": self.event_value(event_id)
         }
 
+    def event_actuator(self, event_id):
+        """
+        Returns the actuator of an event id, see Devices.
+        """
+        return event_id % self.id_multiplier
+
+    def event_value(self, event_id):
+        """
+        Returns the value of an event id.
+
+        The exact inverse of _get_events_id(), with integer math only:
+        negative values are not rounded towards zero.
+        """
+        return (event_id - event_id % self.id_multiplier) // \
+            self.id_multiplier
+
     def _parse_pwm(self, data):
         pwm_data = []
 
@@ -328,10 +354,31 @@ class DataParser:
 
         code_data = [
             data.get("effect", -1),
-            data.get("code", "")
+            data.get("code", ""),
+            data.get("priority", 0)
         ]
         return code_data
 
+    def _parse_timeline(self, data):
+        if not data:
+            return []
+
+        steps = []
+        for step in data.get("steps", []):
+            actuator_type = self._actuator_type(step.get("actuator", ""))
+            if actuator_type in (0, Devices.TIMELINE):
+                logger.warn(f"[PARSE]TIMELINE: skip step {step}")
+                continue
+            event_id = self._get_events_id(actuator_type,
+                                           [step.get("value", 0)])[0]
+            steps.append([int(step.get("time", 0) * 1000), event_id])
+
+        timeline_data = [
+            data.get("effect", -1),
+            steps
+        ]
+        return timeline_data
+
     def _parse_actuator(self, data):
         """
         Parses the actuator data.
@@ -343,14 +390,13 @@ class DataParser:
             dict: The parsed actuator data.
         """
 
-        gc.collect()
-
         extracted_data = {
             "pwm": [],
             "motor": [],
             "led1": [],
             "led2": [],
             "codes": [],
+            "timelines": [],
             "advanced_config": []
         }
 
@@ -379,7 +425,12 @@ class DataParser:
             parse = self._parse_codes
             extracted_data["codes"].extend(parse(item) for item in codes["data"])
 
-        gc.collect()  # 解析完再次释放内存
+        timelines = data.get("TIMELINE")
+        if timelines and "data" in timelines:
+            parse = self._parse_timeline
+            extracted_data["timelines"].extend(
+                parse(item) for item in timelines["data"])
+
         return extracted_data
 
     def _match_events(self, events_list, type_str):
@@ -417,6 +468,7 @@ class DataParser:
             "led1": [],
             "led2": [],
             "codes": [],
+            "timelines": [],
             "advanced_config": []
         }
 
@@ -448,6 +500,10 @@ class DataParser:
             data = self._parse_codes(actuator_data.get("data", []))
             extracted_data["codes"].append(data)
 
+        elif actuator_name == "TIMELINE":
+            data = self._parse_timeline(actuator_data.get("data", []))
+            extracted_data["timelines"].append(data)
+
         setting_data[f"receiver_{receiver_idx}"] = extracted_data
         setting_data["sender"] = {}
         return setting_data
@@ -465,22 +521,8 @@ class DataParser:
         if not isinstance(actuator_data, dict):
             return 0
 
-        if actuator_data:
-            actuator_type = 0
         actuator_name = actuator_data.get("actuator", "")
-        prefix = actuator_name.rstrip("0123456789")  # Extract prefix
-
-        index = 1
-        suffix = actuator_name[len(prefix):]
-        if suffix.isdigit():
-            index = int(suffix)
-
-        if prefix == "CODE":
-            actuator_type = Devices.CODE_EXEC
-        else:
-            base = getattr(Devices, f"{prefix}_1", None)
-            if base is not None:
-                actuator_type = base + index - 1
+        actuator_type = self._actuator_type(actuator_name)
 
         data = actuator_data.get("set_value", [])
 
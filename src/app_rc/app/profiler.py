@@ -0,0 +1,150 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+from array import array
+from utime import ticks_us, ticks_diff
+
+__all__ = ["STAGE_ADC",
+           "STAGE_MID",
+           "STAGE_MOTOR",
+           "STAGE_SERVO",
+           "STAGE_BUTTON",
+           "STAGE_EFFECT",
+           "STAGE_TIMER",
+           "STAGE_SCRIPT",
+           "STAGE_NAMES",
+           "HIST_BINS",
+           "StageProfiler"]
+
+STAGE_ADC = 0     # ADC normalisation
+STAGE_MID = 1     # Analog mid events
+STAGE_MOTOR = 2   # Motor calculation
+STAGE_SERVO = 3   # Servo calculation
+STAGE_BUTTON = 4  # Button check
+STAGE_EFFECT = 5  # Effect dispatch, nested in the mid and button stages
+STAGE_TIMER = 6   # timer0_callback
+STAGE_SCRIPT = 7  # One CommandExecutor script slice
+
+STAGE_NAMES = ("adc", "mid", "motor", "servo", "button", "effect",
+               "timer0", "script")
+
+# Bin 0 counts 0 us, bin k counts [2**(k-1), 2**k) us, the last bin
+# counts everything from 2**(HIST_BINS-2) us (16 ms) up
+HIST_BINS = 16
+
+_COUNT_MAX = (1 << 30) - 1
+
+
+class StageProfiler:
+    """
+    Fixed-size timing histograms of the receiver control stages.
+
+    Recording allocates nothing: the durations go into preallocated
+    integer arrays, and every value stays a small int. Callers check
+    `enabled` before taking timestamps, so a disabled profiler costs one
+    attribute test per stage.
+    """
+
+    def __init__(self):
+        """
+        Initializes the StageProfiler instance, disabled.
+        """
+        self.enabled = False
+        count = len(STAGE_NAMES)
+        self.hist = array('I', [0] * (count * HIST_BINS))
+        self.max_us = array('I', [0] * count)
+
+    def enable(self, en=True):
+        """
+        Enables or disables recording.
+
+        Args:
+            en (bool): True to record.
+        """
+        self.enabled = en
+
+    def reset(self):
+        """Clears all histograms."""
+        hist = self.hist
+        for i in range(len(hist)):
+            hist[i] = 0
+        for i in range(len(self.max_us)):
+            self.max_us[i] = 0
+
+    def record(self, stage, elapsed_us):
+        """
+        Adds one duration to the histogram of a stage.
+
+        Args:
+            stage (int): One of the STAGE_ constants.
+            elapsed_us (int): The duration in microseconds.
+        """
+        b = 0
+        v = elapsed_us
+        while v > 0 and b < HIST_BINS - 1:
+            v >>= 1
+            b += 1
+        i = stage * HIST_BINS + b
+        if self.hist[i] < _COUNT_MAX:
+            self.hist[i] += 1
+        if elapsed_us > self.max_us[stage]:
+            self.max_us[stage] = elapsed_us
+
+    def lap(self, stage, start):
+        """
+        Records the time since `start` and returns the current time.
+
+        Args:
+            stage (int): One of the STAGE_ constants.
+            start (int): A ticks_us() value.
+
+        Returns:
+            int: ticks_us() at the end of the stage, the start of the next.
+        """
+        now = ticks_us()
+        self.record(stage, ticks_diff(now, start))
+        return now
+
+    def count(self, stage):
+        """
+        Returns the number of durations recorded for a stage.
+
+        Args:
+            stage (int): One of the STAGE_ constants.
+
+        Returns:
+            int: The sample count.
+        """
+        base = stage * HIST_BINS
+        total = 0
+        for b in range(HIST_BINS):
+            total += self.hist[base + b]
+        return total
+
+    def dump(self, log):
+        """
+        Writes one line per recorded stage.
+
+        The line lists the sample count, the worst duration and the bins
+        up to the last non-empty one, e.g.
+        `[PROF]motor n:500 max:212us hist:0,0,0,0,0,0,3,410,87`.
+
+        Args:
+            log (function): The output, e.g. logger.info.
+        """
+        log(f"[PROF]EN:{self.enabled} BINS:0,1,2,4..{1 << (HIST_BINS - 2)}us")
+        for stage in range(len(STAGE_NAMES)):
+            n = self.count(stage)
+            if n == 0:
+                continue
+            base = stage * HIST_BINS
+            last = HIST_BINS - 1
+            while self.hist[base + last] == 0:
+                last -= 1
+            bins = ",".join(str(self.hist[base + b]) for b in range(last + 1))
+            log(f"[PROF]{STAGE_NAMES[stage]} n:{n} "
+                f"max:{self.max_us[stage]}us hist:{bins}")
@@ -10,6 +10,7 @@ import gc
 import machine
 import uasyncio
 import time
+import utime
 import ujson
 import ulogger
 
@@ -19,35 +20,72 @@ if '.frozen' in sys.path:
     sys.path.remove('.frozen')
     sys.path.append('.frozen')
 
+from gcgov import GcGovernor
+
 conf_update_flag = True  # Flag to indicate configuration update is needed
 setting = None           # Parsed configuration settings
+setting_gen = 0          # Bumped on every reload, identifies `setting`
+
+CONTROL_PERIOD_MS = 20   # Control handler period
+CONTROL_POLL_MS = 2      # Packet poll interval around an expected packet
+CONTROL_ARRIVAL = True   # Run the handler as soon as a new packet arrives
+LOOP_REPORT_RUNS = 3000  # Log the control loop timing every N runs
+GC_GOVERNOR = True       # Collect garbage in the slack after a control tick
+
+gc_gov = GcGovernor()    # Idle-time garbage collection, see slave_init()
 
 
-async def _reload_configuration(parser, logger):
-    """Helper function to reload configuration from file"""
-    global conf_update_flag, setting
+async def _reload_configuration(parser, logger, prepare=None):
+    """
+    Helper function to reload configuration from file
+
+    Args:
+        parser (DataParser): The parser of the active receiver.
+        logger (Logger): The logger.
+        prepare (function): Called as prepare(setting, setting_gen) once the
+            configuration is loaded, to compile it ahead of the control
+            tick.
+    """
+    global conf_update_flag, setting, setting_gen
     conf_update_flag = False
+    setting_gen += 1
+    _load_configuration(parser, logger)
+    if prepare is not None:
+        prepare(setting, setting_gen)
+
+
+def _load_configuration(parser, logger):
+    global setting
 
     # Clear memory before loading
     rc_conf = None
     setting = None
-    gc.collect()
+    gc_gov.collect()
+
+    # Try the compiled cache of the active receiver first
+    from cache import ConfigCache
+    cfg_cache = ConfigCache()
+    cfg_digest = cfg_cache.digest()
+    setting = cfg_cache.load(parser.data_type, cfg_digest)
+    if setting is not None:
+        logger.info("[MAIN]CACHE_HIT")
+        return
 
-    # Load configuration file
+    # Stream only the sender and the active receiver out of the file
+    from jstream import load_rc_config
     try:
-        with open('rc_config', 'r') as f:
-            rc_conf = ujson.load(f)
-            gc.collect()
+        rc_conf, peak = load_rc_config('rc_config', parser.data_type)
+        logger.info(f"[MAIN]CFG_LOAD_PEAK:{peak}")
     except Exception as e:
         logger.warn(f"[MAIN]CFG_LOAD_ERR:{e}.")
-    gc.collect()
 
     # Parse configuration if loaded successfully
     if rc_conf is not None:
         setting = parser.parse(rc_conf)
         del rc_conf
         logger.info("[MAIN]PARSE_UPDATE")
-    gc.collect()
+        if setting and cfg_cache.store(parser.data_type, cfg_digest, setting):
+            logger.info("[MAIN]CACHE_STORE")
 
 
 def sleep_handler():
@@ -176,7 +214,10 @@ async def slave_init():
 
     from control import BBL_Controller
     from parser import DataParser
-    gc.collect()
+    if GC_GOVERNOR:
+        gc_gov.enable()
+    else:
+        gc.collect()
 
     data_parser = DataParser()
     bbl_controller = BBL_Controller()
@@ -193,8 +234,14 @@ async def slave_init():
 
     async def control_task():
         global conf_update_flag, setting
+        from pacer import ControlPacer, PACE_ARRIVAL, PACE_PERIODIC
+
         EMPTY_DATA = [0] * 10
         rc_index = 0
+        last_data = [0] * 10
+        pacer = ControlPacer(CONTROL_PERIOD_MS, CONTROL_POLL_MS,
+                             PACE_ARRIVAL if CONTROL_ARRIVAL
+                             else PACE_PERIODIC)
 
         while True:
             try:
@@ -205,8 +252,11 @@ async def slave_init():
                     data_parser.set_slave_idx(rc_index)
                     logger.info(f'[MAIN]SLAVE_IDX: {rc_index}')
 
-                    await _reload_configuration(data_parser, logger)
-                    bbl_controller.reinit()
+                    # Compiles the new setting too, outside of the ticks
+                    await _reload_configuration(
+                        data_parser, logger,
+                        lambda new, gen: bbl_controller.load_setting(
+                            new, rc_index, gen))
 
                 if rc_index != rc_module.rc_index():
                     # Must update config
@@ -214,16 +264,43 @@ async def slave_init():
                     continue
 
                 rc_data = rc_module.rc_slave_data()
-                if rc_data and setting and rc_data != EMPTY_DATA:
-                    bbl_controller.handler(setting, rc_index, rc_data)
-                else:
-                    bbl_controller.stop('BEHAVIOR')
+                fresh = False
+                if rc_data:
+                    for i in range(10):
+                        if rc_data[i] != last_data[i]:
+                            fresh = True
+                            last_data[i] = rc_data[i]
+
+                now = utime.ticks_us()
+                if fresh:
+                    pacer.arrived(now)
+                if pacer.due(now, fresh):
+                    pacer.start(now)
+                    if CONTROL_ARRIVAL:
+                        bbl_controller.set_cycle_time(pacer.interval_ms())
+                    if rc_data and setting and rc_data != EMPTY_DATA:
+                        bbl_controller.handler(setting, rc_index, rc_data,
+                                               setting_gen)
+                    else:
+                        bbl_controller.stop('BEHAVIOR')
+                    bbl_controller.board_key_handler()
+                    now = utime.ticks_us()
+                    pacer.done(now)
+                    gc_gov.idle(pacer.slack_us(now))
+
+                    if pacer.runs >= LOOP_REPORT_RUNS:
+                        logger.info(f"[MAIN]LOOP:{pacer.report()}")
+                        logger.info(f"[MAIN]GC:{gc_gov.report()}")
+                        logger.info("[MAIN]TIMER:"
+                                    f"{bbl_controller.scheduler.report()}")
+                        pacer.reset_stats()
+                        gc_gov.reset_stats()
+                        bbl_controller.scheduler.reset_stats()
             except Exception as e:
                 bbl_controller.reinit()
                 logger.error(f"[MAIN]CRTL_TASK: {e}")
                 sys.exit()
-            bbl_controller.board_key_handler()
-            await uasyncio.sleep(0.02)
+            await uasyncio.sleep_ms(pacer.sleep_ms(utime.ticks_us()))
 
     async def simulation_task():
         while True:
@@ -235,12 +312,17 @@ async def slave_init():
                     except Exception as e:
                         logger.error(f"[MAIN][SIM_LOADS] {e}")
                         continue
-                    setting = data_parser.parse_simulation_setting(sim_case)
-                    value = data_parser.parse_simulation_value(sim_case)
-                    idx = data_parser.parse_simulation_receiver(sim_case)
+                    if isinstance(sim_case, dict) and "profile" in sim_case:
+                        # {"profile": "on" | "off" | "reset" | "dump"}
+                        bbl_controller.profile_command(sim_case["profile"])
+                    else:
+                        setting = data_parser.parse_simulation_setting(
+                            sim_case)
+                        value = data_parser.parse_simulation_value(sim_case)
+                        idx = data_parser.parse_simulation_receiver(sim_case)
+                        bbl_controller.simulation_effect_set(idx, setting,
+                                                             value)
                     sim_case = None
-                    gc.collect()
-                    bbl_controller.simulation_effect_set(idx, setting, value)
                 bbl_controller.simulation_effect_handle()
             except Exception as e:
                 bbl_controller.reinit()
@@ -0,0 +1,73 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+import uasyncio as asyncio
+from array import array
+
+__all__ = ["RC_CHANNELS", "RcStream"]
+
+RC_CHANNELS = 10  # L1, L2, L3, R1, R2, R3, K1, K2, K3, K4
+
+
+class RcStream:
+    """
+    The RC data of the control loop, shared with CODE scripts as `rc`.
+
+    `values` is one array('h') of the raw channel values as received: the
+    sticks L1 to R3 in 0..4095, then the buttons K1 to K4. The control
+    loop updates it in place on every tick, so reading it neither calls
+    rc_module nor allocates. A script waits for the next tick with
+    `await rc.next()`, or reacts to every one with:
+
+        async for values in rc:
+            ...
+
+    Attributes:
+        values (array): The channel values of the last tick.
+        seq (int): Ticks published, to tell a missed one.
+    """
+
+    def __init__(self):
+        """Initializes the RcStream instance, all channels at 0."""
+        self.values = array('h', [0] * RC_CHANNELS)
+        self.seq = 0
+        self.event = asyncio.Event()
+
+    def publish(self, data):
+        """
+        Copies the data of a tick and wakes the waiting scripts.
+
+        Called by the control loop, not from the timer: waking tasks is
+        not safe from interrupts.
+
+        Args:
+            data (list): The raw channel values, RC_CHANNELS of them.
+        """
+        values = self.values
+        for i in range(RC_CHANNELS):
+            values[i] = data[i]
+        self.seq += 1
+        # The waiting scripts are queued by set(), later waits block again
+        self.event.set()
+        self.event.clear()
+
+    async def next(self):
+        """
+        Waits for the next tick.
+
+        Returns:
+            array: `values`, updated.
+        """
+        await self.event.wait()
+        return self.values
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self.event.wait()
+        return self.values
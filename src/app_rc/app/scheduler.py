@@ -0,0 +1,223 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+from array import array
+from machine import Timer
+from utime import ticks_ms, ticks_add, ticks_diff
+import ulogger
+
+logger = ulogger.Logger()
+
+__all__ = ["TimerScheduler"]
+
+SCHED_MAX_TASKS = 8
+
+
+class TimerScheduler:
+    """
+    Runs periodic device tasks from one one-shot hardware timer.
+
+    Every task has its own period and runs only while it is active. After
+    each run the timer is re-armed for the earliest deadline of the active
+    tasks, so the timer interrupts only when a task is due, and not at
+    all while every task is idle. Drivers switch their task with
+    set_active() as their work starts and ends.
+
+    Deadlines follow a grid: a task that ran late keeps its phase, and
+    one that missed whole periods skips them instead of catching up.
+
+    All state lives in preallocated arrays, so a run allocates nothing.
+
+    Statistics, reset by reset_stats():
+        fires (int): Timer interrupts.
+        calls (int): Task calls.
+        avoided (int): Task calls saved by inactive tasks, one per period
+            spent idle.
+        errors (int): Task calls that raised. The first one is logged.
+    """
+
+    def __init__(self, timer, callback):
+        """
+        Initializes the TimerScheduler instance, without tasks.
+
+        Args:
+            timer (Timer): The hardware timer, owned by the scheduler.
+            callback (function): The timer callback, called with the timer.
+                It must call fire().
+        """
+        self.timer = timer
+        self.callback = callback
+        self.count = 0
+        self.funcs = [None] * SCHED_MAX_TASKS
+        self.period = array('i', [0] * SCHED_MAX_TASKS)
+        self.due = array('i', [0] * SCHED_MAX_TASKS)
+        self.active = array('b', [0] * SCHED_MAX_TASKS)
+        self.idle_since = array('i', [0] * SCHED_MAX_TASKS)
+        self.armed = False
+        self.armed_due = 0
+        self.running = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the statistics."""
+        self.fires = 0
+        self.calls = 0
+        self.avoided = 0
+        self.errors = 0
+        now = ticks_ms()
+        for i in range(self.count):
+            self.idle_since[i] = now
+
+    def add(self, func, period_ms, active=True):
+        """
+        Registers a task.
+
+        Args:
+            func (function): Called without arguments when due.
+            period_ms (int): The task period.
+            active (bool): True to start running it right away.
+
+        Returns:
+            int: The task id.
+        """
+        if self.count >= SCHED_MAX_TASKS:
+            raise ValueError("[SCHED]Too many tasks")
+        task = self.count
+        self.count += 1
+        self.funcs[task] = func
+        self.period[task] = period_ms
+        self.idle_since[task] = ticks_ms()
+        self.set_active(task, active)
+        return task
+
+    def set_period(self, task, period_ms):
+        """
+        Changes the period of a task, from its next run on.
+
+        Args:
+            task (int): The task id.
+            period_ms (int): The new period.
+        """
+        self.period[task] = period_ms
+
+    def set_active(self, task, en=True):
+        """
+        Starts or stops running a task.
+
+        A task that becomes active first runs one period later.
+
+        Args:
+            task (int): The task id.
+            en (bool): True to run it.
+        """
+        if en == bool(self.active[task]):
+            return
+        self.active[task] = 1 if en else 0
+        now = ticks_ms()
+        if not en:
+            # The timer runs out on its own
+            self.idle_since[task] = now
+            return
+        self.avoided += self._idle_periods(task, now)
+        due = ticks_add(now, self.period[task])
+        self.due[task] = due
+        if self.running and (not self.armed or
+                             ticks_diff(due, self.armed_due) < 0):
+            self._arm(due)
+
+    def start(self):
+        """Starts the timer for the earliest deadline."""
+        self.running = True
+        self._arm_next(ticks_ms())
+
+    def stop(self):
+        """Stops the timer. Tasks keep their state."""
+        self.running = False
+        self.armed = False
+        self.timer.deinit()
+
+    def poll(self):
+        """
+        Runs the due tasks.
+
+        A task that raises is logged and keeps its schedule, so one bad
+        call does not stop the other tasks.
+
+        Returns:
+            int: The current ticks_ms().
+        """
+        now = ticks_ms()
+        funcs = self.funcs
+        period = self.period
+        due = self.due
+        active = self.active
+        for i in range(self.count):
+            if active[i] and ticks_diff(now, due[i]) >= 0:
+                try:
+                    funcs[i]()
+                except Exception as e:
+                    self.errors += 1
+                    if self.errors == 1:
+                        logger.error(f"[SCHED]TASK_ERR:{i}: {e}")
+                self.calls += 1
+                # After the call, which may have changed the period
+                d = ticks_add(due[i], period[i])
+                if ticks_diff(d, now) <= 0:
+                    d = ticks_add(now, period[i])
+                due[i] = d
+        return now
+
+    def fire(self):
+        """Runs the due tasks and re-arms the timer. Call from the callback."""
+        self.fires += 1
+        self.armed = False
+        now = ticks_ms()
+        try:
+            now = self.poll()
+        finally:
+            # The timer is one-shot: it stops for good unless re-armed
+            if self.running:
+                self._arm_next(now)
+
+    def _idle_periods(self, task, now):
+        return ticks_diff(now, self.idle_since[task]) // self.period[task]
+
+    def _arm_next(self, now):
+        first = False
+        next_due = 0
+        due = self.due
+        active = self.active
+        for i in range(self.count):
+            if active[i] and (not first or
+                              ticks_diff(due[i], next_due) < 0):
+                next_due = due[i]
+                first = True
+        if first:
+            self._arm(next_due)
+
+    def _arm(self, due):
+        wait = ticks_diff(due, ticks_ms())
+        self.armed = True
+        self.armed_due = due
+        self.timer.init(mode=Timer.ONE_SHOT, period=wait if wait > 0 else 1,
+                        callback=self.callback)
+
+    def report(self):
+        """
+        Formats the statistics for the log.
+
+        Returns:
+            str: Timer interrupts, task calls, avoided task calls and
+            task errors.
+        """
+        avoided = self.avoided
+        now = ticks_ms()
+        for i in range(self.count):
+            if not self.active[i]:
+                avoided += self._idle_periods(i, now)
+        return "fires:%d calls:%d avoided:%d errors:%d" % (
+            self.fires, self.calls, avoided, self.errors)
@@ -0,0 +1,119 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+from array import array
+from utime import ticks_ms, ticks_diff
+
+__all__ = ["Timeline", "TimelinePlayer"]
+
+
+class Timeline:
+    """
+    A choreography of timed effects, compiled into arrays.
+
+    Attributes:
+        offsets (array): Step times in ms from the start, ascending.
+        events (array): The event id of each step.
+        count (int): Number of steps.
+    """
+
+    def __init__(self, steps):
+        """
+        Compiles the steps of a timeline.
+
+        Args:
+            steps (list): [offset_ms, event_id] pairs. Steps with the same
+                offset keep their list order.
+        """
+        # MicroPython sorts unstably, the index keeps the list order
+        order = sorted(range(len(steps)), key=lambda i: (steps[i][0], i))
+        self.offsets = array('i', [steps[i][0] for i in order])
+        self.events = array('i', [steps[i][1] for i in order])
+        self.count = len(order)
+
+
+class TimelinePlayer:
+    """
+    Plays timelines from a task of the device timer scheduler.
+
+    The task only runs while a timeline plays, and its period is set to the
+    time left until the next step, so steps fire with the precision of the
+    timer rather than of the control loop. Starting a timeline replaces the
+    one playing.
+
+    Attributes:
+        source: What the timeline playing came from, passed on with each
+            step; None when none plays.
+    """
+
+    def __init__(self, scheduler, dispatch):
+        """
+        Initializes the TimelinePlayer instance and registers its task.
+
+        Args:
+            scheduler (TimerScheduler): The device timer scheduler.
+            dispatch (function): Called with the event id of each step
+                and the source of its timeline.
+        """
+        self.scheduler = scheduler
+        self.dispatch = dispatch
+        self.timeline = None
+        self.source = None
+        self.step = 0
+        self.start = 0
+        self.task = scheduler.add(self.tick, 1, False)
+
+    def play(self, timeline, source=None):
+        """
+        Starts a timeline. Steps at offset 0 run right away.
+
+        Args:
+            timeline (Timeline): The timeline.
+            source: Passed to the dispatch function with each step.
+        """
+        self.stop()
+        self.timeline = timeline
+        self.source = source
+        self.step = 0
+        self.start = ticks_ms()
+        self.tick()
+
+    def stop(self):
+        """Stops the timeline playing, if any."""
+        self.timeline = None
+        self.source = None
+        self.scheduler.set_active(self.task, False)
+
+    def playing(self):
+        """
+        Checks whether a timeline plays.
+
+        Returns:
+            bool: True while a timeline plays.
+        """
+        return self.timeline is not None
+
+    def tick(self):
+        """Runs the due steps and times the next one. Called by the timer."""
+        timeline = self.timeline
+        if timeline is None:
+            return
+        elapsed = ticks_diff(ticks_ms(), self.start)
+        offsets = timeline.offsets
+        while self.step < timeline.count and offsets[self.step] <= elapsed:
+            step = self.step
+            self.step = step + 1
+            self.dispatch(timeline.events[step], self.source)
+            if self.timeline is not timeline:
+                # The step started another timeline, or stopped this one
+                return
+        if self.step >= timeline.count:
+            self.stop()
+            return
+        wait = offsets[self.step] - elapsed
+        self.scheduler.set_period(self.task, wait)
+        self.scheduler.set_active(self.task, True)
@@ -6,9 +6,247 @@
 #
 
 import uasyncio as asyncio
-import time
-import re
 import gc
+from utime import ticks_us, ticks_diff
+
+EXEC_CACHE_BYTES = 16 * 1024  # Default budget of the compiled script cache
+EXEC_SLOTS = 1                # Default number of scripts running at once
+
+_DIGITS = "0123456789"
+_NAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_" + _DIGITS
+_SLEEP_MODULES = ("time", "utime")
+
+
+def _is_string_prefix(src, start, end):
+    """Checks whether src[start:end] can prefix a string literal"""
+    for i in range(start, end):
+        if src[i] not in "rbfuRBFU":
+            return False
+    return True
+
+
+def _is_dotted_name(text):
+    """Checks whether text is an identifier or a dotted name"""
+    for part in text.split("."):
+        if not part or part[0] in _DIGITS:
+            return False
+        for c in part:
+            if c not in _NAME_CHARS:
+                return False
+    return True
+
+
+class _SliceTimer:
+    """
+    Wraps a script coroutine and times each of its slices.
+
+    A slice is the run of the script between two awaits. The wrapper has
+    the coroutine interface, so the scheduler drives it like the script
+    itself. A script whose slice overran the cancel budget ends with
+    CancelledError once that slice returns, unless the script completed
+    in it: then the slice only counts as an overrun.
+    """
+
+    def __init__(self, coro, executor, slot):
+        self.coro = coro
+        self.executor = executor
+        self.slot = slot
+
+    def __await__(self):
+        return self
+
+    __iter__ = __await__
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, value):
+        self.executor._slice_begin(self.slot)
+        try:
+            result = self.coro.send(value)
+        finally:
+            self.executor._slice_end(self.slot)
+        return self._check(result)
+
+    def throw(self, *args):
+        self.executor._slice_begin(self.slot)
+        try:
+            result = self.coro.throw(*args)
+        finally:
+            self.executor._slice_end(self.slot)
+        return self._check(result)
+
+    def _check(self, result):
+        # Only reached when the script awaits again, not once it completed
+        slot = self.slot
+        if slot.overdue:
+            slot.killed = True
+            self.coro.close()
+            raise asyncio.CancelledError()
+        return result
+
+    def close(self):
+        return self.coro.close()
+
+
+class _StopFlag:
+    """
+    The `stop_event` of a script, which its `while True:` loops poll.
+
+    A plain flag rather than an asyncio.Event, as the device timer sets it.
+    """
+
+    def __init__(self):
+        self.flag = False
+
+    def set(self):
+        self.flag = True
+
+    def clear(self):
+        self.flag = False
+
+    def is_set(self):
+        return self.flag
+
+
+class _Slot:
+    """
+    A script run by the executor and its state.
+
+    Attributes:
+        key: The cache key of the script, None for a one-off script.
+        priority (int): Scripts of a higher priority take the slot of
+            lower ones when all slots are busy.
+        status (str): "IDLE", "RUNNING", "DONE", "CANCELLED" or "ERROR".
+        seq (int): Start order, the oldest script is preempted first.
+        stop (_StopFlag): Set when the script should end.
+        overdue (bool): Set when a slice overran the cancel budget.
+        killed (bool): Set when the script was cancelled for it.
+        overruns (int): Slices of this run over the slice budget.
+        worst_us (int): The longest slice of this run.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.key = None
+        self.priority = 0
+        self.status = "IDLE"
+        self.seq = 0
+        self.stop = _StopFlag()
+        self.overdue = False
+        self.killed = False
+        self.overruns = 0
+        self.worst_us = 0
+        self.slice_start = 0
+        self.task = None
+        self.runner = None
+
+
+class ScriptCache:
+    """
+    Compiled scripts by key, least recently used first out.
+
+    Each entry is charged the heap its compilation took, and the entries
+    together stay within a byte budget.
+
+    Statistics, reset by reset_stats():
+        hits (int): Lookups that found their script.
+        misses (int): Lookups that did not.
+        evictions (int): Scripts dropped to make room.
+    """
+
+    def __init__(self, budget):
+        """
+        Initializes the ScriptCache instance, empty.
+
+        Args:
+            budget (int): The most bytes the entries may take together.
+        """
+        self.budget = budget
+        self.entries = {}  # key -> [function, size, last use]
+        self.bytes = 0
+        self.clock = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the statistics."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Looks a script up and marks it as used.
+
+        Args:
+            key: The script key.
+
+        Returns:
+            function: The compiled script, None if not cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        entry[2] = self.clock
+        return entry[0]
+
+    def put(self, key, func, size):
+        """
+        Adds a script, dropping the least recently used ones to make room.
+
+        Args:
+            key: The script key.
+            func (function): The compiled script.
+            size (int): Its size in bytes.
+
+        Returns:
+            bool: False if the script alone exceeds the budget.
+        """
+        if size > self.budget:
+            return False
+        self.remove(key)
+        while self.bytes + size > self.budget:
+            oldest = None
+            for k, entry in self.entries.items():
+                if oldest is None or entry[2] < self.entries[oldest][2]:
+                    oldest = k
+            self.remove(oldest)
+            self.evictions += 1
+        self.clock += 1
+        self.entries[key] = [func, size, self.clock]
+        self.bytes += size
+        return True
+
+    def remove(self, key):
+        """
+        Drops a script, if cached.
+
+        Args:
+            key: The script key.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        """Drops all scripts."""
+        self.entries = {}
+        self.bytes = 0
+
+    def report(self):
+        """
+        Formats the cache state for the log.
+
+        Returns:
+            str: Scripts, bytes used of the budget, hits, misses and
+            evictions.
+        """
+        return "scripts:%d bytes:%d/%d hits:%d misses:%d evicted:%d" % (
+            len(self.entries), self.bytes, self.budget, self.hits,
+            self.misses, self.evictions)
 
 
 class CommandExecutor:
@@ -17,14 +255,37 @@ class CommandExecutor:
                  log_debug=print,
                  log_info=print,
                  log_warn=print,
-                 log_error=print):
-        """Initialize CommandExecutor"""
-        # Forbidden commands and modules
-        self._dangerous_commands = []
+                 log_error=print,
+                 cache_bytes=EXEC_CACHE_BYTES,
+                 slots=EXEC_SLOTS,
+                 slice_us=None,
+                 cancel_us=None):
+        """
+        Initialize CommandExecutor
+
+        Args:
+            timeout (float): Seconds a script may run, None for no limit.
+            log_debug, log_info, log_warn, log_error (function): Loggers.
+            cache_bytes (int): Heap budget of the compiled scripts.
+            slots (int): Scripts that may run at once.
+            slice_us (int): Slices of a script, its runs between two
+                awaits, longer than this are logged as overruns. None
+                does not check.
+            cancel_us (int): A slice longer than this cancels its script.
+                None does not cancel.
+        """
+        # Forbidden commands and modules, see register_danger_cmds()
+        self._danger_names = {}
+        self._danger_attrs = {}
+        self._danger_text = []
         self._default_commands = [
             'import uasyncio as asyncio',
         ]
+        # Renames, see register_remap_rules()
         self._remap_rules = {}
+        self._remap_text = {}
+        # Extra globals of the scripts, see register_globals()
+        self._globals = {}
         self.timeout = timeout  # Default timeout is None
 
         self.log_warn = log_warn
@@ -32,82 +293,453 @@ class CommandExecutor:
         self.log_info = log_info
         self.log_debug = log_debug
 
-        self.exec_task = None
-        self.stop_event = asyncio.Event()
-        self.status = "IDLE"
-        self.command = ""
+        self.slots = [_Slot(i) for i in range(slots)]
+        self.slice_us = slice_us
+        self.cancel_us = cancel_us
+        self.current = None  # The slot whose slice runs
+        self.starts = 0
+        self.status = "IDLE"  # Of the script that ended last
+        # [command, key, priority, run_us] requests of run(), also called
+        # from timer callbacks, which set the flag
+        self.pending = []
+        self.wake = asyncio.ThreadSafeFlag()
+        # Trigger-to-start latency of the last script, in us
+        self.start_latency_us = 0
+        # True while a script runs, see register_activity_cb()
+        self.active = False
+        # True while a stopped script winds down for its replacement
+        self.replacing = False
+        self.activity_cb = None
+        # Compiled scripts by key, see preload()
+        self.scripts = ScriptCache(cache_bytes)
         self.start_func = None
         self.final_func = None
+        self.slice_func = None
 
-    async def _execute(self, command: str, timeout=None):
-        """Execute string command"""
-        self.status = "RUNNING"
-        self.stop_event.clear()
+    async def _execute(self, slot, func, run_us):
+        """Execute a compiled command in the slot claimed for it"""
+        if slot.status != "RUNNING":
+            # Stopped before it started
+            self._slot_done()
+            return
 
         if self.start_func is not None:
             self.start_func()
 
         try:
-            exec_globals = {"asyncio": asyncio, "stop_event": self.stop_event}
-            exec(f"async def __exec():\n{command}", exec_globals)
-            self.exec_task = asyncio.create_task(exec_globals['__exec']())
-            await self._monitor_execution()
+            slot.task = asyncio.create_task(
+                _SliceTimer(func(slot.stop), self, slot))
+            self.start_latency_us = ticks_diff(ticks_us(), run_us)
+            self.log_info(f"[EXEC]START:{slot.index}:"
+                          f"{self.start_latency_us}us")
+            await self._monitor_execution(slot)
         except ImportError as e:
             self.log_error(f"[EXEC]Import Error: {e}")
-            self.status = "ERROR"
+            slot.status = "ERROR"
         except Exception as e:
             self.log_error(f"[EXEC]Execution Error: {e}")
-            self.status = "ERROR"
+            slot.status = "ERROR"
         finally:
-            self.stop_event.set()
-        gc.collect()
+            slot.stop.set()
+            slot.task = None
+            self.status = slot.status
+            if slot.overruns:
+                self.log_warn(f"[EXEC]OVERRUNS:{slot.index}:"
+                              f"{slot.overruns} worst:{slot.worst_us}us")
+            self._slot_done()
+
+    def _slot_done(self):
+        # The devices go back to the controller once no script runs, not
+        # between a restarted script and its replacement
+        if self.replacing:
+            return
+        for slot in self.slots:
+            if slot.status == "RUNNING":
+                return
+        if self.active:
+            self._set_active(False)
+            self._call_final_func()
 
     def _call_final_func(self):
         if self.final_func is not None:
             self.final_func()
 
-    async def _monitor_execution(self):
-        """Monitor tasks and timeout"""
-        start_time = time.time()
-        while self.status == "RUNNING":
-            if self.timeout is not None:
-                if time.time() - start_time > self.timeout:
-                    self.log_info("[EXEC]Command execution timed out.")
-                    await self.stop()
-                    self._call_final_func()
+    async def _monitor_execution(self, slot):
+        """Wait for the task to finish, be stopped or time out"""
+        try:
+            if self.timeout is None:
+                await slot.task
+            else:
+                await asyncio.wait_for(slot.task, self.timeout)
+        except asyncio.TimeoutError:
+            # wait_for() cancelled the task
+            self.log_info("[EXEC]Command execution timed out.")
+            slot.status = "CANCELLED"
+            return
+        except asyncio.CancelledError:
+            # By stop(), or by the slice timer for an overrun
+            if slot.killed:
+                self._log_killed(slot)
+            return
+        if slot.status == "RUNNING":
+            slot.status = "DONE"
+            self.log_info("[EXEC]Execution done")
+
+    def _log_killed(self, slot):
+        slot.status = "CANCELLED"
+        self.log_warn(f"[EXEC]Cancelled {slot.index}: slice over "
+                      f"{self.cancel_us}us")
+
+    def _slice_begin(self, slot):
+        # The start first: timing_proc() may run between the two
+        slot.slice_start = ticks_us()
+        self.current = slot
+
+    def _slice_end(self, slot):
+        self.current = None
+        elapsed = ticks_diff(ticks_us(), slot.slice_start)
+        if self.slice_func is not None:
+            self.slice_func(elapsed)
+        if elapsed > slot.worst_us:
+            slot.worst_us = elapsed
+        if self.slice_us is not None and elapsed > self.slice_us:
+            slot.overruns += 1
+        if self.cancel_us is not None and elapsed > self.cancel_us:
+            slot.overdue = True
+
+    def timing_proc(self):
+        """
+        Ends a slice that overruns the cancel budget. Called by the timer.
+
+        A script that does not await blocks the event loop, and the timer
+        is the only code that still runs. It sets the stop_event of the
+        script, which ends its `while True:` loops, and the script is
+        cancelled once its slice returns, unless it completed.
+        """
+        slot = self.current
+        if slot is None or self.cancel_us is None or slot.overdue:
+            return
+        if ticks_diff(ticks_us(), slot.slice_start) > self.cancel_us:
+            slot.overdue = True
+            slot.stop.set()
+
+    def register_activity_cb(self, func=None):
+        """
+        Registers a callback for changes of the script activity.
+
+        The callback is called with True when a script starts and with
+        False once no script runs any more, so that timing_proc() only
+        needs to run while `active` is True.
+
+        Args:
+            func (function): The callback, None to remove it.
+        """
+        self.activity_cb = func
+
+    def _set_active(self, en):
+        if en != self.active:
+            self.active = en
+            if self.activity_cb is not None:
+                self.activity_cb(en)
+
+    def _name_end(self, src, i):
+        """Returns the index after the identifier starting at src[i]"""
+        n = len(src)
+        while i < n and src[i] in _NAME_CHARS:
+            i += 1
+        return i
+
+    def _string_end(self, src, i, prefix):
+        """
+        Skips the string literal whose quote is at src[i].
+
+        The replacement fields of an f-string are checked for dangerous
+        names like code.
+
+        Returns:
+            int: The index after the literal, negated and less one if an
+            f-string runs a dangerous name.
+        """
+        n = len(src)
+        quote = src[i]
+        triple = src.startswith(quote * 3, i)
+        i += 3 if triple else 1
+        fstr = 'f' in prefix or 'F' in prefix
+        while i < n:
+            c = src[i]
+            if c == '\\':
+                i += 2
+            elif c == quote and (not triple or src.startswith(quote * 3, i)):
+                return i + (3 if triple else 1)
+            elif c == '\n' and not triple:
+                # Unterminated, left to the compiler
+                return i
+            elif c == '{' and fstr:
+                if src.startswith('{{', i):
+                    i += 2
+                    continue
+                depth = 1
+                j = i + 1
+                while j < n and depth:
+                    if src[j] == '{':
+                        depth += 1
+                    elif src[j] == '}':
+                        depth -= 1
+                    j += 1
+                if self._lex(src[i + 1:j - 1], None) >= 0:
+                    return -1 - j
+                i = j
+            else:
+                i += 1
+        return n
+
+    def _check_name(self, parts):
+        """
+        Checks a dotted name against the dangerous commands.
+
+        Rules match the name or a run of its parts, so `exit` matches
+        `sys.exit`. A rule ending with a dot, like `os.`, matches a name
+        that reads an attribute of it.
+
+        Returns:
+            bool: True if the name is dangerous.
+        """
+        names = self._danger_names
+        attrs = self._danger_attrs
+        count = len(parts)
+        if count == 1:
+            return parts[0] in names
+        for start in range(count):
+            for end in range(start + 1, count + 1):
+                run = ".".join(parts[start:end])
+                if run in names or (end < count and run in attrs):
+                    return True
+        return False
+
+    def _remap_name(self, parts):
+        """
+        Applies the remap rules to a dotted name, longest runs first.
+
+        Returns:
+            str: The remapped name, None if no rule applies.
+        """
+        rules = self._remap_rules
+        count = len(parts)
+        if count == 1:
+            return rules.get(parts[0])
+        out = []
+        changed = False
+        start = 0
+        while start < count:
+            for end in range(count, start, -1):
+                new = rules.get(".".join(parts[start:end]))
+                if new is not None:
+                    out.append(new)
+                    changed = True
+                    start = end
                     break
-            if self.stop_event.is_set():
-                self._call_final_func()
+            else:
+                out.append(parts[start])
+                start += 1
+        return ".".join(out) if changed else None
+
+    def _lex(self, src, out):
+        """
+        Scans a script once, checking and rewriting its names.
+
+        Identifiers and dotted names are looked up in the danger and remap
+        rules; `(u)time.sleep(` becomes `await asyncio.sleep(` and
+        `while True:` (or `1`) becomes `while not stop_event.is_set():`.
+        Strings and comments are left alone, but for the replacement
+        fields of f-strings, which are checked.
+
+        Args:
+            src (str): The script.
+            out (list): Receives the rewritten script in pieces. None only
+                checks the script.
+
+        Returns:
+            int: The index of the first dangerous name, -1 if none.
+        """
+        n = len(src)
+        i = 0
+        copied = 0
+        while i < n:
+            c = src[i]
+            if c == '#':
+                i = src.find('\n', i)
+                if i < 0:
+                    break
+            elif c == '"' or c == "'":
+                end = self._string_end(src, i, "")
+                if end < 0:
+                    return i
+                i = end
+            elif c in _DIGITS:
+                # Numbers, so that the exponent of 1e5 is no name
+                while i < n and (src[i] in _NAME_CHARS or src[i] == '.'):
+                    i += 1
+            elif c in _NAME_CHARS:
+                start = i
+                i = self._name_end(src, i)
+                if i < n and (src[i] == '"' or src[i] == "'") and \
+                        i - start <= 2 and _is_string_prefix(src, start, i):
+                    # A prefixed string, like f"" or rb''
+                    end = self._string_end(src, i, src[start:i])
+                    if end < 0:
+                        return start
+                    i = end
+                    continue
+                parts = [src[start:i]]
+                while True:
+                    j = i
+                    while j < n and (src[j] == ' ' or src[j] == '\t'):
+                        j += 1
+                    if j == n or src[j] != '.':
+                        break
+                    j += 1
+                    while j < n and (src[j] == ' ' or src[j] == '\t'):
+                        j += 1
+                    if j == n or src[j] not in _NAME_CHARS or \
+                            src[j] in _DIGITS:
+                        break
+                    k = self._name_end(src, j)
+                    parts.append(src[j:k])
+                    i = k
+                if self._check_name(parts):
+                    return start
+                if out is None:
+                    continue
+                new = None
+                end = i
+                if len(parts) == 1 and parts[0] == "while":
+                    end = self._while_true_end(src, i)
+                    if end > i:
+                        new = "while not stop_event.is_set():"
+                elif len(parts) == 2 and parts[1] == "sleep" and \
+                        parts[0] in _SLEEP_MODULES:
+                    j = i
+                    while j < n and (src[j] == ' ' or src[j] == '\t'):
+                        j += 1
+                    if j < n and src[j] == '(':
+                        new = "await asyncio.sleep"
+                else:
+                    new = self._remap_name(parts)
+                if new is not None:
+                    out.append(src[copied:start])
+                    out.append(new)
+                    copied = i = end
+            else:
+                i += 1
+        if out is not None:
+            out.append(src[copied:])
+        return -1
+
+    def _while_true_end(self, src, i):
+        """
+        Matches ` True:` or ` 1:` after a `while` ending at src[i].
+
+        Returns:
+            int: The index after the colon, i if there is no match.
+        """
+        n = len(src)
+        j = i
+        while j < n and src[j] in " \t":
+            j += 1
+        if src.startswith("True", j):
+            j += 4
+        elif src.startswith("1", j):
+            j += 1
+        else:
+            return i
+        if j < n and (src[j] in _NAME_CHARS or src[j] == '.'):
+            return i
+        while j < n and src[j] in " \t":
+            j += 1
+        if j < n and src[j] == ':':
+            return j + 1
+        return i
+
+    def _prepare(self, command: str):
+        """
+        Turns a script into the body of an async function.
+
+        The script is scanned once, see _lex(). Rules that are not names
+        are searched for and replaced as plain text.
+
+        Returns:
+            str: The indented body, None if the script is unsafe.
+        """
+        pos = -1
+        for text in self._danger_text:
+            found = command.find(text)
+            if found >= 0 and (pos < 0 or found < pos):
+                pos = found
+        if pos < 0:
+            out = []
+            pos = self._lex(command, out)
+        if pos >= 0:
+            start = command.rfind("\n", 0, pos) + 1
+            end = command.find("\n", pos)
+            line = command[start:] if end < 0 else command[start:end]
+            self.log_warn(f"[EXEC]Unsafe command - {line}")
+            return None
+        code = "".join(out)
+        for old, new in self._remap_text.items():
+            code = code.replace(old, new)
+
+        head = "".join(" " + cmd + "\n" for cmd in self._default_commands)
+        # Indent the code block
+        return head + " " + code.replace("\n", "\n ") + "\n"
+
+    def _compile(self, command: str):
+        """
+        Compiles a script into an async function.
+
+        Returns:
+            tuple: The function and the heap its compilation took, an upper
+            bound of its size; None if the script is unsafe or does not
+            compile.
+        """
+        code = self._prepare(command)
+        if code is None:
+            return None
+        exec_globals = {"asyncio": asyncio}
+        exec_globals.update(self._globals)
+        before = gc.mem_alloc()
+        try:
+            # Every run passes the stop_event of its slot
+            exec(f"async def __exec(stop_event):\n{code}", exec_globals)
+        except Exception as e:
+            self.log_error(f"[EXEC]Compile Error: {e}")
+            return None
+        size = gc.mem_alloc() - before
+        if size <= 0:
+            # A collection ran meanwhile, or the port does not count
+            size = len(code)
+        return exec_globals['__exec'], size
+
+    def preload(self, commands):
+        """
+        Compiles scripts ahead of their first run, replacing the cache.
+
+        Scripts are compiled in order until the cache budget is used up;
+        the others are compiled when they first run.
+
+        Args:
+            commands (dict): Script source by key.
+        """
+        self.scripts.clear()
+        start = ticks_us()
+        for key, command in commands.items():
+            if self.scripts.bytes >= self.scripts.budget:
                 break
-
-            if self.exec_task.done():
-                self.status = "DONE"
-                self._call_final_func()
-                self.log_info("[EXEC]Execution done")
-
-            await asyncio.sleep(0.1)
-
-    def _is_safe(self, command: str) -> bool:
-        """Check if the command is safe"""
-        # Check for dangerous keywords
-        for dangerous_command in self._dangerous_commands:
-            if dangerous_command in command:
-                return False
-        return True
-
-    def _remap_commands(self, command: str) -> str:
-
-        def escape_special_characters(text):
-            """Manually escape special regex characters."""
-            special_chars = r".^$*+?{}[]\|()"
-            return "".join(f"\\{char}" if char in special_chars
-                           else char for char in text)
-
-        """Remap specific commands to their new names"""
-        for old, new in self._remap_rules.items():
-            escaped_old = escape_special_characters(old)
-            command = re.sub(f"{escaped_old}", new, command)
-        return command
+            compiled = self._compile(command)
+            if compiled is not None:
+                self.scripts.put(key, compiled[0], compiled[1])
+        if commands:
+            self.log_info(f"[EXEC]PRELOAD:{self.scripts.report()} "
+                          f"us:{ticks_diff(ticks_us(), start)}")
 
     def register_final_cb(self, func=None):
         self.final_func = func
@@ -115,82 +747,173 @@ class CommandExecutor:
     def register_start_cb(self, func=None):
         self.start_func = func
 
+    def register_slice_cb(self, func=None):
+        """Register func(elapsed_us), called after every script slice"""
+        self.slice_func = func
+
+    def register_globals(self, names):
+        """Register {name: object} globals of the scripts compiled later"""
+        self._globals = names
+
     def register_default_cmds(self, cmds):
         self._default_commands = cmds
 
     def register_remap_rules(self, rules):
-        self._remap_rules = rules
+        """Register {old: new} renames, applied to names of the scripts"""
+        self._remap_rules = {}
+        self._remap_text = {}
+        for old, new in rules.items():
+            if _is_dotted_name(old):
+                self._remap_rules[old] = new
+            else:
+                self._remap_text[old] = new
 
     def register_danger_cmds(self, cmds):
-        self._dangerous_commands = cmds
-
-    def stop(self):
-        """Stop task"""
-        if self.exec_task and not self.exec_task.done():
-            self.exec_task.cancel()
-            self.stop_event.set()
-            self.status = "CANCELLED"
-            self.log_info("[EXEC]Execution stopped manually.")
-            self._call_final_func()
-        else:
+        """Register the names, or text, that scripts must not contain"""
+        self._danger_names = {}
+        self._danger_attrs = {}
+        self._danger_text = []
+        for cmd in cmds:
+            if _is_dotted_name(cmd):
+                self._danger_names[cmd] = True
+            elif cmd.endswith(".") and _is_dotted_name(cmd[:-1]):
+                self._danger_attrs[cmd[:-1]] = True
+            else:
+                self._danger_text.append(cmd)
+
+    def stop(self, key=None):
+        """
+        Stops scripts.
+
+        Args:
+            key: The key of the script to stop, None stops all.
+        """
+        stopped = False
+        for slot in self.slots:
+            if slot.status == "RUNNING" and (key is None or slot.key == key):
+                self._stop_slot(slot)
+                stopped = True
+        if not stopped:
             self.log_info("[EXEC]Execution already been stopped.")
-        gc.collect()
+
+    def _stop_slot(self, slot):
+        if slot.task is not None and not slot.task.done():
+            slot.task.cancel()
+        slot.stop.set()
+        slot.status = "CANCELLED"
+        self.log_info("[EXEC]Execution stopped manually.")
 
     def get_status(self) -> str:
-        """Get status"""
+        """
+        Get status
+
+        Returns:
+            str: "RUNNING" while a script runs, else the status of the
+            script that ended last.
+        """
+        for slot in self.slots:
+            if slot.status == "RUNNING":
+                return "RUNNING"
         return self.status
 
+    def _pick_slot(self, key, priority):
+        """
+        Chooses the slot of a new script.
+
+        The script replaces a run of itself, else takes a free slot, else
+        preempts the oldest of the lowest priority scripts, provided that
+        its priority is not higher than the new one.
+
+        Returns:
+            _Slot: The slot, None if all are taken by higher priorities.
+        """
+        free = None
+        victim = None
+        for slot in self.slots:
+            if slot.status != "RUNNING":
+                if free is None:
+                    free = slot
+            elif key is not None and slot.key == key:
+                return slot
+            elif victim is None or slot.priority < victim.priority or (
+                    slot.priority == victim.priority and
+                    slot.seq < victim.seq):
+                victim = slot
+        if free is not None:
+            return free
+        if victim is not None and victim.priority <= priority:
+            return victim
+        return None
+
+    def _claim(self, slot, key, priority):
+        self.starts += 1
+        slot.key = key
+        slot.priority = priority
+        slot.seq = self.starts
+        slot.status = "RUNNING"
+        slot.stop.clear()
+        slot.overdue = False
+        slot.killed = False
+        slot.overruns = 0
+        slot.worst_us = 0
+        self._set_active(True)
+
     async def block_handle(self):
         while True:
-            if not self.command:
-                await asyncio.sleep(0.2)
+            if not self.pending:
+                await self.wake.wait()
                 continue
 
-            if self.get_status() == "RUNNING":
-                self.stop()
-                await asyncio.sleep(0.2)
+            command, key, priority, run_us = self.pending.pop(0)
+            slot = self._pick_slot(key, priority)
+            if slot is None:
+                self.log_warn(f"[EXEC]BUSY: priority {priority}")
                 continue
-
-            command_lines = self.command.split("\n")
-            self.command = ""
-            gc.collect()
-
-            formatted_code = ""
-
-            for cmd in self._default_commands:
-                formatted_code += " " + cmd + "\n"
-
-            for i, line in enumerate(command_lines):
-                if not self._is_safe(line):
-                    self.log_warn(f"[EXEC]Unsafe command - {line}")
-                    return
-
-                # Replace specific commands with remapped versions
-                line = self._remap_commands(line)
-
-                formatted_code += " " + line + "\n"  # Indent code block
-
-            # Replace (u)time.sleep() with await asyncio.sleep()
-            formatted_code = re.sub(
-                r"(time|utime)\.sleep\((.*?)\)",
-                r"await asyncio.sleep(\2)",
-                formatted_code)
-            # Replace while True: with while not stop_event.is_set():
-            formatted_code = re.sub(
-                r"while\s+(True|1):",
-                "while not stop_event.is_set():",
-                formatted_code)
-            # self.log_debug(f"[EXEC]Formatted code:\n{async_code}")
-
-            asyncio.create_task(self._execute(formatted_code))
-            formatted_code = None
-            gc.collect()
-
-            await asyncio.sleep(0.2)
-
-    def run(self, cmd):
-        self.command = cmd
-        self.log_info(f"[EXEC]RUN CODE SIZE:{len(self.command)}")
+            if slot.status == "RUNNING":
+                self._stop_slot(slot)
+                self.replacing = True
+            try:
+                if slot.runner is not None:
+                    # Let the stopped script wind down before the next one
+                    await slot.runner
+                    slot.runner = None
+
+                func = None if key is None else self.scripts.get(key)
+                if func is None:
+                    compiled = self._compile(command)
+                    if compiled is None:
+                        continue
+                    func = compiled[0]
+                    if key is not None:
+                        self.scripts.put(key, func, compiled[1])
+
+                self._claim(slot, key, priority)
+                slot.runner = asyncio.create_task(
+                    self._execute(slot, func, run_us))
+                func = None
+            finally:
+                if self.replacing:
+                    # Releases the devices if no replacement started
+                    self.replacing = False
+                    self._slot_done()
+
+    def run(self, cmd, key=None, priority=0):
+        """
+        Runs a script.
+
+        A script that runs already is restarted. With all slots busy, the
+        script replaces the oldest running one of the lowest priority, if
+        that is not higher than its own.
+
+        Args:
+            cmd (str): The script source.
+            key: The key of the script in the cache, see preload(). None
+                compiles it for this run only.
+            priority (int): The priority of the script.
+        """
+        self.pending.append([cmd, key, priority, ticks_us()])
+        self.wake.set()
+        self.log_info(f"[EXEC]RUN CODE SIZE:{len(cmd)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+"""
+Hot-path kernels of the receiver control loop and timer callbacks.
+
+Every kernel is defined here as plain bytecode. When the port provides
+the native code emitters, kernels_native replaces them at import time with
+@micropython.native / @micropython.viper builds of the same code; on
+CPython, or on ports without emitters, the bytecode versions stay in use.
+
+Attributes:
+    EMITTER (str): "native" when the compiled kernels are in use,
+        "bytecode" otherwise.
+    bytecode (dict): The bytecode version of every kernel, by name.
+"""
+
+KERNELS = ("adc_value_deal",
+           "adc_value_q",
+           "nonlinear_map",
+           "high_speed_map_q",
+           "servo_step_q",
+           "led_frame",
+           "pixel_set",
+           "frame_sync")
+
+__all__ = list(KERNELS) + ["EMITTER", "bytecode"]
+
+# Fractional bits of the stick slopes, see adc_value_q()
+ADC_Q = 16
+# Fractional bits of the high speed zone speeds, see high_speed_map_q()
+SPEED_Q = 8
+HIGH_ZONE_MIN_SPEED = 800
+
+
+def adc_value_deal(x, max, mid, dz):
+    """
+    Converts a raw ADC value to a signed stick value.
+
+    Args:
+        x (int): The raw ADC value.
+        max (int): The ADC range.
+        mid (int): The calibrated mid value.
+        dz (int): The dead zone around the mid value.
+
+    Returns:
+        float: The stick value in [-max / 2, max / 2], 0 in the dead zone.
+    """
+    if mid - dz <= x <= mid + dz:
+        return 0
+    m_mid = max / 2
+    if x <= mid:
+        return x * m_mid / (mid - dz) - m_mid
+    return (x - mid - dz) * m_mid / (max - mid - dz)
+
+
+def adc_value_q(x, lo_end, hi_start, lo_q, hi_q):
+    """
+    Converts a raw ADC value to a signed stick value, in integers.
+
+    The fixed-point form of adc_value_deal() with max 4096, for readings
+    in 0..4095. Each side of the dead zone is a line, its slope in Q16
+    (ADC_Q). The result is rounded to the nearest int but is never 0
+    outside the dead zone: the sign drives the stick mid-point events.
+
+    Args:
+        x (int): The raw ADC value.
+        lo_end (int): mid - dz, the low end of the dead zone.
+        hi_start (int): mid + dz, the high end of the dead zone.
+        lo_q (int): The slope below the dead zone, 2048 / (mid - dz).
+        hi_q (int): The slope above it, 2048 / (4096 - mid - dz).
+
+    Returns:
+        int: The stick value in [-2048, 2048], 0 in the dead zone.
+    """
+    if x < lo_end:
+        v = ((x * lo_q + (1 << (ADC_Q - 1))) >> ADC_Q) - 2048
+        return v if v < 0 else -1
+    if x > hi_start:
+        v = ((x - hi_start) * hi_q + (1 << (ADC_Q - 1))) >> ADC_Q
+        return v if v > 0 else 1
+    return 0
+
+
+def nonlinear_map(set_speed, dead_zone, low_speed_percentage, linear_rate):
+    """
+    Maps a stick value to a motor speed with a quadratic low speed section.
+
+    Args:
+        set_speed (int): The stick value.
+        dead_zone (int): The stick values below this map to 0.
+        low_speed_percentage (float): Share of the range on the curve.
+        linear_rate (float): Slope of the linear section.
+
+    Returns:
+        int: The motor speed in [-2047, 2047].
+    """
+    speed = abs(set_speed)
+    if speed < dead_zone:
+        return 0
+    if speed > 2047:
+        speed = 2047
+
+    end = dead_zone + (2048 - 2 * dead_zone) * low_speed_percentage
+    value = speed if speed < end - 1 else end - 1
+    if value <= dead_zone + 1:
+        tracker_speed = 0
+    elif value >= end:
+        tracker_speed = 2047
+    else:
+        tracker_speed = int(linear_rate * ((value - dead_zone) ** 2) /
+                            (2 * (end - dead_zone)))
+    if speed >= end:
+        tracker_speed = tracker_speed + (speed - end) * linear_rate
+
+    if tracker_speed > 2047:
+        tracker_speed = 2047
+    return int(tracker_speed if set_speed >= 0 else -tracker_speed)
+
+
+def high_speed_map_q(current_q8, target_speed, elapsed_ms, total_ms,
+                     cycle_ms):
+    """
+    One step of the high speed zone ramp, in Q8 fixed point.
+
+    Args:
+        current_q8 (int): The current speed, Q8.
+        target_speed (int): The target speed.
+        elapsed_ms (int): Time spent on the ramp.
+        total_ms (int): Duration of the ramp.
+        cycle_ms (int): The control cycle.
+
+    Returns:
+        int: The new speed, Q8.
+    """
+    remaining = total_ms - elapsed_ms
+    if remaining < cycle_ms:
+        return target_speed << SPEED_Q
+
+    c_speed = current_q8 if current_q8 >= 0 else -current_q8
+    t_speed = target_speed if target_speed >= 0 else -target_speed
+    t_speed <<= SPEED_Q
+    if t_speed <= c_speed:
+        return target_speed << SPEED_Q
+
+    new_speed = c_speed + (t_speed - c_speed) * cycle_ms // remaining
+    if new_speed <= HIGH_ZONE_MIN_SPEED << SPEED_Q:
+        new_speed = HIGH_ZONE_MIN_SPEED << SPEED_Q
+    return new_speed if target_speed >= 0 else -new_speed
+
+
+def servo_step_q(c_q, s_q, step):
+    """
+    Moves a fixed-point servo angle one step towards its target.
+
+    Args:
+        c_q (int): The current angle.
+        s_q (int): The target angle.
+        step (int): The step size, in the same unit.
+
+    Returns:
+        int: The new angle, never past the target.
+    """
+    if s_q > c_q:
+        c_q += step
+        if c_q > s_q:
+            c_q = s_q
+    else:
+        c_q -= step
+        if c_q < s_q:
+            c_q = s_q
+    return c_q
+
+
+def led_frame(buf, count, mask, rgb, brightness):
+    """
+    Renders one color at a brightness into a GRB NeoPixel buffer.
+
+    Args:
+        buf (bytearray): The pixel buffer, 3 bytes per pixel.
+        count (int): Number of pixels.
+        mask (int): Bit i set lights pixel i, the others are turned off.
+        rgb (int): The color, 0xRRGGBB.
+        brightness (int): The brightness, 0-255.
+    """
+    # x * brightness // 255, exact for 8-bit operands
+    r = ((rgb >> 16) & 0xFF) * brightness
+    r = (r + 1 + (r >> 8)) >> 8
+    g = ((rgb >> 8) & 0xFF) * brightness
+    g = (g + 1 + (g >> 8)) >> 8
+    b = (rgb & 0xFF) * brightness
+    b = (b + 1 + (b >> 8)) >> 8
+    o = 0
+    for i in range(count):
+        if mask & (1 << i):
+            buf[o] = g
+            buf[o + 1] = r
+            buf[o + 2] = b
+        else:
+            buf[o] = 0
+            buf[o + 1] = 0
+            buf[o + 2] = 0
+        o += 3
+
+
+def pixel_set(buf, offset, r, g, b):
+    """
+    Writes one pixel into a GRB NeoPixel buffer.
+
+    Args:
+        buf (bytearray): The pixel buffer, 3 bytes per pixel.
+        offset (int): Byte offset of the pixel.
+        r (int): Red, 0-255.
+        g (int): Green, 0-255.
+        b (int): Blue, 0-255.
+    """
+    buf[offset] = g
+    buf[offset + 1] = r
+    buf[offset + 2] = b
+
+
+def frame_sync(dst, src, offset, length):
+    """
+    Copies a frame over the last one sent, reporting whether it differs.
+
+    Args:
+        dst (bytearray): The last frame sent, updated in place.
+        src (bytearray): The new frame, or a table of frames.
+        offset (int): Byte offset of the new frame in src.
+        length (int): Number of bytes to compare.
+
+    Returns:
+        bool: True if any byte changed.
+    """
+    changed = False
+    for i in range(length):
+        v = src[offset + i]
+        if dst[i] != v:
+            dst[i] = v
+            changed = True
+    return changed
+
+
+bytecode = {}
+for _name in KERNELS:
+    bytecode[_name] = globals()[_name]
+
+try:
+    # Fails on CPython, and with a SyntaxError on ports built without
+    # the native emitters
+    from bbl import kernels_native as _native
+    for _name in KERNELS:
+        globals()[_name] = getattr(_native, _name)
+    EMITTER = "native"
+except Exception:
+    EMITTER = "bytecode"
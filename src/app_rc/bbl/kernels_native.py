@@ -0,0 +1,139 @@
+# -*-coding:utf-8-*-
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+
+"""
+Native builds of the kernels in kernels.py.
+
+Import kernels, not this module: it only compiles on ports with the native
+code emitters, and kernels falls back to bytecode when it does not. The
+float kernels use @micropython.native, the integer ones @micropython.viper.
+Every function must stay equivalent to its bytecode version.
+"""
+
+import micropython
+
+SPEED_Q = 8
+HIGH_ZONE_MIN_SPEED = 800
+
+
+@micropython.native
+def adc_value_deal(x, max, mid, dz):
+    if mid - dz <= x <= mid + dz:
+        return 0
+    m_mid = max / 2
+    if x <= mid:
+        return x * m_mid / (mid - dz) - m_mid
+    return (x - mid - dz) * m_mid / (max - mid - dz)
+
+
+@micropython.viper
+def adc_value_q(x: int, lo_end: int, hi_start: int, lo_q: int,
+                hi_q: int) -> int:
+    # ADC_Q as literals: viper would treat the global as an object
+    if x < lo_end:
+        v = ((x * lo_q + 0x8000) >> 16) - 2048
+        return v if v < 0 else -1
+    if x > hi_start:
+        v = ((x - hi_start) * hi_q + 0x8000) >> 16
+        return v if v > 0 else 1
+    return 0
+
+
+@micropython.native
+def nonlinear_map(set_speed, dead_zone, low_speed_percentage, linear_rate):
+    speed = abs(set_speed)
+    if speed < dead_zone:
+        return 0
+    if speed > 2047:
+        speed = 2047
+
+    end = dead_zone + (2048 - 2 * dead_zone) * low_speed_percentage
+    value = speed if speed < end - 1 else end - 1
+    if value <= dead_zone + 1:
+        tracker_speed = 0
+    elif value >= end:
+        tracker_speed = 2047
+    else:
+        tracker_speed = int(linear_rate * ((value - dead_zone) ** 2) /
+                            (2 * (end - dead_zone)))
+    if speed >= end:
+        tracker_speed = tracker_speed + (speed - end) * linear_rate
+
+    if tracker_speed > 2047:
+        tracker_speed = 2047
+    return int(tracker_speed if set_speed >= 0 else -tracker_speed)
+
+
+@micropython.native
+def high_speed_map_q(current_q8, target_speed, elapsed_ms, total_ms,
+                     cycle_ms):
+    remaining = total_ms - elapsed_ms
+    if remaining < cycle_ms:
+        return target_speed << SPEED_Q
+
+    c_speed = current_q8 if current_q8 >= 0 else -current_q8
+    t_speed = target_speed if target_speed >= 0 else -target_speed
+    t_speed <<= SPEED_Q
+    if t_speed <= c_speed:
+        return target_speed << SPEED_Q
+
+    new_speed = c_speed + (t_speed - c_speed) * cycle_ms // remaining
+    if new_speed <= HIGH_ZONE_MIN_SPEED << SPEED_Q:
+        new_speed = HIGH_ZONE_MIN_SPEED << SPEED_Q
+    return new_speed if target_speed >= 0 else -new_speed
+
+
+@micropython.viper
+def servo_step_q(c_q: int, s_q: int, step: int) -> int:
+    if s_q > c_q:
+        c_q += step
+        if c_q > s_q:
+            c_q = s_q
+    else:
+        c_q -= step
+        if c_q < s_q:
+            c_q = s_q
+    return c_q
+
+
+@micropython.viper
+def led_frame(buf: ptr8, count: int, mask: int, rgb: int, brightness: int):
+    r = ((rgb >> 16) & 0xFF) * brightness
+    r = (r + 1 + (r >> 8)) >> 8
+    g = ((rgb >> 8) & 0xFF) * brightness
+    g = (g + 1 + (g >> 8)) >> 8
+    b = (rgb & 0xFF) * brightness
+    b = (b + 1 + (b >> 8)) >> 8
+    o = 0
+    for i in range(count):
+        if mask & (1 << i):
+            buf[o] = g
+            buf[o + 1] = r
+            buf[o + 2] = b
+        else:
+            buf[o] = 0
+            buf[o + 1] = 0
+            buf[o + 2] = 0
+        o += 3
+
+
+@micropython.viper
+def pixel_set(buf: ptr8, offset: int, r: int, g: int, b: int):
+    buf[offset] = g
+    buf[offset + 1] = r
+    buf[offset + 2] = b
+
+
+@micropython.viper
+def frame_sync(dst: ptr8, src: ptr8, offset: int, length: int) -> bool:
+    changed = False
+    for i in range(length):
+        v = src[offset + i]
+        if dst[i] != v:
+            dst[i] = v
+            changed = True
+    return changed
@@ -7,14 +7,23 @@
 
 from machine import Pin
 from machine import bitstream
+from bbl.kernels import led_frame, pixel_set, frame_sync
 import utime
 import math
 
 LED_CHANNEL1 = 21
 LED_CHANNEL2 = 20
 
-# Precompute a sine table for breathing effect (0–255 brightness)
-sin_table = [int(255 * (1 + math.sin(2 * math.pi * i / 256 - math.pi/2)) / 2) for i in range(256)]
+# Period of timing_proc(), the effect tables hold one frame per period
+LED_REFRESH_MS = 5
+# Most frames per effect table
+LED_TABLE_SAMPLES = 256
+LED_GAMMA = 2.2
+
+# Gamma-corrected breathing envelope (0–255 brightness), one sine period
+breath_table = bytes(
+    int(255 * ((1 + math.sin(2 * math.pi * i / 256 - math.pi / 2)) / 2)
+        ** LED_GAMMA + 0.5) for i in range(256))
 
 del math
 
@@ -30,6 +39,9 @@ class NeoPixel:
         self.n = n
         self.bpp = bpp
         self.buf = bytearray(n * bpp)
+        # The last frame sent, see show()
+        self.sent = bytearray(n * bpp)
+        self.synced = False
         self.pin.init(pin.OUT)
         # or a user-specified timing ns tuple (high_0, low_0, high_1, low_1).
         self.timing = (
@@ -42,6 +54,9 @@ class NeoPixel:
         return self.n
 
     def __setitem__(self, i, v):
+        if self.bpp == 3:
+            pixel_set(self.buf, i * 3, v[0], v[1], v[2])
+            return
         offset = i * self.bpp
         for i in range(self.bpp):
             self.buf[offset + self.ORDER[i]] = v[i]
@@ -62,13 +77,133 @@ class NeoPixel:
                 j += bpp
 
     def write(self):
+        # The next show() sends again, whatever the last frame was
+        self.synced = False
         # BITSTREAM_TYPE_HIGH_LOW = 0
         bitstream(self.pin, 0, self.timing, self.buf)
 
+    def show(self):
+        # write(), but only if the frame differs from the last one sent:
+        # bitstream() runs with the interrupts disabled
+        return self.show_frame(self.buf, 0)
+
+    def show_frame(self, frames, offset):
+        # show() for a frame in a table, buf is left alone
+        if frame_sync(self.sent, frames, offset, len(self.sent)) or \
+                not self.synced:
+            self.synced = True
+            bitstream(self.pin, 0, self.timing, self.sent)
+            return True
+        return False
+
+
+class LEDEffect:
+    """
+    An LED effect compiled into a table of ready-to-send frames.
+
+    There is one frame per LED_REFRESH_MS, up to LED_TABLE_SAMPLES: a solid
+    colour is one frame, a blink its on and off frames, and breathing is
+    sampled from the gamma-corrected envelope.
+
+    Attributes:
+        mod (int): The effect, see LEDController.set_led_effect().
+        duration (int): The duration in milliseconds.
+        repeat_count (int): The number of repetitions, 0xFF for ever.
+        led_index (int): The LED mask, bit i lights LED i.
+        rgb (int): The color, 0xRRGGBB.
+        samples (int): Number of frames.
+        table (bytearray): The GRB frames, back to back.
+    """
+
+    def __init__(self, mod, duration, repeat_count, led_index, rgb, count=4):
+        """
+        Compiles an effect.
+
+        Args:
+            mod (int): The effect: 0 solid, 1 blink, 2 breathing.
+            duration (int): The duration in milliseconds.
+            repeat_count (int): The number of repetitions, 0xFF for ever.
+            led_index (int): The LED mask, bit i lights LED i.
+            rgb (int): The color, 0xRRGGBB.
+            count (int): Number of LEDs of the channel.
+        """
+        self.mod = mod
+        self.duration = duration
+        self.repeat_count = repeat_count
+        self.led_index = led_index
+        self.rgb = rgb
+
+        if duration == 0 or mod == 0:
+            samples = 1
+        elif mod == 1:
+            samples = 2
+        else:
+            samples = duration // LED_REFRESH_MS
+            if samples > LED_TABLE_SAMPLES:
+                samples = LED_TABLE_SAMPLES
+            elif samples < 1:
+                samples = 1
+        self.samples = samples
+
+        size = count * 3
+        self.table = bytearray(samples * size)
+        frames = memoryview(self.table)
+        for k in range(samples):
+            if samples == 1:
+                brightness = 255
+            elif mod == 1:
+                brightness = 255 if k == 0 else 0
+            else:
+                brightness = breath_table[k * 256 // samples]
+            led_frame(frames[k * size:], count, led_index, rgb, brightness)
+
+    def same(self, mod, duration, led_index, rgb):
+        """
+        Checks whether the frames of the effect match other parameters.
+
+        Args:
+            mod (int): The effect.
+            duration (int): The duration in milliseconds.
+            led_index (int): The LED mask.
+            rgb (int): The color.
+
+        Returns:
+            bool: True if a table for them would be the same.
+        """
+        return (mod == self.mod and duration == self.duration and
+                led_index == self.led_index and rgb == self.rgb)
+
+    @staticmethod
+    def valid(mod, repeat_count):
+        """
+        Checks the effect index and the repeat count, logging errors.
+
+        Args:
+            mod (int): The effect.
+            repeat_count (int): The number of repetitions.
+
+        Returns:
+            bool: True if both are in range.
+        """
+        if not 0 <= mod < 3:
+            print("[LEDS]Invalid effect index. Must be between 0 and 2.")
+            return False
+
+        if not isinstance(repeat_count,
+                          int) or repeat_count < 0 or repeat_count > 255:
+            print("[LEDS]Invalid repeat count.")
+            return False
+        return True
+
 
 class LEDController:
     """
     A singleton class to control an LED.
+
+    An effect is played from its LEDEffect frame table. A timeline, a list
+    of effects, plays them one after another: each step runs its duration
+    times its repeat count, and a step that repeats for ever, or a solid
+    colour without duration, holds the LEDs until the next effect is set.
     """
 
     _instances = {}
@@ -116,7 +251,6 @@ pin configuration.
         if led_channel not in self.led_pins_map:
             raise ValueError("Invalid LED channel")
 
-        self.sin_table = sin_table
         self.channel = led_channel
 
         # Effect state variables
@@ -126,18 +260,56 @@ pin configuration.
         self.current_effect_start_time = 0
         self.led_index = 0
         self.rgb = 0x000000
-        self.is_on = False
+        # The effect played, and its timeline with the step number
+        self.effect = LEDEffect(0, 0, 0, 0, 0x000000)
+        self.timeline = None
+        self.step = 0
+        self.last_set = None
+        # Frame last sent, -1 after an effect change
+        self.drawn = -1
+
+        # The first timing_proc() draws the cleared frame
+        self.active = True
+        self.activity_cb = None
 
         # Initialize hardware NeoPixel object
         pin = Pin(self.led_pins_map[led_channel], Pin.OUT)
         self.np = NeoPixel(pin, 4, timing=0)
         self.np.fill((0, 0, 0))
-        self.np.write()
+        self.np.show()
 
     def reinit(self):
         """Reinitialize the LED controller state."""
         self.__init__(self.channel)
 
+    def register_activity_cb(self, func=None):
+        """
+        Registers a callback for changes of the effect activity.
+
+        The callback is called with True when an effect starts and with
+        False once the LEDs hold still, so that timing_proc() only needs to
+        run while `active` is True.
+
+        Args:
+            func (function): The callback, None to remove it.
+        """
+        self.activity_cb = func
+
+    def _set_active(self, en):
+        if en != self.active:
+            self.active = en
+            if self.activity_cb is not None:
+                self.activity_cb(en)
+
+    def table_bytes(self):
+        """
+        Returns the memory used by the frame table of the current effect.
+
+        Returns:
+            int: The size of the table, in bytes.
+        """
+        return len(self.effect.table)
+
     # -------- Runtime update logic --------
     def timing_proc(self):
         """
@@ -152,44 +324,28 @@ pin configuration.
         """
         mod = self.current_effect_index
         if mod is None:
+            self._set_active(False)
             return
 
         now = utime.ticks_ms()
         elapsed = utime.ticks_diff(now, self.current_effect_start_time)
         duration = self.duration
 
-        update = True
-
-        if duration == 0 or mod == 0:
-            if self.is_on:
-                update = False
-            else:
-                self.is_on = True
-                brightness = 255
-        elif mod == 1:
-            new_state = elapsed < (duration // 2)
-            if new_state == self.is_on:
-                update = False
-            else:
-                self.is_on = new_state
-                brightness = 255 if new_state else 0
-        else:
-            brightness = self.sin_table[(elapsed % duration) * 256 // duration]
-
-        if update:
-            np = self.np
-            rgb = self.rgb
-            r = ((rgb >> 16) & 0xFF) * brightness // 255
-            g = ((rgb >> 8) & 0xFF) * brightness // 255
-            b = (rgb & 0xFF) * brightness // 255
-
-            for i in range(4):
-                if self.led_index & (1 << i):
-                    np[i] = (r, g, b)
-                else:
-                    np[i] = (0, 0, 0)
-
-            np.write()
+        # One lookup into the frame table of the effect
+        effect = self.effect
+        frame = 0
+        if duration != 0:
+            frame = elapsed * effect.samples // duration
+            if frame >= effect.samples:
+                frame = effect.samples - 1
+        if frame != self.drawn:
+            self.drawn = frame
+            self.np.show_frame(effect.table, frame * len(self.np.buf))
+
+        if duration == 0:
+            # A solid colour for good, nothing left to do
+            self._set_active(False)
+            return
 
         # effect repeat
         if duration != 0 and elapsed >= duration:
@@ -198,8 +354,13 @@ pin configuration.
 
             if self.repeat_count > 0:
                 self.current_effect_start_time = now
+            elif (self.timeline is not None and
+                    self.step + 1 < len(self.timeline)):
+                self.step += 1
+                self._start(self.timeline[self.step], now)
             else:
                 self.current_effect_index = None
+                self._set_active(False)
 
     def set_led_effect(self, mod, duration, repeat_count, led_index, rgb):
         """
@@ -235,22 +396,42 @@ pin configuration.
             >>> # Blink green on LED1 and LED2 indefinitely
             >>> set_led_effect(1, 500, 255, 0b0011, 0x00FF00)
         """
-        if not 0 <= mod < 3:
-            print("[LEDS]Invalid effect index. Must be between 0 and 2.")
+        if not LEDEffect.valid(mod, repeat_count):
             return
 
-        if not isinstance(repeat_count,
-                          int) or repeat_count < 0 or repeat_count > 255:
-            print("[LEDS]Invalid repeat count.")
-            return
+        # Setting the same effect again reuses its table
+        effect = self.last_set
+        if effect is not None and effect.same(mod, duration, led_index, rgb):
+            effect.repeat_count = repeat_count
+        else:
+            effect = LEDEffect(mod, duration, repeat_count, led_index, rgb,
+                               self.np.n)
+            self.last_set = effect
+        self.timeline = None
+        self._start(effect, utime.ticks_ms())
 
-        self.current_effect_index = mod
-        self.duration = duration
-        self.repeat_count = repeat_count
-        self.led_index = led_index
-        self.rgb = rgb
-        self.is_on = False
-        self.current_effect_start_time = utime.ticks_ms()
+    def play_timeline(self, timeline):
+        """
+        Plays a timeline of compiled effects, from its first step.
+
+        Args:
+            timeline (list): The LEDEffect steps, in order.
+        """
+        self.timeline = timeline
+        self.step = 0
+        self._start(timeline[0], utime.ticks_ms())
+
+    def _start(self, effect, now):
+        # The effect is swapped in as a whole, the timer may run in between
+        self.effect = effect
+        self.current_effect_index = effect.mod
+        self.duration = effect.duration
+        self.repeat_count = effect.repeat_count
+        self.led_index = effect.led_index
+        self.rgb = effect.rgb
+        self.drawn = -1
+        self.current_effect_start_time = now
+        self._set_active(True)
 
 
 if __name__ == '__main__':
@@ -69,6 +69,12 @@ class MotorsController:
             1: {'forward_speed': 100, 'reverse_speed': 100, 'offset': 0},
             2: {'forward_speed': 100, 'reverse_speed': 100, 'offset': 0}
         }
+        # Bumped on every parameter change, so callers caching the
+        # parameters can tell when to refresh them
+        self.params_rev = 0
+
+        # Integer-only duty computation, see set_fixed_point()
+        self.fixed_point = False
 
     def set_speed(self, motor_idx, speed):
         """
@@ -96,14 +102,24 @@ class MotorsController:
             >>> # Set motor 2 to move reverse at a quarter speed
             >>> set_speed(2, -512)
         """
+        if self.fixed_point:
+            # _speed_handler() inlined: no tuple is allocated
+            speed = int(speed)
+            duty1 = (speed * 100 + 1024) // 2048 if speed > 0 else 0
+            duty2 = (-speed * 100 + 1024) // 2048 if speed < 0 else 0
+        else:
+            duty1, duty2 = self._speed_handler(speed)
+
         if motor_idx == 1:
-            self.motor1_1_duty, self.motor1_2_duty = self._speed_handler(speed)
-            easypwm.duty(MOTOR1_CH1, self.motor1_1_duty)
-            easypwm.duty(MOTOR1_CH2, self.motor1_2_duty)
+            self.motor1_1_duty = duty1
+            self.motor1_2_duty = duty2
+            easypwm.duty(MOTOR1_CH1, duty1)
+            easypwm.duty(MOTOR1_CH2, duty2)
         elif motor_idx == 2:
-            self.motor2_1_duty, self.motor2_2_duty = self._speed_handler(speed)
-            easypwm.duty(MOTOR2_CH1, self.motor2_1_duty)
-            easypwm.duty(MOTOR2_CH2, self.motor2_2_duty)
+            self.motor2_1_duty = duty1
+            self.motor2_2_duty = duty2
+            easypwm.duty(MOTOR2_CH1, duty1)
+            easypwm.duty(MOTOR2_CH2, duty2)
         else:
             print("[motors]Invalid motor index. Must be between 1 and 2.")
 
@@ -149,6 +165,7 @@ class MotorsController:
         if motor_idx in self.motor_params:
             if 0 <= val <= 100:
                 self.motor_params[motor_idx]['forward_speed'] = val
+                self.params_rev += 1
             else:
                 print("[motors]Parameter value out of range (0-100).")
         else:
@@ -171,6 +188,7 @@ class MotorsController:
         if motor_idx in self.motor_params:
             if 0 <= val <= 100:
                 self.motor_params[motor_idx]['reverse_speed'] = val
+                self.params_rev += 1
             else:
                 print("[motors]Parameter value out of range (0-100).")
         else:
@@ -192,6 +210,7 @@ class MotorsController:
         if motor_idx in self.motor_params:
             if -100 <= val <= 100:
                 self.motor_params[motor_idx]['offset'] = val
+                self.params_rev += 1
             else:
                 print("[motors]Parameter value out of range (-100-100).")
         else:
@@ -264,6 +283,19 @@ class MotorsController:
             print("[motors] Invalid motor index.")
             return None
 
+    def set_fixed_point(self, en=True):
+        """
+        Enables or disables the fixed-point mode.
+
+        In fixed-point mode the duty cycles are computed with integer math
+        only, so set_speed() allocates nothing. The duty cycles match the
+        float computation within 1.
+
+        Args:
+            en (bool): True to enable fixed-point mode.
+        """
+        self.fixed_point = en
+
     def _speed_handler(self, speed):
         """
         Converts a speed value to duty cycle values for two motor channels.
@@ -274,6 +306,14 @@ class MotorsController:
             tuple: A tuple containing the duty cycle values for \
                 the two motor channels.
         """
+        if self.fixed_point:
+            speed = int(speed)
+            if speed > 0:
+                return (speed * 100 + 1024) // 2048, 0
+            elif speed < 0:
+                return 0, (-speed * 100 + 1024) // 2048
+            return 0, 0
+
         if speed > 0:
             pwm1 = int(speed * DUTY_MAX / 2048.0 + 0.5)
             pwm2 = 0.0
@@ -6,12 +6,16 @@
 #
 
 from machine import Pin, PWM
+from bbl.kernels import servo_step_q
 
 SERVO_CHANNEL1 = 3
 SERVO_CHANNEL2 = 2
 SERVO_CHANNEL3 = 1
 SERVO_CHANNEL4 = 0
 
+# Fractional bits of the fixed-point angles
+ANGLE_Q = 12
+
 
 class ServosController:
     """
@@ -53,14 +57,76 @@ class ServosController:
         self.servos_map = [
             self.servo1_pwm, self.servo2_pwm, self.servo3_pwm, self.servo4_pwm
         ]
+        # "c_q" mirrors "c_ang" in Q12 fixed point (1/4096 degree)
         self.servos_info_map = [
-            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False},
-            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False},
-            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False},
-            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False},
+            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False,
+             "c_q": 0},
+            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False,
+             "c_q": 0},
+            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False,
+             "c_q": 0},
+            {"c_ang": 0, "s_ang": 0, "rh_ang": 0, "vel": 0, "step_en": False,
+             "c_q": 0},
         ]
         self.sensitity = 180
         self.tim_call_freq = 100
+        self.sensitivity_q = int((57.3 * 8.05) / self.tim_call_freq *
+                                 (1 << ANGLE_Q) + 0.5)
+        # Integer-only angle and duty computation, see set_fixed_point().
+        # The mode and the activity callback survive a re-initialisation
+        self.fixed_point = getattr(self, "fixed_point", False)
+        self.activity_cb = getattr(self, "activity_cb", None)
+        self.active = True
+        self._set_active(False)
+
+    def register_activity_cb(self, func=None):
+        """
+        Registers a callback for changes of the stepping activity.
+
+        The callback is called with True when a servo starts a stepping
+        move and with False once no servo is stepping any more, so that
+        timing_proc() only needs to run while `active` is True.
+
+        Args:
+            func (function): The callback, None to remove it.
+        """
+        self.activity_cb = func
+
+    def _set_active(self, en):
+        if en != self.active:
+            self.active = en
+            if self.activity_cb is not None:
+                self.activity_cb(en)
+
+    def _update_active(self):
+        # Active while any servo has a stepping move to make
+        for servo_idx in range(4):
+            info = self.servos_info_map[servo_idx]
+            if info["step_en"] and info["vel"] != 0:
+                self._set_active(True)
+                return
+        self._set_active(False)
+
+    def set_fixed_point(self, en=True):
+        """
+        Enables or disables the fixed-point mode.
+
+        In fixed-point mode, stepping angles are tracked in Q12 fixed point
+        and all duty computations use integer math only, so timing_proc()
+        allocates no float objects. The duty cycles match the float
+        computation within 1.
+
+        Args:
+            en (bool): True to enable fixed-point mode.
+
+        Example:
+            >>> servos.set_fixed_point(True)
+        """
+        if en and not self.fixed_point:
+            # Pick up the angles tracked by the float path
+            for info in self.servos_info_map:
+                info["c_q"] = int(info["c_ang"] * (1 << ANGLE_Q))
+        self.fixed_point = en
 
     def set_angle(self, servo_idx, angle):
         """
@@ -81,7 +147,10 @@ class ServosController:
             print("[servo]Invalid angle, Must be between 0 and 180.")
             return
 
-        duty = (int)(angle * 102 / 180 + 25)
+        if self.fixed_point:
+            duty = int(angle * 102 // 180 + 25)
+        else:
+            duty = (int)(angle * 102 / 180 + 25)
         internal_idx = servo_idx - 1
 
         self.reset_info(servo_idx, angle)
@@ -114,21 +183,30 @@ class ServosController:
             return
 
         internal_idx = servo_idx - 1
+        info = self.servos_info_map[internal_idx]
 
         if step_speed is not None:
-            self.servos_info_map[internal_idx]["vel"] = step_speed
+            info["vel"] = step_speed
 
-        if self.servos_info_map[internal_idx]["vel"] == 100:
+        if info["vel"] == 100:
             self.set_angle(servo_idx, angle)
-            self.servos_info_map[internal_idx]["rh_ang"] = angle
-            self.servos_info_map[internal_idx]["c_ang"] = angle
+            info["rh_ang"] = angle
+            info["c_ang"] = angle
+            info["c_q"] = int(angle * (1 << ANGLE_Q))
             return
 
-        cur_angle = self.servos_info_map[internal_idx]["c_ang"]
-        self.servos_info_map[internal_idx]["rh_ang"] = cur_angle
-        self.servos_info_map[internal_idx]["s_ang"] = angle
-
-        self.servos_info_map[internal_idx]["step_en"] = True
+        if info["s_ang"] == angle and info["step_en"]:
+            # Already on the way, e.g. the same stick position again
+            return
+        if self.fixed_point:
+            reached = info["c_q"] == int(angle * (1 << ANGLE_Q))
+        else:
+            reached = info["c_ang"] == angle
+        info["rh_ang"] = info["c_ang"]
+        info["s_ang"] = angle
+        if not reached:
+            info["step_en"] = True
+            self._update_active()
 
     def set_angle_step(self, servo_idx, step_speed=100):
         """
@@ -148,6 +226,7 @@ class ServosController:
 
         internal_idx = servo_idx - 1
         self.servos_info_map[internal_idx]["vel"] = step_speed
+        self._update_active()
 
     def reset_info(self, servo_idx, angle, radPSec=8.05, call_freq=100):
         """
@@ -178,11 +257,15 @@ class ServosController:
 
         self.tim_call_freq = call_freq
         self.sensitivity = (57.3 * radPSec) / self.tim_call_freq
+        self.sensitivity_q = int(self.sensitivity * (1 << ANGLE_Q) + 0.5)
 
         self.servos_info_map[internal_idx]["step_en"] = False
         self.servos_info_map[internal_idx]["c_ang"] = angle
+        self.servos_info_map[internal_idx]["c_q"] = int(
+            angle * (1 << ANGLE_Q))
         self.servos_info_map[internal_idx]["rh_ang"] = angle
         self.servos_info_map[internal_idx]["s_ang"] = angle
+        self._update_active()
 
     def set_speed(self, servo_idx, speed_percentage):
         """
@@ -205,7 +288,11 @@ class ServosController:
             print("[servo]Invalid speed, Must be between -100 and 100.")
             return
 
-        duty = round(speed_percentage * 51.2 / 100 + 76.8)
+        if self.fixed_point:
+            # round(p * 0.512 + 76.8), never a tie for integer p
+            duty = int((speed_percentage * 512 + 77300) // 1000)
+        else:
+            duty = round(speed_percentage * 51.2 / 100 + 76.8)
         internal_idx = servo_idx - 1
 
         if not 0 <= internal_idx < len(self.servos_map):
@@ -255,6 +342,11 @@ class ServosController:
             >>> # Call timing_proc in the main loop to update servo positions.
             >>> servos.timing_proc()
         """
+        if self.fixed_point:
+            self._timing_proc_fixed()
+            return
+
+        finished = False
         for servo_idx in range(4):
             if self.servos_info_map[servo_idx]["step_en"] is False:
                 continue
@@ -269,18 +361,52 @@ class ServosController:
                 if interval > 0:
                     angle = c_ang + (velocity / 100 * self.sensitivity)
                     angle = angle if angle <= s_ang else s_ang
-                elif interval < 0:
+                else:
                     angle = c_ang - (velocity / 100 * self.sensitivity)
                     angle = angle if angle >= s_ang else s_ang
-                else:
-                    self.servos_info_map[servo_idx]["rh_ang"] = s_ang
-                    self.servos_info_map[servo_idx]["step_en"] = False
-                    continue
 
                 self.servos_info_map[servo_idx]["c_ang"] = angle
 
                 duty = (int)(angle * 102 / 180 + 25)
                 self.servos_map[servo_idx].duty(duty)
+                interval = s_ang - angle
+
+            if interval == 0:
+                self.servos_info_map[servo_idx]["rh_ang"] = s_ang
+                self.servos_info_map[servo_idx]["step_en"] = False
+                finished = True
+
+        if finished:
+            self._update_active()
+
+    def _timing_proc_fixed(self):
+        # timing_proc() with Q12 angles, products stay below 2**30
+        finished = False
+        for servo_idx in range(4):
+            info = self.servos_info_map[servo_idx]
+            if info["step_en"] is False:
+                continue
+
+            c_q = info["c_q"]
+            s_q = int(info["s_ang"] * (1 << ANGLE_Q))
+            velocity = info["vel"]
+
+            if c_q != s_q and velocity != 0:
+                c_q = servo_step_q(
+                    c_q, s_q, (velocity * self.sensitivity_q + 50) // 100)
+                info["c_q"] = c_q
+                info["c_ang"] = c_q >> ANGLE_Q
+
+                duty = (c_q * 102 // 180 + (25 << ANGLE_Q)) >> ANGLE_Q
+                self.servos_map[servo_idx].duty(duty)
+
+            if c_q == s_q:
+                info["rh_ang"] = info["s_ang"]
+                info["step_en"] = False
+                finished = True
+
+        if finished:
+            self._update_active()
 
     def stop(self, servo_idx):
         """
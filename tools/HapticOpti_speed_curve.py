@@ -6,12 +6,19 @@
 # Copyright (c) 2025 MakerWorld
 #
 
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src", "app_rc", "app"))
+from lut import build_lut
+
 _Acceleration = 1.45
 _Low_Speed_Zone = 60    # (%)
 _Dead_Zone_Width = 200
+_Export_LUT = ""        # File to export the receiver's motor curve table to
 
 def adc_value_deal(x, max=4096, mid= 2000, dz=200):
         def convert(x, i_min, i_max, o_min, o_max):
@@ -66,8 +73,15 @@ else:
     tracker_speeds = [adc_value_deal(speed) for speed in set_speeds]
 
 
+# The table the receiver compiles for this motor (speeds 0..2047, the
+# receiver runs the curve with a zero dead zone)
+lut = build_lut(lambda x: nonlinear_map(x, dead_zone=0, low_speed_percentage=_Low_Speed_Zone/100, linear_rate=_Acceleration), 2048)
+if _Export_LUT:
+    np.savetxt(_Export_LUT, np.array(lut, dtype=np.int16), fmt='%d')
+
 plt.figure(figsize=(10, 5))
 plt.plot(set_speeds, tracker_speeds, label='Nonlinear Mapping')
+plt.plot(np.arange(0, 2048), lut, label='Receiver LUT (dead zone 0)', linestyle='--')
 plt.title('Nonlinear Mapping of Motor Speed')
 plt.xlabel('Set Speed (motor1_set_speed)')
 plt.ylabel('Tracker Speed (motor1_tracker_speed)')
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Lets the bench scripts import the RC receiver application with CPython.
+# On the board this module does nothing. On the host it puts the
+# application on sys.path and installs the firmware stand-ins of rc_sim
+# on the host clock (see tools/rc_sim/firmware.py).
+
+import sys
+
+IS_HOST = sys.implementation.name != "micropython"
+
+if IS_HOST:
+    import os
+
+    _root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(_root, ".."))
+    from rc_sim import APP_ROOT, install
+
+    for _path in (_root, APP_ROOT, os.path.join(APP_ROOT, "app")):
+        if _path not in sys.path:
+            sys.path.insert(0, _path)
+    install()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Compares two microbench.py result files case by case.
+#
+# Usage: python bench_compare.py BASE.json NEW.json [THRESHOLD_PERCENT]
+#
+# Exits with 1 when a case got slower, or allocates more, by more than the
+# threshold (default 10 %).
+
+import sys
+import json
+
+
+def _load(path):
+    with open(path) as f:
+        results = json.load(f)
+    return results, {case["name"]: case for case in results["cases"]}
+
+
+def _change(base, new):
+    if base is None or new is None:
+        return None
+    if base == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - base) * 100 / base
+
+
+def _fmt(value, unit=""):
+    if value is None:
+        return "-"
+    return "%.2f%s" % (value, unit)
+
+
+def _fmt_change(change):
+    return "-" if change is None else "%+.1f%%" % change
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("usage: bench_compare.py BASE.json NEW.json [THRESHOLD]")
+        sys.exit(2)
+    threshold = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+    base_info, base = _load(sys.argv[1])
+    new_info, new = _load(sys.argv[2])
+
+    for info in (base_info, new_info):
+        print("%s: %s, kernels %s, fixed point %s" % (
+            "base" if info is base_info else "new ", info["target"],
+            info["emitter"], info["fixed_point"]))
+    if base_info["target"] != new_info["target"]:
+        print("warning: the results come from different targets")
+
+    print("%-36s %11s %11s %8s %10s %10s %8s" % (
+        "case", "base us", "new us", "time", "base B", "new B", "heap"))
+    regressions = []
+    for name, b in base.items():
+        n = new.get(name)
+        if n is None:
+            print("%-36s missing in %s" % (name, sys.argv[2]))
+            continue
+        time_change = _change(b["us_per_call"], n["us_per_call"])
+        heap_change = _change(b["bytes_per_call"], n["bytes_per_call"])
+        print("%-36s %11s %11s %8s %10s %10s %8s" % (
+            name, _fmt(b["us_per_call"]), _fmt(n["us_per_call"]),
+            _fmt_change(time_change), _fmt(b["bytes_per_call"]),
+            _fmt(n["bytes_per_call"]), _fmt_change(heap_change)))
+        for change in (time_change, heap_change):
+            if change is not None and change > threshold:
+                regressions.append(name)
+                break
+    for name in new:
+        if name not in base:
+            print("%-36s new case" % name)
+
+    if regressions:
+        print("regressed by more than %.0f %%: %s" % (
+            threshold, ", ".join(regressions)))
+        sys.exit(1)
+
+
+main()
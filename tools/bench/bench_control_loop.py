@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Stick-to-output latency and jitter of the receiver control loop, on a
+# virtual clock. The sender's packets arrive with their own clock and
+# radio jitter. Each loop policy processes them; the latency of a packet
+# is the time from its arrival until the handler that used it finished.
+#
+#   legacy    handler, then a fixed uasyncio.sleep(0.02)
+#   periodic  ControlPacer, deadline grid only
+#   arrival   ControlPacer, run as soon as a new packet is seen, polling
+#             only around the expected arrival of the next one
+#
+# Also reports the loop wake-ups, each one a rc_slave_data() poll.
+#
+# Usage: bench_control_loop.py [handler_us] [send_period_ms]
+
+import sys
+import random
+
+import _host  # noqa: F401
+from pacer import ControlPacer, PACE_ARRIVAL, PACE_PERIODIC
+
+PERIOD_MS = 20
+POLL_MS = 2
+DURATION_US = 60 * 1000000
+SEND_DRIFT = 1.003        # Sender clock runs 0.3 % slow
+RADIO_JITTER_US = 1500    # Random extra delay of each packet
+WAKE_JITTER_US = 400      # Random scheduling delay of each wake-up
+
+
+def _packets(send_period_us):
+    # Arrival times of the sender's packets
+    times = []
+    t = random.randint(0, send_period_us)
+    step = int(send_period_us * SEND_DRIFT)
+    while t < DURATION_US:
+        times.append(t + random.randint(0, RADIO_JITTER_US))
+        t += step
+    times.sort()
+    return times
+
+
+def _run(policy, arrivals, handler_us):
+    pacer = ControlPacer(PERIOD_MS, POLL_MS, policy)
+    latencies = []
+    starts = []
+    now = 0
+    wakes = 0
+    seen = -1       # Index of the newest packet seen by the loop
+    handled = -1    # Index of the newest packet passed to the handler
+    nxt = 0         # Index of the next packet to arrive
+    while now < DURATION_US:
+        while nxt < len(arrivals) and arrivals[nxt] <= now:
+            nxt += 1
+        fresh = nxt - 1 > seen
+        seen = nxt - 1
+        wakes += 1
+        if fresh:
+            pacer.arrived(now)
+
+        if policy is None or pacer.due(now, fresh):
+            pacer.start(now)
+            starts.append(now)
+            now += handler_us
+            pacer.done(now)
+            if seen > handled:
+                # Packets overtaken before a run are lost, not delayed
+                latencies.append(now - arrivals[seen])
+                handled = seen
+
+        if policy is None:
+            now += PERIOD_MS * 1000
+        else:
+            now += pacer.sleep_ms(now) * 1000
+        now += random.randint(0, WAKE_JITTER_US)
+    return latencies, starts, wakes, len(arrivals)
+
+
+def _report(name, latencies, starts, wakes, sent):
+    latencies.sort()
+    n = len(latencies)
+    mean = sum(latencies) / n
+    var = sum((x - mean) * (x - mean) for x in latencies) / n
+    print("%-9s %7.2f %7.2f %7.2f %7.2f %7.2f %6d %6d %6.1f%%" % (
+        name, mean / 1000, latencies[n // 2] / 1000,
+        latencies[n * 99 // 100] / 1000, latencies[-1] / 1000,
+        (var ** 0.5) / 1000, len(starts), wakes,
+        100 * (sent - n) / sent))
+
+
+def main():
+    handler_us = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    send_ms = int(sys.argv[2]) if len(sys.argv) > 2 else PERIOD_MS
+    print("handler %d us, packets every %d ms, %d s" % (
+        handler_us, send_ms, DURATION_US // 1000000))
+    print("latency in ms; jitter is its standard deviation")
+    print("%-9s %7s %7s %7s %7s %7s %6s %6s %7s" % (
+        "mode", "mean", "p50", "p99", "max", "jitter", "runs", "wakes",
+        "lost"))
+    for name, policy in (("legacy", None), ("periodic", PACE_PERIODIC),
+                         ("arrival", PACE_ARRIVAL)):
+        random.seed(1)
+        arrivals = _packets(send_ms * 1000)
+        _report(name, *_run(policy, arrivals, handler_us))
+
+
+main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Cost per call of the hot-path kernels in bbl/kernels.py, bytecode against
+# the native/viper builds. On the host, or on a port without the native
+# emitters, only the bytecode column is filled in.
+
+import _host  # noqa: F401
+from utime import ticks_us, ticks_diff
+from bbl import kernels
+
+CALLS = 2000
+
+_buf = bytearray(12)
+_sent = bytearray(12)
+
+# Representative arguments of each kernel in the control loop
+CASES = (
+    ("adc_value_deal", (3000, 4096, 2048, 200)),
+    ("adc_value_q", (3000, 1848, 2248, 72628, 72628)),
+    ("nonlinear_map", (1500, 500, 0.5, 1.5)),
+    ("high_speed_map_q", (900 << 8, 2047, 200, 1000, 20)),
+    ("servo_step_q", (90 << 12, 135 << 12, 2000)),
+    ("led_frame", (_buf, 4, 0x05, 0x40CFFF, 128)),
+    ("pixel_set", (_buf, 3, 0x40, 0xCF, 0xFF)),
+    ("frame_sync", (_sent, _buf, 0, 12)),
+)
+
+
+def _us_per_call(func, args):
+    # The empty loop is measured and subtracted
+    start = ticks_us()
+    for _ in range(CALLS):
+        pass
+    overhead = ticks_diff(ticks_us(), start)
+    start = ticks_us()
+    for _ in range(CALLS):
+        func(*args)
+    return (ticks_diff(ticks_us(), start) - overhead) / CALLS
+
+
+def main():
+    native = kernels.EMITTER == "native"
+    print("kernel emitter: %s, %d calls each" % (kernels.EMITTER, CALLS))
+    print("%-18s %12s %12s %12s" % ("kernel", "bytecode", "native",
+                                    "saved"))
+    for name, args in CASES:
+        byte_us = _us_per_call(kernels.bytecode[name], args)
+        if native:
+            native_us = _us_per_call(getattr(kernels, name), args)
+            print("%-18s %9.2f us %9.2f us %9.2f us" % (
+                name, byte_us, native_us, byte_us - native_us))
+        else:
+            print("%-18s %9.2f us %12s %12s" % (name, byte_us, "-", "-"))
+
+
+main()
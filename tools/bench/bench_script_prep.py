@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Cost of turning a CODE script into the body of its async function for
+# scripts of 1 to 10 KB: the single-pass lexer of CommandExecutor._prepare
+# against the per-line substring and regex passes it replaced, kept below
+# as the reference. Also reports whether both give the same code. Runs on
+# the host and on the board (mpremote run).
+
+import re
+
+import _host  # noqa: F401
+from utime import ticks_us, ticks_diff
+from control import BBL_Controller
+from sample_config import CODE_SAMPLE
+
+SIZES_KB = (1, 2, 5, 10)
+RUNS = 5
+
+
+def _legacy_prepare(executor, danger, remap, command):
+    def escape(text):
+        special_chars = r".^$*+?{}[]\|()"
+        return "".join(f"\\{char}" if char in special_chars
+                       else char for char in text)
+
+    code = ""
+    for cmd in executor._default_commands:
+        code += " " + cmd + "\n"
+    for line in command.split("\n"):
+        for cmd in danger:
+            if cmd in line:
+                return None
+        for old, new in remap.items():
+            line = re.sub(f"{escape(old)}", new, line)
+        code += " " + line + "\n"
+    code = re.sub(r"(time|utime)\.sleep\((.*?)\)",
+                  r"await asyncio.sleep(\2)", code)
+    return re.sub(r"while\s+(True|1):",
+                  "while not stop_event.is_set():", code)
+
+
+def _script(size):
+    # Numbered copies of the sample, so no two lines are alike
+    lines = []
+    total = 0
+    n = 0
+    while total < size:
+        block = CODE_SAMPLE.replace("servos =", "arm%d =" % n)
+        block = block.replace(" servos.", " arm%d." % n)
+        block = block.replace("(1, 30,", "(%d, 30," % (n % 4 + 1))
+        lines.append("# step %d" % n)
+        lines.append(block)
+        total += len(block) + 10
+        n += 1
+    return "\n".join(lines)
+
+
+def _us(func, arg):
+    best = None
+    for _ in range(RUNS):
+        start = ticks_us()
+        func(arg)
+        elapsed = ticks_diff(ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    executor = BBL_Controller().executor
+    # The rules as BBL_Controller registers them
+    danger = list(executor._danger_names) + \
+        [name + "." for name in executor._danger_attrs] + \
+        executor._danger_text
+    remap = dict(executor._remap_rules)
+    remap.update(executor._remap_text)
+
+    def legacy(command):
+        return _legacy_prepare(executor, danger, remap, command)
+
+    print("script preparation, best of %d runs" % RUNS)
+    print("%8s %14s %14s %8s %6s" % ("size", "per line+regex", "lexer",
+                                     "speedup", "same"))
+    for kb in SIZES_KB:
+        command = _script(kb * 1024)
+        old_us = _us(legacy, command)
+        new_us = _us(executor._prepare, command)
+        same = legacy(command) == executor._prepare(command)
+        print("%5d KB %11d us %11d us %7.1fx %6s" % (
+            kb, old_us, new_us, old_us / max(new_us, 1),
+            "yes" if same else "no"))
+
+
+main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Per-tick cost of detecting a config change in BBL_Controller.handler:
+# the deep `setting != self.setting` compare against the generation
+# counter compare. Runs on the host and on the board (mpremote run).
+
+import json
+
+import _host  # noqa: F401
+from utime import ticks_us, ticks_diff
+from parser import DataParser
+from sample_config import make_config
+
+TICKS = 1000
+
+
+def _parsed_setting():
+    parser = DataParser()
+    parser.set_slave_idx(1)
+    # Round-trip through JSON so each call builds a distinct object tree
+    return parser.parse(json.loads(json.dumps(make_config())))
+
+
+def _bench(name, func):
+    start = ticks_us()
+    for _ in range(TICKS):
+        func()
+    elapsed = ticks_diff(ticks_us(), start)
+    print("%-28s %10.3f us/tick" % (name, elapsed / TICKS))
+
+
+def main():
+    current = _parsed_setting()
+    same = current
+    copy = _parsed_setting()
+    current_gen = 7
+    gen = 7
+
+    print("config change detection, %d ticks" % TICKS)
+    _bench("deep compare, same object", lambda: same != current)
+    _bench("deep compare, equal copy", lambda: copy != current)
+    _bench("generation compare", lambda: gen != current_gen)
+
+
+main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Equivalence sweep of the fixed-point control pipeline against the float
+# one: stick normalisation, motor duty cycles, servo angle/speed duty
+# cycles, servo stepping trajectories, motor mixing and the high speed
+# zone ramp. Every output must match within 1 LSB. Exits with status 1 on
+# a mismatch.
+
+import sys
+from array import array
+
+import _host  # noqa: F401
+from control import BBL_Controller
+from bbl import kernels
+from bbl.kernels import SPEED_Q
+from bbl.servos import ANGLE_Q
+
+TOLERANCE = 1
+
+
+class Check:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.worst = 0
+        self.first = None
+
+    def compare(self, ref, fixed, where):
+        self.count += 1
+        diff = abs(ref - fixed)
+        if diff > self.worst:
+            self.worst = diff
+        if diff > TOLERANCE and self.first is None:
+            self.first = "%s: float %s, fixed %s" % (where, ref, fixed)
+
+    def report(self):
+        ok = self.worst <= TOLERANCE
+        print("%-26s %8d cases  max diff %-6.3g %s" % (
+            self.name, self.count, self.worst, "ok" if ok else "FAIL"))
+        if not ok:
+            print("    first mismatch at " + self.first)
+        return ok
+
+
+def check_stick_values(ctrl):
+    check = Check("stick values")
+    for mid in (1500, 1990, 2048, 2090, 2600):
+        for dz in (0, 1, 150, 200, 400):
+            ctrl.adc_mid_list = [mid] * 6
+            ctrl.adc_deadzone_list = [dz] * 6
+            ctrl._compile_adc_slopes()
+            for x in range(4096):
+                ref = kernels.adc_value_deal(x, 4096, mid, dz)
+                fixed = kernels.adc_value_q(
+                    x, ctrl.adc_lo_end[0], ctrl.adc_hi_start[0],
+                    ctrl.adc_lo_q[0], ctrl.adc_hi_q[0])
+                where = "mid %d dz %d x %d" % (mid, dz, x)
+                # The sign drives the mid-point events, it must not change
+                if (ref > 0) != (fixed > 0) or (ref < 0) != (fixed < 0):
+                    check.compare(0, 2 * TOLERANCE + 1, where + " sign")
+                else:
+                    check.compare(ref, fixed, where)
+    ctrl.adc_mid_list = [2048] * 6
+    ctrl.adc_deadzone_list = [200] * 6
+    ctrl._compile_adc_slopes()
+    return check.report()
+
+
+def check_motor_duty(motors):
+    check = Check("motor duty")
+    for speed in range(-2048, 2049):
+        motors.set_fixed_point(False)
+        ref = motors._speed_handler(speed)
+        motors.set_fixed_point(True)
+        fixed = motors._speed_handler(speed)
+        check.compare(ref[0], fixed[0], "speed %d ch1" % speed)
+        check.compare(ref[1], fixed[1], "speed %d ch2" % speed)
+    return check.report()
+
+
+def _servo_duty(servos, fixed, func, value):
+    servos.set_fixed_point(fixed)
+    func(1, value)
+    return servos.servos_map[0].duty()
+
+
+def check_servo_duty(servos):
+    check = Check("servo angle duty")
+    for half in range(0, 361):
+        for angle in (half // 2, half / 2):
+            ref = _servo_duty(servos, False, servos.set_angle, angle)
+            fixed = _servo_duty(servos, True, servos.set_angle, angle)
+            check.compare(ref, fixed, "angle %s" % angle)
+    ok = check.report()
+
+    check = Check("servo speed duty")
+    for speed in range(-100, 101):
+        ref = _servo_duty(servos, False, servos.set_speed, speed)
+        fixed = _servo_duty(servos, True, servos.set_speed, speed)
+        check.compare(ref, fixed, "speed %d" % speed)
+    return check.report() and ok
+
+
+def _servo_trajectory(servos, fixed, start, target, velocity):
+    servos.set_fixed_point(False)
+    servos.set_angle(1, start)
+    servos.set_fixed_point(fixed)
+    servos.set_angle_step(1, velocity)
+    servos.set_angle_stepping(1, target)
+    info = servos.servos_info_map[0]
+    duties = [servos.servos_map[0].duty()]
+    for _ in range(20000):
+        servos.timing_proc()
+        duties.append(servos.servos_map[0].duty())
+        if fixed:
+            arrived = info["c_q"] == int(info["s_ang"] * (1 << ANGLE_Q))
+        else:
+            arrived = info["c_ang"] == info["s_ang"]
+        if arrived:
+            break
+    return duties
+
+
+def check_servo_stepping(servos):
+    check = Check("servo stepping")
+    pairs = ((0, 180), (180, 0), (90, 91), (45, 135), (10.5, 170.5))
+    for velocity in range(1, 101):
+        for start, target in pairs:
+            ref = _servo_trajectory(servos, False, start, target, velocity)
+            fixed = _servo_trajectory(servos, True, start, target, velocity)
+            where = "%s->%s vel %d" % (start, target, velocity)
+            # The duty sequences as seen by the servo: once a trajectory
+            # arrives its last duty cycle is held
+            for i in range(max(len(ref), len(fixed))):
+                check.compare(ref[min(i, len(ref) - 1)],
+                              fixed[min(i, len(fixed) - 1)],
+                              where + " tick %d" % i)
+    return check.report()
+
+
+def check_motor_mixing(ctrl):
+    check = Check("motor mixing")
+    ctrl.setting = {}
+    ctrl.enable_advanced_motor_control[0] = False
+    ctrl.motor_mix[0] = (array('b', [0, 1]), array('b', [1, -1]))
+    for offset in (-30, -5, 0, 5, 30):
+        for min_rate, max_rate in ((0, 100), (35, 80), (100, 100), (73, 12)):
+            ctrl.motors.set_offset(1, offset)
+            ctrl.motors.set_reverse_rate(1, min_rate)
+            ctrl.motors.set_forward_rate(1, max_rate)
+            for a in range(-2048, 2049, 7):
+                for b in (-2048, -300, 0, 1, 1500):
+                    data = [a, b, 0, 0, 0, 0]
+                    ctrl.set_fixed_point(False)
+                    ref = ctrl.motor_speed_calculate(data, 1)
+                    ctrl.set_fixed_point(True)
+                    fixed = ctrl.motor_speed_calculate(data, 1)
+                    check.compare(ref, fixed, "offset %d rates %d/%d in %s"
+                                  % (offset, min_rate, max_rate, data[:2]))
+    ctrl.motors.set_offset(1, 0)
+    ctrl.motors.set_reverse_rate(1, 100)
+    ctrl.motors.set_forward_rate(1, 100)
+    return check.report()
+
+
+def check_high_speed_zone(ctrl):
+    check = Check("high speed zone")
+    ctrl.setting = {}
+    ctrl.motor_mix[0] = (array('b', [0]), array('b', [1]))
+    ctrl.enable_advanced_motor_control[0] = True
+    # Stick steps between rest, mid and full throw in both directions
+    sticks = (0, 2047, 2047, 900, -2048, -2048, 1500, 0, -1700, 2047)
+    for pctg in (10, 30, 60):
+        for duration in (0.5, 1.0, 2.0):
+            ctrl.tracker_high_speed_zone_pctg[0] = pctg
+            ctrl.high_speed_duration[0] = duration
+            ctrl._compile_high_speed_params()
+            outputs = []
+            for fixed in (False, True):
+                ctrl.set_fixed_point(fixed)
+                for ch in range(6):
+                    ctrl.adv_cur_rc_data[ch] = 0
+                    ctrl.adv_cur_q8[ch] = 0
+                    ctrl.adv_last_rc_data[ch] = 0
+                    ctrl.adv_ctrl_last_tar_speed[ch] = 0
+                    ctrl.adv_ctrl_elapsed_time[ch] = 0
+                    ctrl.adv_ctrl_elapsed_ms[ch] = 0
+                trace = []
+                for stick in sticks:
+                    for _ in range(int(duration * 50) + 10):
+                        trace.append(ctrl.motor_speed_calculate(
+                            [stick, 0, 0, 0, 0, 0], 1))
+                outputs.append(trace)
+            for i in range(len(outputs[0])):
+                check.compare(outputs[0][i], outputs[1][i],
+                              "zone %d%% %ss tick %d" % (pctg, duration, i))
+    ctrl.enable_advanced_motor_control[0] = False
+    return check.report()
+
+
+def check_high_speed_map(ctrl):
+    check = Check("high speed map")
+    for total in (0.5, 1.0, 2.0):
+        total_ms = int(total * 1000)
+        for step in range(0, int(total_ms / 20) + 2):
+            for current in range(-2048, 2049, 64):
+                for target in (-2048, -1500, -900, 0, 900, 1500, 2047):
+                    ref = ctrl._high_speed_map(current, target, step * 0.02,
+                                               total, 0.02)
+                    fixed = kernels.high_speed_map_q(
+                        current << SPEED_Q, target, step * 20, total_ms, 20)
+                    check.compare(ref, fixed / (1 << SPEED_Q),
+                                  "cur %d tar %d t %d/%d ms" % (
+                                      current, target, step * 20, total_ms))
+    return check.report()
+
+
+def main():
+    ctrl = BBL_Controller()
+    results = [
+        check_stick_values(ctrl),
+        check_motor_duty(ctrl.motors),
+        check_servo_duty(ctrl.servos),
+        check_servo_stepping(ctrl.servos),
+        check_motor_mixing(ctrl),
+        check_high_speed_map(ctrl),
+        check_high_speed_zone(ctrl),
+    ]
+    if not all(results):
+        sys.exit(1)
+
+
+main()
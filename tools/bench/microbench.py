@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Cost of the bbl drivers and the control functions: calls/s, us/call and
+# heap bytes allocated per call. The same script runs on the board, timed
+# with ticks_us, and on the host, timed with perf_counter_ns on the
+# firmware stand-ins. The results are written as JSON so that two builds
+# can be compared with bench_compare.py.
+#
+# Usage: python microbench.py [RESULTS] [CASE ...]
+#        mpremote cp _host.py sample_config.py : + run microbench.py
+#        (on the board the results go to :microbench.json)
+
+import sys
+import gc
+import json
+
+import _host
+import utime
+from bbl import kernels
+from bbl.servos import ServosController
+from bbl.motors import MotorsController
+from bbl.leds import LEDController
+from control import BBL_Controller
+import control
+from parser import DataParser
+from sample_config import make_config, CODE_SAMPLE
+
+if _host.IS_HOST:
+    import tracemalloc
+    from time import perf_counter_ns
+
+    def _clock():
+        return perf_counter_ns()
+
+    def _elapsed_us(start):
+        return (perf_counter_ns() - start) / 1000
+else:
+    from utime import ticks_us, ticks_diff
+
+    def _clock():
+        return ticks_us()
+
+    def _elapsed_us(start):
+        return ticks_diff(ticks_us(), start)
+
+RESULTS = "microbench.json"
+REPEATS = 3  # Timed runs per case, the fastest one counts
+ALLOC_CALLS = 200  # Calls measured for heap usage
+
+# Packets replayed by the handler: sticks moving, no button pressed
+_PACKETS = (
+    [3500, 1000, 2048, 2600, 600, 3900, 0, 0, 0, 0],
+    [600, 3100, 2048, 1500, 3400, 200, 0, 0, 0, 0],
+)
+
+
+def _servo_case():
+    servos = ServosController()
+    return lambda: servos.set_angle_stepping(1, 120, 40)
+
+
+def _motor_case():
+    motors = MotorsController()
+    return lambda: motors.set_speed(1, 1024)
+
+
+def _led_case():
+    led = LEDController("LED1")
+    # Breathing on all four LEDs redraws the frame on every call
+    led.set_led_effect(2, 1000, 0xFF, 0x0F, 0x40CFFF)
+    return led.timing_proc
+
+
+def _led_tick_case():
+    # Every call one refresh period further into the effect: a new frame
+    led = LEDController("LED1")
+    led.set_led_effect(2, 3000, 0xFF, 0x0F, 0x40CFFF)
+
+    def call():
+        led.current_effect_start_time = utime.ticks_add(
+            led.current_effect_start_time, -5)
+        led.timing_proc()
+    return call
+
+
+def _neopixel_case():
+    return LEDController("LED1").np.write
+
+
+def _neopixel_show_case():
+    # An unchanged frame, as between the steps of a slow effect
+    np = LEDController("LED1").np
+    np.write()
+    return np.show
+
+
+def _parse_case():
+    parser = DataParser()
+    parser.set_slave_idx(1)
+    text = json.dumps(make_config())
+    # parse() consumes its input: every call gets a fresh config
+    return parser.parse, lambda: json.loads(text)
+
+
+def _prepare_case():
+    executor = BBL_Controller().executor
+    return lambda: executor._prepare(CODE_SAMPLE)
+
+
+def _compile_case():
+    # What a CODE trigger cost before the scripts were compiled at load
+    executor = BBL_Controller().executor
+    return lambda: executor._compile(CODE_SAMPLE)
+
+
+def _handler_case():
+    ctrl = BBL_Controller()
+    parser = DataParser()
+    parser.set_slave_idx(1)
+    setting = parser.parse(make_config())
+    packets = _PACKETS
+    state = [0]
+
+    def call():
+        # handler() normalises the packet in place and rc_module hands
+        # over a fresh list per packet, so every call gets a copy
+        n = state[0] ^ 1
+        state[0] = n
+        ctrl.handler(setting, 1, packets[n][:], 1)
+    return call
+
+
+# (name, calls, setup): setup returns the function to call, or a pair
+# (function, prepare) when every call needs a fresh argument that is built
+# outside of the measurement
+CASES = (
+    ("ServosController.set_angle_stepping", 5000, _servo_case),
+    ("MotorsController.set_speed", 5000, _motor_case),
+    ("LEDController.timing_proc", 2000, _led_case),
+    ("LEDController.timing_proc (step)", 500, _led_tick_case),
+    ("NeoPixel.write", 2000, _neopixel_case),
+    ("NeoPixel.show (unchanged)", 2000, _neopixel_show_case),
+    ("DataParser.parse", 5, _parse_case),
+    ("CommandExecutor._prepare", 200, _prepare_case),
+    ("CommandExecutor._compile", 100, _compile_case),
+    ("BBL_Controller.handler", 1000, _handler_case),
+)
+
+
+def _time_loop(func, calls):
+    # The empty loop is measured and subtracted
+    start = _clock()
+    for _ in range(calls):
+        pass
+    overhead = _elapsed_us(start)
+    start = _clock()
+    for _ in range(calls):
+        func()
+    return max(_elapsed_us(start) - overhead, 0) / calls
+
+
+def _time_prepared(func, prepare, calls):
+    total = 0
+    for _ in range(calls):
+        arg = prepare()
+        start = _clock()
+        func(arg)
+        total += _elapsed_us(start)
+    return total / calls
+
+
+def _alloc_host(func, prepare, calls):
+    # CPython frees garbage at once, so the traced peak of each call stands
+    # in for what the call allocates before a collection
+    tracemalloc.start()
+    total = 0
+    for _ in range(calls):
+        arg = prepare() if prepare else None
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        if prepare:
+            func(arg)
+        else:
+            func()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / calls
+
+
+def _alloc_board(func, prepare, calls):
+    # mem_alloc only drops through a collection, which voids the sample
+    total = 0
+    if prepare:
+        for _ in range(calls):
+            arg = prepare()
+            gc.collect()
+            before = gc.mem_alloc()
+            func(arg)
+            delta = gc.mem_alloc() - before
+            if delta < 0:
+                return None
+            total += delta
+    else:
+        gc.collect()
+        before = gc.mem_alloc()
+        for _ in range(calls):
+            func()
+        total = gc.mem_alloc() - before
+        if total < 0:
+            return None
+    return total / calls
+
+
+def run_case(name, calls, setup):
+    """
+    Measures one case.
+
+    Returns:
+        dict: calls, us_per_call, calls_per_s and bytes_per_call (None when
+            a garbage collection got in the way).
+    """
+    made = setup()
+    func, prepare = made if isinstance(made, tuple) else (made, None)
+    # Warm up: first-call setup such as the handler's config compile
+    if prepare:
+        func(prepare())
+    else:
+        func()
+
+    us = None
+    for _ in range(REPEATS):
+        gc.collect()
+        if prepare:
+            run = _time_prepared(func, prepare, calls)
+        else:
+            run = _time_loop(func, calls)
+        us = run if us is None else min(us, run)
+
+    alloc_calls = min(calls, ALLOC_CALLS)
+    if _host.IS_HOST:
+        heap = _alloc_host(func, prepare, alloc_calls)
+    else:
+        heap = _alloc_board(func, prepare, alloc_calls)
+
+    return {
+        "name": name,
+        "calls": calls,
+        "us_per_call": round(us, 3),
+        "calls_per_s": round(1000000 / us) if us > 0 else None,
+        "bytes_per_call": None if heap is None else round(heap, 1),
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    path = args[0] if args else RESULTS
+    selected = args[1:]
+
+    results = {
+        "target": "%s %s" % (sys.implementation.name, sys.platform),
+        "emitter": kernels.EMITTER,
+        "fixed_point": control.FIXED_POINT,
+        "cases": [],
+    }
+    print("%s, kernels: %s" % (results["target"], results["emitter"]))
+    print("%-36s %10s %12s %12s" % ("case", "calls/s", "us/call",
+                                    "bytes/call"))
+    for name, calls, setup in CASES:
+        if selected and name not in selected:
+            continue
+        case = run_case(name, calls, setup)
+        results["cases"].append(case)
+        heap = case["bytes_per_call"]
+        print("%-36s %10s %12.2f %12s" % (
+            name, case["calls_per_s"], case["us_per_call"],
+            "-" if heap is None else "%.1f" % heap))
+
+    with open(path, "w") as f:
+        json.dump(results, f)
+    print("results written to %s" % path)
+
+
+main()
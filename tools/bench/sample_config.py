@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Generates a realistic, large rc_config for benchmarks: every stick and
+# button carries LED, servo, motor and CODE events for both receivers,
+# which also have TIMELINE choreographies.
+
+import json
+import random
+
+CODE_SAMPLE = """from bbl.servos import ServosController
+import time
+servos = ServosController()
+while True:
+    servos.set_angle_stepping(1, 30, 40)
+    time.sleep(0.5)
+    servos.set_angle_stepping(1, 150, 40)
+    time.sleep(0.5)
+"""
+
+
+def _event(ev_type, receiver, actuator, values):
+    return {
+        "type": ev_type,
+        "receiver": receiver,
+        "actuator": actuator,
+        "set_value": values
+    }
+
+
+def _wave_and_flash(n):
+    # Swing the arm on PWM1 back and forth, then flash both LED channels
+    steps = [{"time": 0.3 * k, "actuator": "PWM1", "value": (30, 150)[k % 2]}
+             for k in range(4 + n)]
+    t = 0.3 * len(steps)
+    steps.append({"time": t, "actuator": "LED1", "value": 1 + n % 8})
+    steps.append({"time": t, "actuator": "LED2", "value": 1 + n % 8})
+    steps.append({"time": t + 1, "actuator": "PWM1", "value": 90})
+    return steps
+
+
+def make_config(events_per_channel=6, led_entries=16, code_entries=8,
+                timeline_entries=2, seed=1):
+    """
+    Builds a rc_config dict.
+
+    Args:
+        events_per_channel (int): Events attached to each stick/button.
+        led_entries (int): LED effect entries per LED channel and receiver.
+        code_entries (int): CODE blocks per receiver.
+        timeline_entries (int): TIMELINE choreographies per receiver.
+        seed (int): Seed of the pseudo random generator.
+
+    Returns:
+        dict: The configuration, ready for json.dump.
+    """
+    random.seed(seed)
+    actuators = ["LED1", "LED2", "PWM3", "PWM4", "MOTOR2", "CODE"]
+    channels = []
+    for ch in range(6):
+        events = []
+        for n in range(events_per_channel):
+            ev_type = ("gt_mid", "lt_mid", "eq_mid")[n % 3]
+            act = actuators[n % len(actuators)]
+            events.append(_event(ev_type, 1 + n % 2, act,
+                                 [random.randint(1, 8) for _ in range(3)]))
+        controls = []
+        if ch < 4:
+            controls.append({
+                "receiver": 1 + ch % 2,
+                "actuator": ("MOTOR1", "PWM1", "PWM2", "MOTOR1")[ch],
+                "direction": "positive" if ch % 3 else "negative"
+            })
+        channels.append({
+            "data": {"deadzone": 150 + 10 * ch,
+                     "mid_value": 1990 + 20 * ch},
+            "controls": controls,
+            "event": events
+        })
+    for key in range(4):
+        events = []
+        for n in range(events_per_channel):
+            ev_type = ("short", "long", "down", "up")[n % 4]
+            act = actuators[(n + key) % len(actuators)]
+            events.append(_event(ev_type, 1 + n % 2, act,
+                                 [random.randint(1, 8) for _ in range(2)]))
+        channels.append({"event": events})
+
+    config = {
+        "sender": {
+            "channels": channels,
+            "auto_sleep": {"en": True}
+        }
+    }
+    for recv in (1, 2):
+        receiver = {}
+        for i in range(1, 5):
+            receiver[f"PWM{i}"] = {
+                "initial_value": 90,
+                "speed": 60 + i,
+                "min_value": 10 * i if i % 2 else -80,
+                "max_value": 180 - 10 * i if i % 2 else 80,
+                "bias": i - 2,
+                "type": "angle" if i % 2 else "speed"
+            }
+        for i in (1, 2):
+            receiver[f"MOTOR{i}"] = {
+                "bias": 3 * i,
+                "min_value": 90,
+                "max_value": 100 - 5 * i,
+                "advance_motor_config": {
+                    "en": i == 1, "ACC": 1.45, "LVZ": 60,
+                    "HVZ": 20, "HVD": 1.5
+                }
+            }
+        for led in ("LED1", "LED2"):
+            receiver[led] = {"data": [{
+                "effect": 1 + n % 8,
+                "sequence_number": 1 + n % 15,
+                "mode": ("solid", "blink", "breath")[n % 3],
+                "RGB": "0x%06X" % random.randint(0, 0xFFFFFF),
+                "repeat_times": (1, 3, 255)[n % 3],
+                "time": 1 + n % 4
+            } for n in range(led_entries)]}
+        receiver["CODE"] = {"data": [{
+            "effect": 1 + n,
+            "code": CODE_SAMPLE,
+            "priority": n % 2
+        } for n in range(code_entries)]}
+        receiver["TIMELINE"] = {"data": [{
+            "effect": 1 + n,
+            "steps": _wave_and_flash(n)
+        } for n in range(timeline_entries)]}
+        config[f"receiver_{recv}"] = receiver
+    return config
+
+
+if __name__ == "__main__":
+    import sys
+    path = sys.argv[1] if len(sys.argv) > 1 else "rc_config"
+    with open(path, "w") as f:
+        json.dump(make_config(), f)
+    print("written", path)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Checks the heap use of the control tick in fixed-point mode with the
+# sample configuration. Exits with 1 on failure.
+#
+# Zero allocation is only checked on the board: there gc.mem_alloc() must
+# not move over 1000 handler() calls that trigger no effect, nor over 1000
+# runs of the timer tasks. CPython boxes every large int, so the host
+# cannot check it.
+#
+# Both targets check for leaks against a measured baseline: the live heap
+# after TICKS calls is the baseline, and TICKS more calls must not grow it
+# by more than LEAK_SLACK bytes. This also covers ticks that trigger
+# effects, whose dispatch allocates (log lines) but must not retain.
+
+import sys
+import gc
+
+import _host
+from control import BBL_Controller
+from parser import DataParser
+from sample_config import make_config
+
+if _host.IS_HOST:
+    import tracemalloc
+
+TICKS = 1000
+WARMUP = 100
+# Live heap growth tolerated between the baseline and the second run: a
+# conservative collection on the board may keep a stray block alive
+LEAK_SLACK = 0 if _host.IS_HOST else 64
+
+# Sticks sweeping on one side of their mid points and buttons released:
+# no tick triggers an effect, whose dispatch and log line may allocate
+_PACKETS = [
+    [2048 + 400 + (k * 37) % 1600, 2048 - 400 - (k * 53) % 1600,
+     2048 + 500 + (k * 11) % 1500, 2048 + 300 + (k * 71) % 1700,
+     2048 - 300 - (k * 29) % 1700, 2048 + 600 + (k * 13) % 1400,
+     1, 1, 1, 1]
+    for k in range(50)
+]
+
+# The same sweep with L1 dipping below its mid point once per cycle: its
+# lt_mid and gt_mid events fire LED1, MOTOR2 and PWM3 effects
+_EFFECT_PACKETS = [packet[:] for packet in _PACKETS]
+_EFFECT_PACKETS[25][0] = 2048 - 1000
+
+
+def _heap():
+    if _host.IS_HOST:
+        return tracemalloc.get_traced_memory()[0]
+    return gc.mem_alloc()
+
+
+def _run(func, calls):
+    for _ in range(calls):
+        func()
+
+
+def _live():
+    gc.collect()
+    return _heap()
+
+
+def _measure(name, func, zero):
+    """
+    Measures a case.
+
+    Args:
+        name (str): The case name.
+        func (function): One call of the case.
+        zero (bool): Also require zero allocation, checked on the board.
+
+    Returns:
+        bool: True if the case passed.
+    """
+    _run(func, WARMUP)
+    if _host.IS_HOST:
+        tracemalloc.start()
+    # The first run is traced, so that the heap it leaves is the baseline
+    ok = True
+    alloc = "-"
+    gc.collect()
+    before = _heap()
+    _run(func, TICKS)
+    if zero and not _host.IS_HOST:
+        alloc = _heap() - before
+        ok = alloc == 0
+    baseline = _live()
+    _run(func, TICKS)
+    growth = _live() - baseline
+    if _host.IS_HOST:
+        tracemalloc.stop()
+    ok = ok and growth <= LEAK_SLACK
+    print("%-16s %s  alloc %s bytes, live heap growth %d bytes over %d "
+          "calls" % (name, "ok  " if ok else "FAIL", alloc, growth, TICKS))
+    return ok
+
+
+def _ticker(ctrl, setting, packets):
+    rc_data = [0] * 10
+    state = [0]
+
+    def tick():
+        n = state[0] + 1
+        if n == len(packets):
+            n = 0
+        state[0] = n
+        packet = packets[n]
+        for k in range(10):
+            rc_data[k] = packet[k]
+        ctrl.handler(setting, 1, rc_data, 1)
+    return tick
+
+
+def main():
+    ctrl = BBL_Controller()
+    ctrl.set_fixed_point(True)
+    # Isolate the handler from the timer interrupt, checked on its own
+    ctrl.scheduler.stop()
+
+    parser = DataParser()
+    parser.set_slave_idx(1)
+    setting = parser.parse(make_config())
+
+    def timer_tasks():
+        ctrl.servos.timing_proc()
+        ctrl.led1.timing_proc()
+        ctrl.led2.timing_proc()
+        ctrl.scheduler.poll()
+
+    if _host.IS_HOST:
+        print("host: leaks only, zero allocation is checked on the board")
+    results = [
+        _measure("handler", _ticker(ctrl, setting, _PACKETS), True),
+        _measure("handler+effects", _ticker(ctrl, setting, _EFFECT_PACKETS),
+                 False),
+        _measure("timer tasks", timer_tasks, True),
+    ]
+    ctrl.scheduler.start()
+    if not all(results):
+        sys.exit(1)
+
+
+main()
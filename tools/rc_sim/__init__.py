@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Host-side simulator of the RC receiver application, see README.md.
+
+from .firmware import RealClock, VirtualClock, Recorder, RcScript, install
+from .simulator import APP_ROOT, Simulator
+
+__all__ = ["RealClock",
+           "VirtualClock",
+           "Recorder",
+           "RcScript",
+           "install",
+           "APP_ROOT",
+           "Simulator"]
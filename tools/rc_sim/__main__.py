@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Usage: python -m rc_sim [-s SCRIPT] [-c CONFIG] [-t SECONDS] [-o TRACE]
+#                         [--cpu-scale K]
+
+import os
+import sys
+import math
+import argparse
+
+from .firmware import RcScript
+from .simulator import Simulator
+
+_BENCH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                      "bench")
+
+
+PACKET_MS = 20
+
+
+def sweep(t_ms):
+    """A demo input: all sticks sweep, one button pressed each second."""
+    t_ms -= t_ms % PACKET_MS  # One packet per radio period
+    phase = t_ms / 1000
+    data = [int(2048 + 2000 * math.sin(phase * (0.5 + i * 0.3)))
+            for i in range(6)]
+    key = (t_ms // 1000) % 4
+    data += [1 if (i == key and t_ms % 1000 < 300) else 0 for i in range(4)]
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="rc_sim")
+    parser.add_argument("-s", "--script",
+                        help="input script (JSON), a stick sweep if absent")
+    parser.add_argument("-c", "--config",
+                        help="rc_config to load, a generated one if absent")
+    parser.add_argument("-t", "--seconds", type=float, default=10.0,
+                        help="simulated run time")
+    parser.add_argument("-o", "--out", help="write the trace (JSON) here")
+    parser.add_argument("--cpu-scale", type=float, default=0.0,
+                        help="charge host CPU time x K to the clock")
+    args = parser.parse_args()
+
+    script = RcScript.load(args.script) if args.script else RcScript(sweep)
+    config = args.config
+    if config is None:
+        sys.path.insert(0, _BENCH)
+        from sample_config import make_config
+        config = make_config()
+
+    sim = Simulator(script, config, cpu_scale=args.cpu_scale)
+    rec = sim.run(args.seconds)
+
+    print("simulated %.1f s in %.2f s wall (x%.0f)" % (
+        args.seconds, sim.wall_s, args.seconds / max(sim.wall_s, 1e-9)))
+    print("writes: pwm %d, easypwm %d, bitstream %d, log lines %d" % (
+        len(rec.pwm), len(rec.easypwm), len(rec.bitstream), len(rec.logs)))
+    for t, level, msg in rec.logs:
+        if level in ("W", "E"):
+            print("%10.3f %s %s" % (t / 1000000, level, msg))
+    if args.out:
+        rec.save(args.out)
+
+
+main()
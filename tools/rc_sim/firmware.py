@@ -0,0 +1,481 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# In-process stand-ins for the firmware-only modules the RC receiver
+# imports: machine, easypwm, utime, uasyncio, ulogger, rc_module,
+# bbl_product, esp32 and neopixel.
+#
+# install() registers them in sys.modules. With a VirtualClock, time and
+# timers follow the simulation and every output write is recorded; with
+# the default RealClock they are inert and run on the host clock, which
+# is what the benchmarks need.
+
+import sys
+import gc
+import json
+import time
+import types
+import asyncio
+import tracemalloc
+
+__all__ = ["RealClock", "VirtualClock", "Recorder", "RcScript", "install"]
+
+TICKS_PERIOD = 1 << 30
+
+
+class RealClock:
+    """The host clock. Timers never fire, blocking sleeps really sleep."""
+
+    def __init__(self):
+        self._start = time.perf_counter_ns()
+
+    @property
+    def now_us(self):
+        return (time.perf_counter_ns() - self._start) // 1000
+
+    def advance(self, us):
+        if us > 0:
+            time.sleep(us / 1000000)
+
+    def charge(self):
+        return 0
+
+    def add_timer(self, timer, period_us, periodic):
+        pass
+
+    def remove_timer(self, timer):
+        pass
+
+
+class VirtualClock:
+    """
+    Simulated time in microseconds.
+
+    Time moves through advance(), called by the virtual event loop when
+    every task is waiting and by blocking sleeps. machine.Timer callbacks
+    fire at their exact deadlines while time moves.
+
+    Args:
+        cpu_scale (float): Host CPU time spent in the application is
+            charged to the clock times this factor, e.g. the host/board
+            speed ratio, whenever it reads the time. 0 runs all code in
+            zero simulated time.
+    """
+
+    def __init__(self, cpu_scale=0.0):
+        self.now_us = 0
+        self.cpu_scale = cpu_scale
+        self._timers = {}  # timer -> [deadline, period, periodic]
+        self._cpu_mark = time.perf_counter()
+        self._charging = False
+
+    def charge(self):
+        """
+        Advances the clock by the host CPU time used since the last call.
+
+        Returns:
+            float: The simulated microseconds charged.
+        """
+        if not self.cpu_scale or self._charging:
+            return 0
+        self._charging = True
+        now = time.perf_counter()
+        spent = (now - self._cpu_mark) * 1000000 * self.cpu_scale
+        self._cpu_mark = now
+        self.advance(spent)
+        self._charging = False
+        return spent
+
+    def advance(self, us):
+        target = self.now_us + int(us)
+        while True:
+            timer = None
+            for t, (deadline, _, _) in self._timers.items():
+                if deadline <= target and (
+                        timer is None or deadline < self._timers[timer][0]):
+                    timer = t
+            if timer is None:
+                break
+            deadline, period, periodic = self._timers[timer]
+            self.now_us = deadline
+            if periodic:
+                self._timers[timer][0] = deadline + period
+            else:
+                del self._timers[timer]
+            timer._fire()
+        self.now_us = target
+
+    def add_timer(self, timer, period_us, periodic):
+        self._timers[timer] = [self.now_us + period_us, period_us, periodic]
+
+    def remove_timer(self, timer):
+        self._timers.pop(timer, None)
+
+
+class Recorder:
+    """
+    Timestamped log of everything the application writes to the hardware.
+
+    Attributes:
+        pwm (list): (t_us, pin, duty) for machine.PWM duty writes.
+        easypwm (list): (t_us, channel, duty) for easypwm.duty writes.
+        bitstream (list): (t_us, pin, bytes) for machine.bitstream writes.
+        logs (list): (t_us, level, message) for ulogger messages.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.pwm = []
+        self.easypwm = []
+        self.bitstream = []
+        self.logs = []
+
+    def to_dict(self):
+        return {
+            "pwm": self.pwm,
+            "easypwm": self.easypwm,
+            "bitstream": [(t, pin, data.hex())
+                          for t, pin, data in self.bitstream],
+            "logs": self.logs,
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+class RcScript:
+    """
+    Scripted radio input for the rc_module stand-in.
+
+    Args:
+        data (list or function): Either [(t_ms, [10 values]), ...] sorted
+            by time, where each packet holds until the next one, or a
+            function t_ms -> [10 values] or None.
+        index (int): The receiver index reported by rc_index().
+        simulation (list): [(t_ms, message), ...] returned once each by
+            rc_simulation(); dict messages are sent as JSON.
+        file_transfers (list): Times in ms at which file_transfer()
+            reports a new configuration once.
+    """
+
+    def __init__(self, data=None, index=1, simulation=(), file_transfers=()):
+        self.data = data if data is not None else []
+        self.index = index
+        self.simulation = sorted(simulation, key=lambda item: item[0])
+        self.file_transfers = sorted(file_transfers)
+        self._pos = 0
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a script from a JSON file with the keys "data", "index",
+        "simulation" and "file_transfers", all optional.
+        """
+        with open(path) as f:
+            spec = json.load(f)
+        return cls(spec.get("data"), spec.get("index", 1),
+                   spec.get("simulation", ()),
+                   spec.get("file_transfers", ()))
+
+    def packet(self, t_ms):
+        if callable(self.data):
+            return self.data(t_ms)
+        data = self.data
+        while self._pos + 1 < len(data) and data[self._pos + 1][0] <= t_ms:
+            self._pos += 1
+        if not data or data[self._pos][0] > t_ms:
+            return None
+        return list(data[self._pos][1])
+
+    def pop_simulation(self, t_ms):
+        if self.simulation and self.simulation[0][0] <= t_ms:
+            msg = self.simulation.pop(0)[1]
+            return msg if isinstance(msg, str) else json.dumps(msg)
+        return None
+
+    def pop_file_transfer(self, t_ms):
+        if self.file_transfers and self.file_transfers[0] <= t_ms:
+            self.file_transfers.pop(0)
+            return True
+        return False
+
+
+def _module(name, attrs):
+    mod = types.ModuleType(name)
+    for key, value in attrs.items():
+        setattr(mod, key, value)
+    sys.modules[name] = mod
+    return mod
+
+
+def _machine(clock, recorder, pin_levels):
+    class Pin:
+        IN = 0
+        OUT = 1
+        OPEN_DRAIN = 2
+        PULL_UP = 1
+        PULL_DOWN = 2
+        IRQ_RISING = 1
+        IRQ_FALLING = 2
+
+        def __init__(self, pin_id, mode=-1, pull=-1, value=None, **kwargs):
+            self.id = pin_id
+            if value is not None:
+                pin_levels[pin_id] = value
+
+        def init(self, *args, **kwargs):
+            pass
+
+        def value(self, *args):
+            if args:
+                pin_levels[self.id] = args[0]
+                return None
+            return pin_levels.get(self.id, 1)
+
+        def irq(self, *args, **kwargs):
+            pass
+
+    class PWM:
+        def __init__(self, pin, freq=50, duty=None, **kwargs):
+            self.pin = pin
+            self._freq = freq
+            self._duty = 0
+            if duty is not None:
+                self.duty(duty)
+
+        def duty(self, value=None):
+            if value is None:
+                return self._duty
+            self._duty = value
+            if recorder is not None:
+                recorder.pwm.append((clock.now_us, self.pin.id, value))
+
+        def freq(self, value=None):
+            if value is None:
+                return self._freq
+            self._freq = value
+
+        def deinit(self):
+            pass
+
+    class Timer:
+        ONE_SHOT = 0
+        PERIODIC = 1
+
+        def __init__(self, timer_id=-1, **kwargs):
+            self.callback = None
+            if kwargs:
+                self.init(**kwargs)
+
+        def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+            if freq > 0:
+                period_us = 1000000 // freq
+            else:
+                period_us = period * 1000
+            self.callback = callback
+            clock.remove_timer(self)
+            clock.add_timer(self, period_us, mode == Timer.PERIODIC)
+
+        def deinit(self):
+            clock.remove_timer(self)
+
+        def _fire(self):
+            if self.callback is not None:
+                self.callback(self)
+
+    def bitstream(pin, encoding, timing, buf):
+        if recorder is not None:
+            recorder.bitstream.append((clock.now_us, pin.id, bytes(buf)))
+
+    def deepsleep(*args):
+        raise SystemExit("deepsleep")
+
+    return _module("machine", {
+        "Pin": Pin, "PWM": PWM, "Timer": Timer, "bitstream": bitstream,
+        "deepsleep": deepsleep, "reset": deepsleep,
+        "reset_cause": lambda: 1, "freq": lambda *args: 160000000,
+        "PWRON_RESET": 1, "HARD_RESET": 2, "WDT_RESET": 3,
+        "DEEPSLEEP_RESET": 4, "SOFT_RESET": 5,
+    })
+
+
+def _easypwm(clock, recorder):
+    def duty(channel, value):
+        if recorder is not None:
+            recorder.easypwm.append((clock.now_us, channel, value))
+
+    return _module("easypwm", {
+        "init": lambda *args: None,
+        "config": lambda *args: None,
+        "duty": duty,
+    })
+
+
+def _utime(clock):
+    half = TICKS_PERIOD // 2
+    mask = TICKS_PERIOD - 1
+
+    def ticks_diff(a, b):
+        return ((a - b + half) & mask) - half
+
+    def now_us():
+        clock.charge()
+        return clock.now_us
+
+    def sleep(seconds):
+        clock.advance(seconds * 1000000)
+
+    return _module("utime", {
+        "ticks_us": lambda: now_us() & mask,
+        "ticks_ms": lambda: (now_us() // 1000) & mask,
+        "ticks_cpu": lambda: now_us() & mask,
+        "ticks_add": lambda a, b: (a + b) & mask,
+        "ticks_diff": ticks_diff,
+        "time": lambda: now_us() // 1000000,
+        "time_ns": lambda: now_us() * 1000,
+        "sleep": sleep,
+        "sleep_ms": lambda ms: clock.advance(ms * 1000),
+        "sleep_us": lambda us: clock.advance(us),
+    })
+
+
+def _uasyncio():
+    class ThreadSafeFlag:
+        def __init__(self):
+            self._event = asyncio.Event()
+
+        def set(self):
+            self._event.set()
+
+        def clear(self):
+            self._event.clear()
+
+        def is_set(self):
+            return self._event.is_set()
+
+        async def wait(self):
+            await self._event.wait()
+            self._event.clear()
+
+    attrs = {name: getattr(asyncio, name) for name in dir(asyncio)
+             if not name.startswith("_")}
+    attrs.update({
+        "sleep_ms": lambda ms: asyncio.sleep(ms / 1000),
+        "wait_for_ms": lambda aw, ms: asyncio.wait_for(aw, ms / 1000),
+        "ThreadSafeFlag": ThreadSafeFlag,
+    })
+    return _module("uasyncio", attrs)
+
+
+def _ulogger(clock, recorder):
+    INFO = 20
+
+    class BaseClock:
+        def __call__(self):
+            return "%d" % (clock.now_us // 1000000)
+
+    class Handler:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class Logger:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def _log(self, level, msg):
+            if recorder is not None:
+                recorder.logs.append((clock.now_us, level, str(msg)))
+
+        def debug(self, msg):
+            self._log("D", msg)
+
+        def info(self, msg):
+            self._log("I", msg)
+
+        def warn(self, msg):
+            self._log("W", msg)
+
+        def error(self, msg):
+            self._log("E", msg)
+
+    return _module("ulogger", {
+        "Logger": Logger, "Handler": Handler, "BaseClock": BaseClock,
+        "DEBUG": 10, "INFO": INFO, "WARN": 30, "ERROR": 40,
+        "TO_TERM": 0, "TO_FILE": 1,
+    })
+
+
+def _rc_module(clock, script):
+    def now_ms():
+        return clock.now_us // 1000
+
+    return _module("rc_module", {
+        "rc_slave_init": lambda: True,
+        "rc_master_init": lambda: True,
+        "rc_index": lambda: script.index,
+        "rc_slave_data": lambda: script.packet(now_ms()),
+        "rc_master_data": lambda: script.packet(now_ms()),
+        "rc_simulation": lambda: script.pop_simulation(now_ms()),
+        "file_transfer": lambda: script.pop_file_transfer(now_ms()),
+    })
+
+
+def _misc():
+    _module("bbl_product", {
+        "set_app_name": lambda name: None,
+        "set_app_version": lambda version: None,
+    })
+    _module("esp32", {"wake_on_ext1": lambda *args, **kwargs: None,
+                      "WAKEUP_ANY_HIGH": 1})
+
+    class NeoPixel:
+        def __init__(self, pin, n, **kwargs):
+            self.buf = bytearray(n * 3)
+
+        def __setitem__(self, i, v):
+            self.buf[i * 3:i * 3 + 3] = bytes((v[1], v[0], v[2]))
+
+        def write(self):
+            pass
+
+    _module("neopixel", {"NeoPixel": NeoPixel})
+    sys.modules.setdefault("ujson", json)
+
+    # MicroPython's heap counters, from tracemalloc when it is tracing
+    if not hasattr(gc, "mem_alloc"):
+        gc.mem_alloc = lambda: (tracemalloc.get_traced_memory()[0]
+                                if tracemalloc.is_tracing() else 0)
+        gc.mem_free = lambda: 1 << 20
+        gc.threshold = lambda *args: -1
+
+
+def install(clock=None, recorder=None, script=None, pin_levels=None):
+    """
+    Registers the firmware stand-ins in sys.modules.
+
+    Args:
+        clock: A VirtualClock, or None for the host clock.
+        recorder (Recorder): Receives every output write, or None.
+        script (RcScript): The radio input, or None for no packets.
+        pin_levels (dict): Input levels by pin number, default 1.
+
+    Returns:
+        The clock in use.
+    """
+    if clock is None:
+        clock = RealClock()
+    if script is None:
+        script = RcScript()
+    _machine(clock, recorder, pin_levels if pin_levels is not None else {})
+    _easypwm(clock, recorder)
+    _utime(clock)
+    _uasyncio()
+    _ulogger(clock, recorder)
+    _rc_module(clock, script)
+    _misc()
+    return clock
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# Runs the RC receiver application (rc_main.slave_init and all of its
+# tasks) on the host, on a virtual clock.
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+
+from .firmware import VirtualClock, Recorder, install
+from .vloop import VirtualTimeLoop
+
+__all__ = ["APP_ROOT", "Simulator"]
+
+APP_ROOT = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "app_rc"))
+
+
+class Simulator:
+    """
+    The receiver application on a virtual clock.
+
+    The application modules are imported once per process and keep their
+    singletons, so run one Simulator per process.
+
+    Args:
+        script (RcScript): The radio input.
+        config (dict or str): The rc_config content, or a path to it.
+        workdir (str): Directory the application runs in, where it reads
+            rc_config and writes its cache. A temporary one by default.
+        cpu_scale (float): See VirtualClock.
+        pin_levels (dict): Input pin levels, see firmware.install().
+    """
+
+    def __init__(self, script, config, workdir=None, cpu_scale=0.0,
+                 pin_levels=None):
+        self.clock = VirtualClock(cpu_scale)
+        self.recorder = Recorder(self.clock)
+        self.wall_s = 0.0
+        install(self.clock, self.recorder, script, pin_levels)
+        for path in (APP_ROOT, os.path.join(APP_ROOT, "app")):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+
+        self.workdir = workdir or tempfile.mkdtemp(prefix="rc_sim_")
+        target = os.path.join(self.workdir, "rc_config")
+        if isinstance(config, str):
+            with open(config) as f:
+                config = json.load(f)
+        with open(target, "w") as f:
+            json.dump(config, f)
+
+    def run(self, seconds):
+        """
+        Runs slave_init for a span of simulated time.
+
+        Args:
+            seconds (float): Simulated run time.
+
+        Returns:
+            Recorder: Every output write and log line, timestamped.
+        """
+        cwd = os.getcwd()
+        os.chdir(self.workdir)
+        loop = VirtualTimeLoop(self.clock)
+        asyncio.set_event_loop(loop)
+        try:
+            import rc_main
+
+            async def _main():
+                try:
+                    await asyncio.wait_for(rc_main.slave_init(), seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+            start = time.perf_counter()
+            loop.run_until_complete(_main())
+            self.wall_s = time.perf_counter() - start
+
+            # Scripts started by the executor outlive slave_init
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+            asyncio.set_event_loop(None)
+            os.chdir(cwd)
+        return self.recorder
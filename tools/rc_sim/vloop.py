@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# coding=utf-8
+#
+# The CyberBrick Codebase License, see the file LICENSE for details.
+#
+# Copyright (c) 2025 MakerWorld
+#
+# An asyncio event loop on a VirtualClock. Whenever every task is waiting,
+# the loop jumps the clock straight to the next timer instead of sleeping,
+# so a simulated minute takes as long as the code it runs.
+
+import asyncio
+import selectors
+
+__all__ = ["VirtualTimeLoop"]
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    # Never reports I/O: waiting for `timeout` advances the clock instead
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._map = {}
+
+    def register(self, fileobj, events, data=None):
+        key = selectors.SelectorKey(fileobj, self._fileno(fileobj),
+                                    events, data)
+        self._map[fileobj] = key
+        return key
+
+    def unregister(self, fileobj):
+        return self._map.pop(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        self.unregister(fileobj)
+        return self.register(fileobj, events, data)
+
+    def get_map(self):
+        return self._map
+
+    def close(self):
+        self._map.clear()
+
+    @staticmethod
+    def _fileno(fileobj):
+        return fileobj if isinstance(fileobj, int) else fileobj.fileno()
+
+    def select(self, timeout=None):
+        loop = self._loop
+        charged = loop.clock.charge()
+        if timeout is None:
+            raise RuntimeError("simulation deadlock: no task can run")
+        remaining = timeout * 1000000 - charged
+        if remaining > 0:
+            # Round up so the due callbacks are ready after the jump
+            loop.clock.advance(int(remaining) + 1)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop whose time() is the VirtualClock.
+
+    Args:
+        clock (VirtualClock): The simulation clock.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self):
+        return self.clock.now_us / 1000000